@@ -0,0 +1,108 @@
+# Copyright (c) 2024 kbt | terminus, LLC
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+'''
+Benchmark for filtering and search (tk_table_filter.py).
+
+Filters a model of --rows rows on a few conditions, after the
+column indexes are built, then on a needle extending one searched
+before, as when typing ahead, then edits and appends rows and
+filters again. Does not need a display:
+
+    python benchmarks/bench_filter.py
+
+Exits with status 1 if a filter takes longer than --max-ms.
+NumPy makes it several times faster.
+'''
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__),
+        "..", "src", "tkinter_extensions"))
+from tk_table_model import TableModel, np
+from tk_table_filter import FilterEngine
+
+
+CONDITIONS = {
+    "contains, few values": [("name", "contains", "name 12", False)],
+    "contains, unique values": [("label", "contains", "99", False)],
+    "regex": [("name", "regex", r"9$", False)],
+    "between": [("id", "between", (10, 500_000), False)],
+    "two columns": [("name", "contains", "1", False),
+                    ("label", "contains", "2", False)],
+}
+
+def make_model(count: int) -> TableModel:
+    model = TableModel(("id", "name", "label"))
+    model.insert_rows("", "end", [(i, f"name {i % 5000}", f"label {i}")
+                                  for i in range(count)])
+    return model
+
+def time_filter(engine: FilterEngine, conditions) -> tuple[float, int]:
+    start = time.perf_counter()
+    count = len(engine.rows("", conditions))
+    return time.perf_counter() - start, count
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__,
+            formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--max-ms", type=float, default=100,
+            help="slowest filter allowed, in milliseconds")
+    args = parser.parse_args()
+
+    model = make_model(args.rows)
+    engine = FilterEngine(model)
+    print(f"{args.rows:,} rows, NumPy {'on' if np is not None else 'off'}")
+
+    start = time.perf_counter()
+    for conditions in CONDITIONS.values():
+        engine.rows("", conditions)
+    print(f"building indexes: {time.perf_counter() - start:.3f}s")
+
+    slowest = 0.0
+    for name, conditions in CONDITIONS.items():
+        elapsed, count = time_filter(engine, conditions)
+        slowest = max(slowest, elapsed)
+        print(f"{name:24} {count:>9,} rows in {elapsed * 1000:6.1f} ms")
+
+    elapsed, count = time_filter(engine, [("label", "contains", "994", False)])
+    slowest = max(slowest, elapsed)
+    print(f"{'typing ahead':24} {count:>9,} rows in {elapsed * 1000:6.1f} ms")
+
+    children = model.children("")
+    for i in range(0, 1000):
+        model.set(children[i * 7], "name", "edited")
+    model.insert_rows("", "end", [(0, "appended", "x")] * 1000)
+    elapsed, count = time_filter(engine, CONDITIONS["between"])
+    slowest = max(slowest, elapsed)
+    print(f"{'after edits and appends':24} {count:>9,} rows in "
+          f"{elapsed * 1000:6.1f} ms")
+
+    if slowest * 1000 > args.max_ms:
+        print(f"FAIL: slower than {args.max_ms:.0f} ms")
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
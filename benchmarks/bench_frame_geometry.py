@@ -0,0 +1,92 @@
+# Copyright (c) 2024 kbt | terminus, LLC
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+'''
+Benchmark for FrameScroll geometry handling.
+
+Packs --children labels into a FrameScroll's interior, letting the
+event loop run every --batch labels, and counts the <Configure>
+events the interior and canvas get and the geometry passes
+FrameScroll makes for them. Needs a display. On a headless
+Linux box:
+
+    xvfb-run python benchmarks/bench_frame_geometry.py
+
+Exits with status 1 if there are more than --max-passes passes per
+time the event loop runs.
+'''
+
+import argparse
+import os
+import sys
+import time
+import tkinter as tk
+from tkinter import ttk
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__),
+        "..", "src", "tkinter_extensions"))
+from tk_frame_scroll import FrameScroll
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__,
+            formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--children", type=int, default=1_000)
+    parser.add_argument("--batch", type=int, default=100,
+            help="labels packed between event loop runs")
+    parser.add_argument("--max-passes", type=float, default=2,
+            help="most geometry passes allowed per event loop run")
+    args = parser.parse_args()
+
+    root = tk.Tk()
+    frame = FrameScroll(root)
+    root.update()
+    events = 0
+
+    def _count(event) -> None:
+        nonlocal events
+        events += 1
+
+    frame.interior.bind("<Configure>", _count, add="+")
+    frame.canvas.bind("<Configure>", _count, add="+")
+    frame.geometry_passes = 0
+
+    updates = 0
+    start = time.perf_counter()
+    for i in range(1, args.children + 1):
+        ttk.Label(frame.interior, text=f"Label {i}").pack()
+        if i % args.batch == 0 or i == args.children:
+            root.update()
+            updates += 1
+    elapsed = time.perf_counter() - start
+    passes = frame.geometry_passes
+    root.destroy()
+
+    print(f"{args.children:,} children packed in {elapsed:.3f}s: "
+          f"{events} <Configure> events, {passes} geometry passes "
+          f"in {updates} event loop runs")
+    if passes > args.max_passes * updates:
+        print(f"FAIL: more than {args.max_passes:g} geometry passes "
+              f"per event loop run")
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
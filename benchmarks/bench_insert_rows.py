@@ -0,0 +1,104 @@
+# Copyright (c) 2024 kbt | terminus, LLC
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+'''
+Benchmark for TreeviewTable.insert_rows.
+
+Needs a display. On a headless Linux box run it under Xvfb:
+
+    xvfb-run python benchmarks/bench_insert_rows.py
+
+Exits with status 1 if the batch insert is slower than --min-rate.
+'''
+
+import argparse
+import os
+import sys
+import time
+import tkinter as tk
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__),
+        "..", "src", "tkinter_extensions"))
+from tk_treeview_table import TreeviewTable
+
+
+def make_rows(count: int) -> list[tuple]:
+    return [(i, f"name {i}", i * 3 % 1000, "some longer text value")
+            for i in range(count)]
+
+def new_table(root: tk.Tk, flat: bool) -> TreeviewTable:
+    return TreeviewTable(root, root, flat=flat,
+            columns=("id", "name", "number", "text"))
+
+def time_insert_rows(root: tk.Tk, rows: list[tuple], flat: bool) -> float:
+    table = new_table(root, flat)
+    parent = ""
+    if not flat:
+        parent = table.insert_row(parent="", index=tk.END, text="group")
+    start = time.perf_counter()
+    table.insert_rows(parent, rows)
+    root.update_idletasks()
+    elapsed = time.perf_counter() - start
+    table.destroy()
+    return elapsed
+
+def time_insert_row(root: tk.Tk, rows: list[tuple]) -> float:
+    table = new_table(root, True)
+    start = time.perf_counter()
+    for row in rows:
+        table.insert_row(parent="", index=tk.END, values=row)
+    root.update_idletasks()
+    elapsed = time.perf_counter() - start
+    table.destroy()
+    return elapsed
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__,
+            formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--single-rows", type=int, default=10_000,
+            help="rows for the insert_row comparison")
+    parser.add_argument("--min-rate", type=float, default=100_000,
+            help="required insert_rows rows/sec")
+    args = parser.parse_args()
+
+    root = tk.Tk()
+    rows = make_rows(args.rows)
+
+    flat = time_insert_rows(root, rows, True)
+    tree = time_insert_rows(root, rows, False)
+    single = time_insert_row(root, rows[:args.single_rows])
+    root.destroy()
+
+    flat_rate = args.rows / flat
+    print(f"insert_rows flat:   {args.rows} rows in {flat:.3f}s "
+          f"({flat_rate:,.0f} rows/sec)")
+    print(f"insert_rows nested: {args.rows} rows in {tree:.3f}s "
+          f"({args.rows / tree:,.0f} rows/sec)")
+    print(f"insert_row loop:    {args.single_rows} rows in {single:.3f}s "
+          f"({args.single_rows / single:,.0f} rows/sec)")
+
+    if flat_rate < args.min_rate:
+        print(f"FAIL: below {args.min_rate:,.0f} rows/sec")
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,89 @@
+# Copyright (c) 2024 kbt | terminus, LLC
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+'''
+Benchmark for the tk_table_io parsers.
+
+Parses a few MB of generated TSV and CSV, with quoted fields
+holding tabs, commas, newlines and doubled quotes. Does not need
+a display:
+
+    python benchmarks/bench_parse.py
+
+Exits with status 1 if the parser is slower than --min-rate.
+'''
+
+import argparse
+import io
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__),
+        "..", "src", "tkinter_extensions"))
+from tk_table_io import iter_rows, iter_plain
+
+
+def make_text(rows: int, delimiter: str) -> str:
+    _quoted = '"say ""hi""%s then\nleave"' % delimiter
+    return "".join(
+            delimiter.join((str(i), f"name {i}", str(i * 3 % 1000),
+                _quoted if i % 10 == 0 else "some longer text value"))
+            + "\r\n" for i in range(rows))
+
+def time_parse(parse, source) -> tuple[float, int]:
+    start = time.perf_counter()
+    count = sum(1 for _ in parse(source))
+    return time.perf_counter() - start, count
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__,
+            formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--min-rate", type=float, default=20,
+            help="required MB/sec for the sniffing parser")
+    args = parser.parse_args()
+
+    failed = False
+    for name, delimiter in (("tsv", "\t"), ("csv", ",")):
+        text = make_text(args.rows, delimiter)
+        mb = len(text.encode()) / 1e6
+        elapsed, count = time_parse(iter_rows, text)
+        assert count == args.rows, count
+        rate = mb / elapsed
+        print(f"iter_rows {name}:        {mb:.1f} MB in {elapsed:.3f}s "
+              f"({rate:,.1f} MB/sec)")
+        elapsed, _ = time_parse(iter_rows, io.StringIO(text, newline=""))
+        print(f"iter_rows {name} stream: {mb:.1f} MB in {elapsed:.3f}s "
+              f"({mb / elapsed:,.1f} MB/sec)")
+        failed = failed or rate < args.min_rate
+
+    text = make_text(args.rows, "\t")
+    elapsed, _ = time_parse(iter_plain, text)
+    print(f"iter_plain (no quoting): {len(text) / 1e6:.1f} MB in "
+          f"{elapsed:.3f}s ({len(text) / 1e6 / elapsed:,.1f} MB/sec)")
+
+    if failed:
+        print(f"FAIL: below {args.min_rate:,.1f} MB/sec")
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
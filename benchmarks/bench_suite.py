@@ -0,0 +1,310 @@
+# Copyright (c) 2024 kbt | terminus, LLC
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+'''
+Benchmark suite for TreeviewTable and FrameScroll.
+
+For each mode (flat, tree, virtual) and size it builds a table and
+times, in order: insert (insert_rows), insert_row (--single-rows
+calls), sort (sort_by_col), restripe (redo_row_colors), paste
+(accept_new_text_paste at a cell, run to the end), copy
+(copy_to_clipboard of every row), filter, scroll-to-end and delete,
+each including the idle work it schedules. Each step reports wall
+time, Tcl calls made through the table and the root (the clipboard)
+and the process's peak RSS so far. FrameScroll is timed packing and
+scrolling --frame-rows rows of widgets, plain and virtual.
+
+Needs a display. On a headless Linux box run it under Xvfb:
+
+    xvfb-run python benchmarks/bench_suite.py --json results.json
+
+Compare a run with an earlier one, exiting with status 1 if a step
+took more than --max-ratio times the time, --max-call-ratio times
+the Tcl calls or --max-rss-ratio times the peak RSS:
+
+    xvfb-run python benchmarks/bench_suite.py --baseline results.json
+
+The default sizes include 1M rows, which takes several minutes in the
+flat and tree modes. Pass e.g. --sizes 1000,10000 for a quick run.
+'''
+
+import argparse
+import json
+import os
+import platform
+import resource
+import sys
+import time
+import tkinter as tk
+from tkinter import ttk
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, List
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__),
+        "..", "src", "tkinter_extensions"))
+from tk_table_model import np
+from tk_treeview_table import TreeviewTable
+from tk_frame_scroll import FrameScroll
+from bench_tab_calls import CountingTk
+
+MODES = ("flat", "tree", "virtual")
+SIZES = (1_000, 10_000, 100_000, 1_000_000)
+COLUMNS = ("id", "name", "number", "text")
+
+# rows per group in tree mode
+GROUP_ROWS = 1_000
+
+# measures below these are not gated, they are mostly noise
+NOISE = {"seconds": 0.01, "tcl_calls": 20, "peak_rss_mb": 50}
+
+
+def make_rows(count: int) -> List[tuple]:
+    return [(i, f"name {i % 5000}", i * 7919 % 100_003, "some text")
+            for i in range(count)]
+
+def peak_rss_mb() -> float:
+    _peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return _peak / (1024 * 1024 if sys.platform == "darwin" else 1024)
+
+def value_rows(table: TreeviewTable) -> List[str]:
+    if table.flat:
+        return list(table.model.children(""))
+    return [k for g in table.model.children("")
+            for k in table.model.children(g)]
+
+def cell_event(table: TreeviewTable, iid: str,
+        column: str) -> SimpleNamespace:
+    '''an event at the middle of a cell, as a click there gives'''
+    table.see_row(iid)
+    table.update_idletasks()
+    _x, _y, _width, _height = table.bbox(table._view_iid(iid), column)
+    return SimpleNamespace(x=_x + _width // 2, y=_y + _height // 2,
+                           widget=table)
+
+
+class Suite:
+    '''runs the steps and keeps their results'''
+
+    def __init__(self, root: tk.Tk, single_rows: int):
+        self.root = root
+        self.single_rows = single_rows
+        self.results: List[Dict[str, Any]] = []
+
+    def step(self, mode: str, rows: int, name: str,
+            counter: CountingTk | None, run: Callable[[], Any]) -> None:
+        if counter is not None:
+            counter.calls = 0
+        _start = time.perf_counter()
+        run()
+        self.root.update_idletasks()
+        _seconds = time.perf_counter() - _start
+        _result = {"mode": mode, "rows": rows, "step": name,
+                   "seconds": round(_seconds, 6),
+                   "tcl_calls": counter.calls if counter else None,
+                   "peak_rss_mb": round(peak_rss_mb(), 1)}
+        self.results.append(_result)
+        print(f"{mode:8} {rows:>9,} {name:14} {_seconds:9.3f}s "
+              f"{_result['tcl_calls'] or 0:>9,} calls "
+              f"{_result['peak_rss_mb']:8.1f} MB", flush=True)
+
+    def table(self, mode: str, count: int) -> None:
+        _table = TreeviewTable(self.root, self.root, flat=mode == "flat",
+                virtual=mode == "virtual", columns=COLUMNS, height=30)
+        _table.pack(expand=1, fill="both")
+        self.root.update()
+        # the root too, for the clipboard
+        _counter = CountingTk(_table.tk)
+        _table.tk = self.root.tk = _counter
+        _rows = make_rows(count)
+
+        def _insert() -> None:
+            if _table.flat:
+                _table.insert_rows("", _rows)
+                return
+            for _start in range(0, count, GROUP_ROWS):
+                _group = _table.insert_row(parent="", index=tk.END,
+                        text=f"group {_start}", open=True)
+                _table.insert_rows(_group, _rows[_start:_start + GROUP_ROWS])
+
+        def _insert_row() -> None:
+            _parent = "" if _table.flat else _table.model.children("")[-1]
+            for _row in make_rows(self.single_rows):
+                _table.insert_row(parent=_parent, index=tk.END, values=_row)
+
+        self.step(mode, count, "insert", _counter, _insert)
+        self.step(mode, count, "insert_row", _counter, _insert_row)
+        self.step(mode, count, "sort", _counter,
+                lambda: _table.sort_by_col("number", False))
+        self.step(mode, count, "restripe", _counter, _table.redo_row_colors)
+
+        # a tenth of the rows of the first row's parent, two columns
+        # wide, pasted at its first values column
+        _first = value_rows(_table)[0]
+        _size = len(_table.model.children(_table.model.parent(_first)))
+        self.root.clipboard_clear()
+        self.root.clipboard_append("\n".join(f"pasted {i}\t{i}"
+                                             for i in range(_size // 10)))
+        _event = cell_event(_table, _first, "#2")
+
+        def _paste() -> None:
+            _table.accept_new_text_paste(_event)
+            while _table.paste_job is not None and \
+                    not _table.paste_job.finished:
+                self.root.update()
+
+        self.step(mode, count, "paste", _counter, _paste)
+
+        _selected = value_rows(_table)
+        if _table.virtual:
+            _table._virtual_selection = set(_selected)
+        else:
+            _table.selection_set(_selected)
+        self.root.update()
+        self.step(mode, count, "copy", _counter, _table.copy_to_clipboard)
+        if _table.virtual:
+            _table._virtual_selection.clear()
+        else:
+            _table.selection_set([])
+        self.root.clipboard_clear()
+
+        self.step(mode, count, "filter", _counter,
+                lambda: _table.filter_rows("name", contains="name 12"))
+        _table.clear_filter()
+        self.step(mode, count, "scroll-to-end", _counter,
+                lambda: _table.see_row(value_rows(_table)[-1]))
+        self.step(mode, count, "delete", _counter,
+                lambda: _table.delete_rows(value_rows(_table)[::2]))
+        _table.tk = self.root.tk = _counter._tkapp
+        _table.destroy()
+
+    def frame(self, count: int) -> None:
+        _top = tk.Toplevel(self.root)
+        _frame = FrameScroll(_top)
+
+        def _pack() -> None:
+            for i in range(count):
+                ttk.Label(_frame.interior, text=f"Label {i}").pack()
+
+        def _scroll() -> None:
+            _frame.canvas.yview_moveto(1.0)
+
+        self.step("frame", count, "insert", None, _pack)
+        self.step("frame", count, "scroll-to-end", None, _scroll)
+        _top.destroy()
+
+        _top = tk.Toplevel(self.root)
+
+        def _row(master: tk.Misc, index: int,
+                recycled: tk.Widget | None) -> tk.Widget:
+            _label = recycled or ttk.Label(master)
+            _label.configure(text=f"Label {index}")
+            return _label
+
+        def _build() -> None:
+            FrameScroll(_top, row_factory=_row, row_count=count)
+
+        def _scroll_virtual() -> None:
+            _top.winfo_children()[0].canvas.yview_moveto(1.0)
+            self.root.update_idletasks()
+
+        self.step("vframe", count, "insert", None, _build)
+        self.step("vframe", count, "scroll-to-end", None, _scroll_virtual)
+        _top.destroy()
+
+
+def regressions(results: List[Dict[str, Any]], baseline: Dict[str, Any],
+        max_ratios: Dict[str, float]) -> List[str]:
+    '''
+    steps with a measure (a key of max_ratios) above its ratio times
+    the baseline's
+    '''
+    _old = {(r["mode"], r["rows"], r["step"]): r
+            for r in baseline["results"]}
+    _worse = []
+    for r in results:
+        _before = _old.get((r["mode"], r["rows"], r["step"]))
+        if _before is None:
+            continue
+        for _measure, _ratio in max_ratios.items():
+            _was, _now = _before.get(_measure), r[_measure]
+            if _was is None or _now is None or _now < NOISE[_measure]:
+                continue
+            if _now > _was * _ratio:
+                _worse.append(f"{r['mode']} {r['rows']:,} {r['step']} "
+                              f"{_measure}: {_was} -> {_now}")
+    return _worse
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__,
+            formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default=",".join(map(str, SIZES)),
+            help="comma separated row counts")
+    parser.add_argument("--modes", default=",".join(MODES),
+            help=f"comma separated, from {', '.join(MODES)}")
+    parser.add_argument("--single-rows", type=int, default=1_000,
+            help="rows added one insert_row call at a time")
+    parser.add_argument("--frame-rows", type=int, default=5_000,
+            help="rows of widgets for the FrameScroll steps, 0 to skip")
+    parser.add_argument("--json", help="write the results to this file")
+    parser.add_argument("--baseline", help="results file to compare with")
+    parser.add_argument("--max-ratio", type=float, default=1.25,
+            help="slowest allowed time as a multiple of the baseline's")
+    parser.add_argument("--max-call-ratio", type=float, default=1.1,
+            help="most Tcl calls allowed as a multiple of the baseline's")
+    parser.add_argument("--max-rss-ratio", type=float, default=1.25,
+            help="highest peak RSS allowed as a multiple of the baseline's")
+    args = parser.parse_args()
+
+    root = tk.Tk()
+    root.geometry("800x600")
+    suite = Suite(root, args.single_rows)
+    for mode in args.modes.split(","):
+        if mode not in MODES:
+            parser.error(f"unknown mode {mode!r}")
+        for size in map(int, args.sizes.split(",")):
+            suite.table(mode, size)
+    if args.frame_rows:
+        suite.frame(args.frame_rows)
+    tk_version = root.tk.call("info", "patchlevel")
+    root.destroy()
+
+    output = {"python": platform.python_version(),
+              "tk": tk_version,
+              "platform": platform.platform(),
+              "numpy": np is not None,
+              "results": suite.results}
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(output, f, indent=1)
+    if args.baseline:
+        with open(args.baseline) as f:
+            worse = regressions(suite.results, json.load(f),
+                    {"seconds": args.max_ratio,
+                     "tcl_calls": args.max_call_ratio,
+                     "peak_rss_mb": args.max_rss_ratio})
+        for line in worse:
+            print(f"FAIL: {line}")
+        if worse:
+            return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,128 @@
+# Copyright (c) 2024 kbt | terminus, LLC
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+'''
+Benchmark for Tab navigation between cells (next_cell_tab).
+
+Counts the Tcl calls one Tab press makes on a small and a large
+table. Cell reads come from the model, so the count should not grow
+with the table. Needs a display. On a headless Linux box:
+
+    xvfb-run python benchmarks/bench_tab_calls.py
+
+Exits with status 1 if a Tab makes more than --max-calls Tcl calls or
+makes more on the large table than on the small one.
+'''
+
+import argparse
+import os
+import sys
+import time
+import tkinter as tk
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__),
+        "..", "src", "tkinter_extensions"))
+from tk_treeview_table import TreeviewTable
+
+
+class CountingTk:
+    '''wraps a tkapp and counts the calls made through it'''
+
+    def __init__(self, tkapp):
+        self._tkapp = tkapp
+        self.calls = 0
+
+    def call(self, *args):
+        self.calls += 1
+        return self._tkapp.call(*args)
+
+    def __getattr__(self, name):
+        return getattr(self._tkapp, name)
+
+def new_table(root: tk.Tk, count: int, virtual: bool) -> TreeviewTable:
+    table = TreeviewTable(root, root, flat=virtual, virtual=virtual,
+            height=20,
+            columns=("id", "name", "number", "text"))
+    # virtual tables are flat, the others get one group
+    parent = "" if virtual else \
+            table.insert_row(parent="", index=tk.END, text="group")
+    table.insert_rows(parent, [(i, f"name {i}", i * 3 % 1000, "text")
+                               for i in range(count)])
+    table.pack()
+    root.update()
+    table.selected_iid = table.model.children(parent)[0]
+    table.selected_column = "#1"
+    return table
+
+def close_editors(table: TreeviewTable) -> None:
+    # the editor is pooled, hide it without writing
+    table.editor.cancel()
+
+def count_tabs(root: tk.Tk, count: int, tabs: int,
+        virtual: bool) -> tuple[float, float]:
+    '''returns (Tcl calls per Tab, ms per Tab)'''
+    table = new_table(root, count, virtual)
+    counter = CountingTk(table.tk)
+    table.tk = counter
+    calls = 0
+    elapsed = 0.0
+    for _ in range(tabs):
+        counter.calls = 0
+        start = time.perf_counter()
+        table.next_cell_tab(None)
+        # includes the idle work a Tab schedules, e.g. a render
+        root.update_idletasks()
+        elapsed += time.perf_counter() - start
+        calls += counter.calls
+        close_editors(table)
+    table.tk = counter._tkapp
+    table.destroy()
+    return calls / tabs, elapsed * 1000 / tabs
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__,
+            formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--small", type=int, default=100)
+    parser.add_argument("--large", type=int, default=100_000)
+    parser.add_argument("--tabs", type=int, default=200)
+    parser.add_argument("--max-calls", type=float, default=20,
+            help="most Tcl calls allowed per Tab")
+    args = parser.parse_args()
+
+    root = tk.Tk()
+    failed = False
+    for virtual in (False, True):
+        mode = "virtual" if virtual else "plain"
+        small, _ = count_tabs(root, args.small, args.tabs, virtual)
+        large, ms = count_tabs(root, args.large, args.tabs, virtual)
+        print(f"{mode:7}: {small:.1f} calls/Tab at {args.small:,} rows, "
+              f"{large:.1f} at {args.large:,} rows ({ms:.2f} ms/Tab)")
+        if large > args.max_calls or large > small + 0.5:
+            failed = True
+    root.destroy()
+
+    if failed:
+        print(f"FAIL: a Tab made more than {args.max_calls:g} calls or "
+              f"more calls on the large table")
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,236 @@
+# Copyright (c) 2024 kbt | terminus, LLC
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import tkinter as tk
+from tkinter import ttk
+from typing import Any, Dict, Tuple, Callable, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from tk_treeview_table import TreeviewTable
+
+EDITOR_KINDS = ("entry", "combobox", "spinbox")
+
+# options set_column_editor accepts for each kind
+EDITOR_OPTIONS = {
+        "entry": (),
+        "combobox": ("values",),
+        "spinbox": ("from_", "to", "increment"),
+        }
+
+# takes the edited text, returns False to reject it
+Validator = Callable[[str], bool]
+
+ColumnEditor = Tuple[str, Dict[str, Any], Validator | None]
+
+_DEFAULT: ColumnEditor = ("entry", {}, None)
+
+_FACTORIES: Dict[str, Callable[[tk.Misc], tk.Widget]] = {
+        "entry": tk.Entry,
+        "combobox": ttk.Combobox,
+        "spinbox": tk.Spinbox,
+        }
+
+
+def is_number(text: str) -> bool:
+    '''blank, or a number. Accepts thousands separators.'''
+    if text.strip() == "":
+        return True
+    try:
+        float(text.replace(",", ""))
+    except ValueError:
+        return False
+    return True
+
+
+class CellEditor:
+    '''
+    The inline cell editor of a TreeviewTable.
+
+    One widget of each kind is built the first time it is needed and
+    reused: opening the editor on a cell fills and places it, closing
+    it only hides it. Nothing is created or destroyed per edit, so
+    tabbing quickly through cells can't leave stray editors behind.
+
+    Each column has an editor kind ("entry" by default, "combobox" or
+    "spinbox") and an optional validator. Text that fails the
+    validator is not written: Return and Tab ring the bell and keep
+    the editor open, losing focus discards the edit. Text holding
+    several cells (tabs or newlines, as pasted from a spreadsheet)
+    is not validated.
+
+    Parameters:
+        table -> the TreeviewTable being edited
+        on_accept -> called with the accepted text, after the
+            table's selected_iid and selected_column are set back
+            to the edited cell
+    '''
+
+    def __init__(self, table: "TreeviewTable",
+            on_accept: Callable[[str], Any]):
+        self.table = table
+        self.on_accept = on_accept
+        self.iid: str = ""
+        self.column: str = "#0"
+        # the widget shown, None while closed
+        self.widget: tk.Widget | None = None
+        self._widgets: Dict[str, tk.Widget] = {}
+        # options of each widget as built, and as last configured
+        self._defaults: Dict[str, Dict[str, Any]] = {}
+        self._applied: Dict[str, Dict[str, Any]] = {}
+        self._columns: Dict[int, ColumnEditor] = {}
+
+    @property
+    def active(self) -> bool:
+        return self.widget is not None
+
+    def set_column_editor(self, col: str | int, kind: str = "entry", *,
+            validate: Validator | None = None, **options) -> None:
+        '''
+        editor for a column. A combobox takes values=, a spinbox
+        from_=, to= and increment= and checks for numbers unless
+        given another validate.
+        '''
+        if kind not in EDITOR_KINDS:
+            raise ValueError(f"unknown editor {kind!r}, "
+                             f"expected one of {list(EDITOR_KINDS)}")
+        _unknown = set(options) - set(EDITOR_OPTIONS[kind])
+        if _unknown:
+            raise ValueError(f"{kind} does not take {sorted(_unknown)}")
+        if kind == "spinbox" and validate is None:
+            validate = is_number
+        self._columns[self.table.model.column_index(col)] = \
+                (kind, options, validate)
+
+    def column_editor(self, col: str | int) -> ColumnEditor:
+        return self._columns.get(self.table.model.column_index(col),
+                                 _DEFAULT)
+
+    def _widget(self, kind: str) -> tk.Widget:
+        _widget = self._widgets.get(kind)
+        if _widget is None:
+            _widget = _FACTORIES[kind](self.table)
+            _widget.bind("<Return>", self._return)
+            _widget.bind("<KP_Enter>", self._return)
+            _widget.bind("<Tab>", self._tab)
+            _widget.bind("<Escape>", self.cancel)
+            _widget.bind("<FocusOut>", self._focus_out)
+            self._widgets[kind] = _widget
+            self._defaults[kind] = self._applied[kind] = \
+                    {o: _widget.cget(o.rstrip("_"))
+                     for o in EDITOR_OPTIONS[kind]}
+        return _widget
+
+    def open(self, iid: str, column: str, text: str,
+            box: Tuple[int, int, int, int]) -> None:
+        '''show the editor over box holding text, to edit a cell'''
+        self.finish()
+        _kind, _options, _ = self.column_editor(column)
+        _widget = self._widget(_kind)
+        # the widget is shared by columns, so options another column
+        # set go back to their defaults
+        _options = {**self._defaults[_kind], **_options}
+        if _options != self._applied[_kind]:
+            _widget.configure(**_options)
+            self._applied[_kind] = _options
+        _widget.delete(0, tk.END)
+        _widget.insert(0, text)
+        _widget.selection_range(0, tk.END)
+        _widget.place(x=box[0], y=box[1], w=box[2], h=box[3])
+        _widget.focus_set()
+        self.iid = iid
+        self.column = column
+        self.widget = _widget
+
+    def valid(self, text: str) -> bool:
+        '''True if text may be written to the cell being edited'''
+        _validate = self.column_editor(self.column)[2]
+        if _validate is None or "\t" in text or "\n" in text:
+            return True
+        try:
+            return bool(_validate(text))
+        except Exception:
+            return False
+
+    def accept(self) -> bool:
+        '''
+        write the text and close. Returns False and stays open if
+        the text is not valid.
+        '''
+        if self.widget is None:
+            return True
+        _text = self.widget.get()
+        if not self.valid(_text):
+            self.widget.bell()
+            self.widget.selection_range(0, tk.END)
+            return False
+        self._close()
+        self.table.selected_iid = self.iid
+        self.table.selected_column = self.column
+        self.on_accept(_text)
+        return True
+
+    def cancel(self, event=None) -> str:
+        '''close without writing'''
+        self._close()
+        return "break"
+
+    def finish(self) -> None:
+        '''accept the edit if it's valid, otherwise discard it'''
+        if not self.accept():
+            self._close()
+
+    def release(self, widget: tk.Widget) -> None:
+        '''done with an editor widget: hide it if it's ours'''
+        if widget in self._widgets.values():
+            if widget is self.widget:
+                self._close()
+        else:
+            widget.destroy()
+
+    def _close(self) -> None:
+        if self.widget is None:
+            return
+        _widget = self.widget
+        self.widget = None
+        _widget.place_forget()
+        if self.table.tk.call("focus") == str(_widget):
+            self.table.focus_set()
+
+    def _return(self, event=None) -> str:
+        self.accept()
+        return "break"
+
+    def _tab(self, event=None) -> str:
+        if self.accept():
+            self.table.next_cell_tab(None)
+        return "break"
+
+    def _focus_out(self, event=None) -> None:
+        # a combobox drop down takes the focus too, so check where
+        # it went once the focus events are done
+        self.table.after_idle(self._check_focus)
+
+    def _check_focus(self) -> None:
+        if self.widget is None or not self.widget.winfo_exists():
+            return
+        _focus = str(self.table.tk.call("focus"))
+        _path = str(self.widget)
+        if _focus != _path and not _focus.startswith(_path + "."):
+            self.finish()
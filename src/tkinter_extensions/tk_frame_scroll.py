@@ -18,10 +18,26 @@
 # OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 # SOFTWARE.
 
-from typing import Any, List, Dict, Tuple, Literal
+from bisect import bisect_left, bisect_right
+from itertools import accumulate, chain
+from typing import Any, List, Dict, Tuple, Literal, Callable
 import tkinter as tk
 from tkinter import ttk
 from tk_treeview_table import TreeviewTable
+from tk_scroll_controller import ScrollController
+
+# builds the widget for row index as a child of master, or updates
+# and returns the recycled widget it is given
+RowFactory = Callable[[tk.Misc, int, tk.Widget | None], tk.Widget]
+
+# estimated height of row index in pixels
+HeightEstimator = Callable[[int], int]
+
+# rows rendered above and below the visible ones
+OVERSCAN_ROWS = 5
+
+# y a recycled row waits at, out of the scroll region
+_PARKED = -100_000
 
 class FrameScroll(tk.Frame):
     '''
@@ -32,16 +48,42 @@ class FrameScroll(tk.Frame):
             'canvas' w/scroll bar containing
                 'interior' - tk frame that can be populated
 
+    With a row_factory the frame is virtual: 'interior' is not
+    used and only the rows in view, plus overscan rows above and
+    below, exist as widgets. Rows scrolled out of view are handed
+    back to row_factory to be reused for the rows scrolled in. The
+    scroll region comes from the row heights: row_height pixels
+    each, or a function estimating each row's height. Estimated
+    rows are measured once shown and the estimate is corrected.
+
     Parameters:
         parent -> the parent Tk object
+        row_factory -> makes or recycles the widget of a row
+        row_count -> rows in a virtual frame
+        row_height -> pixels per row, or an estimator taking a row
+            index. Fixed heights are enforced.
+        overscan -> rows rendered beyond the visible ones
+        smooth -> scroll a pixel at a time, eased over a few frames
+        kinetic -> keep scrolling after the wheel stops, slowing by
+            this factor a frame. See ScrollController.
         ttk.Frame args or kwargs
     '''
 
     def __init__(self, parent: ttk.Frame | ttk.Notebook,
             *args,
+            row_factory: RowFactory | None = None,
+            row_count: int = 0,
+            row_height: int | HeightEstimator = 24,
+            overscan: int = OVERSCAN_ROWS,
+            smooth: bool = False,
+            kinetic: float = 0.0,
             **kwargs):
         super().__init__(parent, *args, **kwargs)
         self.parent = parent
+        self.row_factory = row_factory
+        self.virtual = row_factory is not None
+        self.row_height = row_height
+        self.overscan = overscan
 
         self.canvas = tk.Canvas(self, bd=0,
                 highlightthickness=0)
@@ -51,46 +93,233 @@ class FrameScroll(tk.Frame):
         self.canvas.yview_moveto(0)
 
         self.interior = ttk.Frame(self.canvas, padding= "2 2 12 12")
-        self.interior_id = self.canvas.create_window(0,0,
-                window=self.interior,
-                anchor=tk.NW)
 
         self.scrollbar = ttk.Scrollbar(self, orient=tk.VERTICAL,
                 command=self.canvas.yview)
-        self.canvas['yscrollcommand'] = self.scrollbar.set
         self.scrollbar.pack(fill=tk.Y, side= tk.RIGHT, expand= tk.FALSE)
 
-
-        self.interior.bind('<Configure>', self.configure_interior)
-        self.canvas.bind('<Configure>', self.configure_canvas)
-        self.bind('<Enter>', self.bound_to_mousewheel)
-        self.bind('<Leave>', self.unbound_to_mousewheel)
+        if self.virtual:
+            # row index -> (widget, canvas item) for rows shown, and
+            # rows waiting to be reused
+            self._rows: Dict[int, Tuple[tk.Widget, int]] = {}
+            self._pool: List[Tuple[tk.Widget, int]] = []
+            self._heights: List[int] = []
+            # y of each row, and the total height last
+            self._offsets: List[int] = [0]
+            self._render_pending: bool = False
+            self._measure_pending: bool = False
+            self.canvas['yscrollcommand'] = self._virtual_yscroll
+            self.canvas.bind('<Configure>', self._virtual_configure)
+            self.set_row_count(row_count)
+        else:
+            # geometry last sent to Tk, and passes made
+            self._geometry_pending: bool = False
+            self._scrollregion: Tuple[int, int, int, int] | None = None
+            self._canvas_width: int | None = None
+            self._interior_width: int | None = None
+            self.geometry_passes: int = 0
+            self.interior_id = self.canvas.create_window(0,0,
+                    window=self.interior,
+                    anchor=tk.NW)
+            self.canvas['yscrollcommand'] = self.scrollbar.set
+            self.interior.bind('<Configure>', self.configure_interior)
+            self.canvas.bind('<Configure>', self.configure_canvas)
+        # a notch scrolls 40 pixels, in pixels when smooth
+        _increment = 1 if smooth else 20
+        self.canvas.config(yscrollincrement=_increment)
+        self.scroller = ScrollController(self,
+                lambda units: self.canvas.yview_scroll(units, "units"),
+                units_per_notch=40 / _increment,
+                pixels_per_unit=_increment,
+                smooth=smooth, kinetic=kinetic)
 
         self.pack()
 
+    # <Configure> comes in bursts while a window is resized or
+    # children are packed. Each burst is handled once, when idle,
+    # and only settings that changed are sent to Tk.
+
     def configure_interior(self, event) -> None:
-            _size = (self.interior.winfo_reqwidth(),
-                     self.interior.winfo_reqheight())
-            self.canvas.config(scrollregion=(0, 0, _size[0], _size[1]))
-            if (self.interior.winfo_reqwidth() !=
-                    self.canvas.winfo_width()):
-                self.canvas.config(
-                        width=self.interior.winfo_reqwidth())
+        self._schedule_geometry()
 
     def configure_canvas(self, event) -> None:
-            if (self.interior.winfo_reqwidth() !=
-                    self.canvas.winfo_width()):
-                self.canvas.itemconfigure(self.interior_id,
-                        width=self.canvas.winfo_width())
+        self._schedule_geometry()
+
+    def _schedule_geometry(self) -> None:
+        if not self._geometry_pending:
+            self._geometry_pending = True
+            self.after_idle(self._update_geometry)
+
+    def _update_geometry(self) -> None:
+        '''fit the scroll region and widths to the interior, measuring once'''
+        self._geometry_pending = False
+        self.geometry_passes += 1
+        # children packed since the last pass scroll too
+        self.scroller.attach(self.interior)
+        _width = self.interior.winfo_reqwidth()
+        _height = self.interior.winfo_reqheight()
+        _canvas_width = self.canvas.winfo_width()
+        _region = (0, 0, _width, _height)
+        if _region != self._scrollregion:
+            self._scrollregion = _region
+            self.canvas.config(scrollregion=_region)
+        if _width == _canvas_width:
+            return
+        if _width != self._canvas_width:
+            # ask for room for the interior
+            self._canvas_width = _width
+            self.canvas.config(width=_width)
+        if _canvas_width != self._interior_width:
+            # and stretch it to the room given
+            self._interior_width = _canvas_width
+            self.canvas.itemconfigure(self.interior_id, width=_canvas_width)
+
+    # Virtual mode. Rows are canvas window items at the y offsets
+    # the row heights give, so the canvas scrolls them itself and
+    # only which rows exist changes as it does.
+
+    def set_row_count(self, count: int) -> None:
+        '''number of rows in a virtual frame. Shown rows are rebuilt.'''
+        self.row_count = count
+        if callable(self.row_height):
+            self._heights = [int(self.row_height(i)) for i in range(count)]
+        else:
+            self._heights = [int(self.row_height)] * count
+        self._offsets = [0, *accumulate(self._heights)]
+        self._release_rows(list(self._rows))
+        self._set_scrollregion()
+        self._schedule_render()
+
+    def refresh_rows(self) -> None:
+        '''call row_factory again for the rows shown, e.g. after
+           their data changed'''
+        for _index, (_widget, _item) in list(self._rows.items()):
+            self._place_row(_index, _widget, _item)
+
+    def clear(self) -> None:
+        '''destroy the content: interior's children, or a virtual frame's rows'''
+        if not self.virtual:
+            for _child in self.interior.winfo_children():
+                _child.destroy()
+            return
+        self._release_rows(list(self._rows))
+        for _widget, _item in self._pool:
+            self.canvas.delete(_item)
+            _widget.destroy()
+        self._pool.clear()
+        self.set_row_count(0)
+
+    def see_row(self, index: int) -> None:
+        '''scroll a virtual frame so row index is in view'''
+        _top = self.canvas.canvasy(0)
+        _height = self.canvas.winfo_height()
+        _y = self._offsets[index]
+        if _y < _top:
+            self.canvas.yview_moveto(_y / max(1, self._offsets[-1]))
+        elif _y + self._heights[index] > _top + _height:
+            self.canvas.yview_moveto((_y + self._heights[index] - _height)
+                                     / max(1, self._offsets[-1]))
+
+    def _set_scrollregion(self) -> None:
+        self.canvas.config(scrollregion=(0, 0,
+                self.canvas.winfo_width(), self._offsets[-1]))
 
-    def bound_to_mousewheel(self, event):
-        self.canvas.bind_all('<MouseWheel>', self.on_mousewheel)
+    def _virtual_yscroll(self, first, last) -> None:
+        self.scrollbar.set(first, last)
+        self._schedule_render()
 
-    def unbound_to_mousewheel(self, event):
-        self.canvas.unbind_all('<MouseWheel>')
+    def _virtual_configure(self, event) -> None:
+        # parked rows too, or they come back at the old width
+        for _widget, _item in chain(self._rows.values(), self._pool):
+            self.canvas.itemconfigure(_item, width=event.width)
+        self._set_scrollregion()
+        self._schedule_render()
+
+    def _schedule_render(self) -> None:
+        if not self._render_pending:
+            self._render_pending = True
+            self.after_idle(self._render)
+
+    def _visible_rows(self) -> range:
+        '''rows in view plus overscan'''
+        _top = self.canvas.canvasy(0)
+        _bottom = _top + self.canvas.winfo_height()
+        _first = max(0, bisect_right(self._offsets, _top) - 1 - self.overscan)
+        _last = min(self.row_count,
+                    bisect_left(self._offsets, _bottom) + self.overscan)
+        return range(_first, _last)
+
+    def _render(self) -> None:
+        '''create or recycle widgets for the rows in view'''
+        self._render_pending = False
+        _rows = self._visible_rows()
+        self._release_rows([i for i in self._rows if i not in _rows])
+        _new = [i for i in _rows if i not in self._rows]
+        for _index in _new:
+            _widget, _item = self._pool.pop() if self._pool else (None, None)
+            self._place_row(_index, _widget, _item)
+        if _new and callable(self.row_height) and not self._measure_pending:
+            self._measure_pending = True
+            self.after_idle(self._measure)
+
+    def _place_row(self, index: int, widget: tk.Widget | None,
+            item: int | None) -> None:
+        '''build row index with row_factory, reusing widget if given'''
+        _widget = self.row_factory(self.canvas, index, widget)
+        if _widget is not widget and widget is not None:
+            # the factory made a new widget instead
+            self.canvas.delete(item)
+            widget.destroy()
+            item = None
+        if item is None:
+            _options = {} if callable(self.row_height) else \
+                    {"height": self._heights[index]}
+            item = self.canvas.create_window(0, self._offsets[index],
+                    window=_widget, anchor=tk.NW,
+                    width=self.canvas.winfo_width(), **_options)
+            self.scroller.attach(_widget)
+        else:
+            self.canvas.coords(item, 0, self._offsets[index])
+        self._rows[index] = (_widget, item)
+
+    def _release_rows(self, indexes: List[int]) -> None:
+        '''park rows out of view for reuse'''
+        for _index in indexes:
+            _widget, _item = self._rows.pop(_index)
+            self.canvas.coords(_item, 0, _PARKED)
+            self._pool.append((_widget, _item))
+
+    def _measure(self) -> None:
+        '''correct estimated heights with the heights of rows shown'''
+        self._measure_pending = False
+        _changed = [(i, w.winfo_reqheight()) for i, (w, _) in
+                    self._rows.items()
+                    if w.winfo_reqheight() != self._heights[i]]
+        if not _changed:
+            return
+        for _index, _height in _changed:
+            self._heights[_index] = _height
+        _first = min(i for i, _ in _changed)
+        self._offsets[_first + 1:] = list(accumulate(
+                self._heights[_first:], initial=self._offsets[_first]))[1:]
+        for _index, (_widget, _item) in self._rows.items():
+            self.canvas.coords(_item, 0, self._offsets[_index])
+        self._set_scrollregion()
+        self._schedule_render()
+
+    def bound_to_mousewheel(self, event=None) -> None:
+        '''
+        scroll on wheel events over any child of the frame. Children
+        of interior are attached when the interior is resized; call
+        this after adding widgets that don't change its size.
+        '''
+        self.scroller.attach(self)
+
+    def unbound_to_mousewheel(self, event=None) -> None:
+        '''nothing to undo, the bindings are per widget'''
 
     def on_mousewheel(self, event) -> None:
-        self.canvas.yview_scroll(int(-1*(event.delta/120)), "units")
+        self.scroller._wheel(event)
 
 
 def end_program(event, root) -> None:
@@ -129,6 +358,29 @@ def frame_example(root: tk.Tk) -> None:
 
     root.mainloop()
 
+def virtual_example(root: tk.Tk, rows: int = 5_000) -> None:
+    '''a virtual FrameScroll with a label and a button per row'''
+    mainframe = ttk.Frame(root, padding = "2 2 12 12")
+    mainframe.pack(expand=1, fill="both")
+
+    def _row(master: tk.Misc, index: int,
+            recycled: tk.Widget | None) -> tk.Widget:
+        _row_frame = recycled or ttk.Frame(master)
+        if recycled is None:
+            ttk.Label(_row_frame, width=12).pack(side=tk.LEFT)
+            ttk.Button(_row_frame).pack(side=tk.LEFT)
+        _label, _button = _row_frame.winfo_children()
+        _label.configure(text=f"Row {index}")
+        _button.configure(text=f"Button {index}",
+                command=lambda: print(f"clicked {index}"))
+        return _row_frame
+
+    frame = FrameScroll(mainframe, row_factory=_row, row_count=rows,
+            row_height=30)
+    frame.pack(expand=1, fill="both")
+
+    root.mainloop()
+
 def main() -> int:
     '''example program'''
     root = tk.Tk()
@@ -0,0 +1,201 @@
+# Copyright (c) 2024 kbt | terminus, LLC
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Callable
+import tkinter as tk
+from tkinter import ttk
+from tk_frame_scroll import FrameScroll
+
+# tabs with content kept built, see LazyNotebook
+LIVE_TABS = 8
+
+# builds a tab's content into its FrameScroll. state is the tab's
+# own dict, kept while the content is torn down, for anything that
+# makes building it again fast.
+TabBuilder = Callable[[FrameScroll, Dict[str, Any]], Any]
+
+# saves what the content holds (e.g. entry text) into state before
+# it is torn down
+TabSaver = Callable[[FrameScroll, Dict[str, Any]], Any]
+
+
+class LazyTab:
+    '''
+    A tab of a LazyNotebook. state and the scroll position are kept
+    while the content is torn down.
+    '''
+
+    def __init__(self, frame: FrameScroll, build: TabBuilder,
+            save: TabSaver | None = None):
+        self.frame = frame
+        self.build = build
+        self.save = save
+        self.state: Dict[str, Any] = {}
+        self.built: bool = False
+        self.builds: int = 0
+        self.yview: float = 0.0
+        # when the tab was last shown or left, time.monotonic()
+        self.shown_at: float = 0.0
+
+
+class LazyNotebook(ttk.Notebook):
+    '''
+    A ttk.Notebook of FrameScroll tabs whose content is built when
+    the tab is first shown (<<NotebookTabChanged>>), not when it is
+    added.
+
+    At most max_live tabs keep their content. Showing another tears
+    down the one shown least recently. With idle_ms, tabs that have
+    not been shown for that long are torn down too. A torn down tab
+    is built again the next time it is shown, with its state dict,
+    which the builder can use to keep data it loaded, and its scroll
+    position.
+
+    Parameters:
+        parent -> the parent Tk object
+        max_live -> tabs with content kept, None for no limit
+        idle_ms -> tear down tabs not shown for this long, None to
+            keep them
+        ttk.Notebook kwargs
+    '''
+
+    def __init__(self, parent: tk.Misc, *, max_live: int | None = LIVE_TABS,
+            idle_ms: int | None = None, **kw):
+        super().__init__(parent, **kw)
+        self.max_live = max_live
+        self.idle_ms = idle_ms
+        self.tabs_by_name: Dict[str, LazyTab] = {}
+        # tabs with content, least recently shown first
+        self._live: OrderedDict[str, None] = OrderedDict()
+        self._current: str = ""
+        self._expire_id: str | None = None
+        self.bind("<<NotebookTabChanged>>", self._tab_changed)
+
+    def add_tab(self, text: str, build: TabBuilder, *,
+            save: TabSaver | None = None, **frame_kw) -> LazyTab:
+        '''add a tab built by build when first shown. frame_kw go to
+           its FrameScroll, e.g. a row_factory.'''
+        _frame = FrameScroll(self, **frame_kw)
+        self.add(_frame, text=text)
+        _tab = LazyTab(_frame, build, save)
+        self.tabs_by_name[str(_frame)] = _tab
+        return _tab
+
+    def remove_tab(self, tab: LazyTab) -> None:
+        _name = str(tab.frame)
+        self.forget(tab.frame)
+        self._live.pop(_name, None)
+        del self.tabs_by_name[_name]
+        tab.frame.destroy()
+
+    def current_tab(self) -> LazyTab | None:
+        return self.tabs_by_name.get(str(self.select()))
+
+    def build_tab(self, tab: LazyTab) -> None:
+        '''build a tab's content now, if it isn't built'''
+        if tab.built:
+            return
+        tab.build(tab.frame, tab.state)
+        tab.built = True
+        tab.builds += 1
+        self._live[str(tab.frame)] = None
+        if tab.yview:
+            # once the content has its size
+            _yview = tab.yview
+            tab.frame.after_idle(
+                    lambda: tab.frame.canvas.yview_moveto(_yview))
+
+    def unload_tab(self, tab: LazyTab) -> None:
+        '''tear down a tab's content, keeping its state'''
+        if not tab.built:
+            return
+        if tab.save is not None:
+            tab.save(tab.frame, tab.state)
+        tab.yview = tab.frame.canvas.yview()[0]
+        tab.frame.clear()
+        tab.built = False
+        self._live.pop(str(tab.frame), None)
+
+    def _tab_changed(self, event) -> None:
+        _now = time.monotonic()
+        _left = self.tabs_by_name.get(self._current)
+        if _left is not None:
+            _left.shown_at = _now
+        _tab = self.current_tab()
+        self._current = str(self.select())
+        if _tab is None:
+            return
+        _tab.shown_at = _now
+        self.build_tab(_tab)
+        self._live.move_to_end(self._current)
+        self._trim()
+        if self.idle_ms is not None and self._expire_id is None:
+            self._expire_id = self.after(self.idle_ms, self._expire)
+
+    def _trim(self) -> None:
+        '''tear down the tabs shown least recently past max_live'''
+        if self.max_live is None:
+            return
+        for _name in list(self._live):
+            if len(self._live) <= self.max_live:
+                break
+            if _name != self._current:
+                self.unload_tab(self.tabs_by_name[_name])
+
+    def _expire(self) -> None:
+        '''tear down the tabs not shown for idle_ms'''
+        self._expire_id = None
+        _cutoff = time.monotonic() - self.idle_ms / 1000
+        for _name in list(self._live):
+            _tab = self.tabs_by_name[_name]
+            if _name != self._current and _tab.shown_at <= _cutoff:
+                self.unload_tab(_tab)
+        if len(self._live) > 1:
+            self._expire_id = self.after(self.idle_ms, self._expire)
+
+
+def lazy_notebook_example(root: tk.Tk, tabs: int = 30) -> None:
+    '''30 tabs of buttons, built when shown. Only 5 stay built.'''
+    notebook = LazyNotebook(root, max_live=5, padding="2 2 12 12")
+    notebook.pack(expand=1, fill="both")
+
+    def _build(frame: FrameScroll, state: Dict[str, Any]) -> None:
+        # stands in for slow work, done once per tab
+        _names = state.setdefault("names",
+                [f"Button {j}" for j in range(200)])
+        for _name in _names:
+            ttk.Button(frame.interior, text=_name).pack()
+
+    for i in range(tabs):
+        notebook.add_tab(f"Tab {i}", _build)
+
+    root.mainloop()
+
+def main() -> int:
+    '''example program'''
+    root = tk.Tk()
+    root.bind('<Escape>', lambda e: root.destroy())
+    lazy_notebook_example(root)
+    return 0
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,186 @@
+# Copyright (c) 2024 kbt | terminus, LLC
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import math
+import sys
+import tkinter as tk
+from typing import Any, Callable
+from weakref import WeakKeyDictionary
+
+# milliseconds between scrolls, about one frame
+SCROLL_FRAME_MS = 16
+
+# with smooth scrolling, the share of the scroll still to do that is
+# done each frame
+SMOOTH_SHARE = 0.35
+
+# kinetic scrolling stops below this many units a frame
+KINETIC_STOP = 0.5
+
+# bindtags of controllers start with this
+TAG_PREFIX = "ScrollController"
+
+
+def wheel_notches(event) -> float:
+    '''notches a wheel event turned, positive to scroll down'''
+    if event.num == 4:
+        return -1.0
+    if event.num == 5:
+        return 1.0
+    if sys.platform == "darwin":
+        # small deltas, one per step
+        return -float(event.delta)
+    return -event.delta / 120
+
+
+class ScrollController:
+    '''
+    Wheel and drag scrolling for one widget, applied once a frame.
+
+    <MouseWheel>, X11's <Button-4>/<Button-5> and middle button drags
+    only add to a pending amount. Once a frame (through after()) the
+    whole units of it are scrolled in one call, so a fast trackpad
+    can't flood the event loop, and fractions of a notch add up.
+
+    The events are bound to a bindtag of the controller's own, put
+    on the widget ahead of its class and on its descendants by
+    attach(). A descendant that has a controller of its own keeps
+    it, so nested scrolling widgets scroll on their own. Nothing is
+    bound with bind_all. Each widget's bindtags are read once, and
+    descendants are found through tkinter's children dicts, so
+    attaching again only makes Tcl calls for widgets added since.
+
+    Parameters:
+        widget -> the widget to scroll
+        scroll -> called with a whole number of units to scroll
+        units_per_notch -> units one wheel notch scrolls
+        pixels_per_unit -> pixels of drag per unit
+        frame_ms -> milliseconds between scrolls
+        smooth -> ease into each scroll over a few frames. Best
+            with small (pixel) units.
+        kinetic -> keep scrolling after the input stops, slowing by
+            this factor (0 to 1) a frame. 0 is off.
+    '''
+
+    def __init__(self, widget: tk.Misc, scroll: Callable[[int], Any], *,
+            units_per_notch: float = 3,
+            pixels_per_unit: float = 20,
+            frame_ms: int = SCROLL_FRAME_MS,
+            smooth: bool = False,
+            kinetic: float = 0.0):
+        self.widget = widget
+        self.scroll = scroll
+        self.units_per_notch = units_per_notch
+        self.pixels_per_unit = pixels_per_unit
+        self.frame_ms = frame_ms
+        self.smooth = smooth
+        self.kinetic = kinetic
+        self.tag = f"{TAG_PREFIX}{id(self)}"
+        self._pending: float = 0.0
+        self._velocity: float = 0.0
+        self._drag_y: int | None = None
+        self._after_id: str | None = None
+        # widgets seen by attach, and whether they scroll with this
+        self._seen: WeakKeyDictionary[tk.Misc, bool] = WeakKeyDictionary()
+
+        for _sequence in ("<MouseWheel>", "<Button-4>", "<Button-5>"):
+            widget.bind_class(self.tag, _sequence, self._wheel)
+        widget.bind_class(self.tag, "<ButtonPress-2>", self._press)
+        widget.bind_class(self.tag, "<B2-Motion>", self._drag)
+        widget.bind("<Destroy>", self._destroyed, add="+")
+        self.attach(widget)
+
+    def attach(self, widget: tk.Misc, children: bool = True) -> None:
+        '''
+        scroll on widget's events, and its descendants' unless
+        children is False. Widgets seen before are skipped without
+        a Tcl call, so it's cheap to call again when children are
+        added.
+        '''
+        _ours = self._seen.get(widget)
+        if _ours is None:
+            _tags = widget.bindtags()
+            _owner = next((t for t in _tags if t.startswith(TAG_PREFIX)),
+                          None)
+            if _owner is None:
+                widget.bindtags((_tags[0], self.tag, *_tags[1:]))
+            # if owned by another controller it scrolls something else
+            _ours = self._seen[widget] = _owner in (None, self.tag)
+        if _ours and children:
+            for _child in list(widget.children.values()):
+                self.attach(_child)
+
+    def scroll_by(self, units: float) -> None:
+        '''add units to scroll at the next frame'''
+        self._pending += units
+        self._schedule()
+
+    def stop(self) -> None:
+        '''drop any scrolling not done yet'''
+        self._pending = 0.0
+        self._velocity = 0.0
+        if self._after_id is not None:
+            self.widget.after_cancel(self._after_id)
+            self._after_id = None
+
+    def _wheel(self, event) -> str:
+        self.scroll_by(wheel_notches(event) * self.units_per_notch)
+        return "break"
+
+    def _press(self, event) -> None:
+        self._drag_y = event.y_root
+        self._velocity = 0.0
+
+    def _drag(self, event) -> None:
+        if self._drag_y is None:
+            return
+        _moved = event.y_root - self._drag_y
+        self._drag_y = event.y_root
+        # the content follows the pointer
+        self.scroll_by(-_moved / self.pixels_per_unit)
+
+    def _schedule(self) -> None:
+        if self._after_id is None:
+            self._after_id = self.widget.after(self.frame_ms, self._apply)
+
+    def _apply(self) -> None:
+        '''scroll the whole units pending, once a frame'''
+        self._after_id = None
+        _step = self._pending * SMOOTH_SHARE if self.smooth \
+                else self._pending
+        if abs(_step) < 1 <= abs(self._pending):
+            _step = math.copysign(1, self._pending)
+        _units = int(_step)
+        self._pending -= _units
+        if _units:
+            self._velocity = _units
+        elif self.kinetic:
+            # coast once the input stops
+            self._velocity *= self.kinetic
+            _units = round(self._velocity)
+        if _units:
+            self.scroll(_units)
+        if abs(self._pending) >= 1 or \
+                self.kinetic and abs(self._velocity) >= KINETIC_STOP:
+            self._schedule()
+
+    def _destroyed(self, event) -> None:
+        if event.widget is self.widget:
+            self.stop()
@@ -0,0 +1,394 @@
+# Copyright (c) 2024 kbt | terminus, LLC
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import operator
+import re
+from collections import OrderedDict
+from itertools import compress, repeat
+from typing import Any, List, Dict, Tuple, Callable, Sequence
+from tk_table_model import TableModel, np
+
+# A condition is (col, kind, arg, case). kind is "contains" (arg is
+# the text), "regex" (a pattern, str or compiled), "between" (a
+# (low, high) pair of numbers, inclusive) or "where" (a function
+# taking the cell value). col None tests every column and matches
+# if any does.
+Condition = Tuple[str | int | None, str, Any, bool]
+
+FILTER_KINDS = ("contains", "regex", "between", "where")
+
+# edits to more rows than this drop cached row codes instead of
+# patching them
+PATCH_LIMIT = 1024
+
+# search results kept per column
+MASK_CACHE = 16
+
+
+class ColumnIndex:
+    '''
+    Inverted index of one column of a TableModel.
+
+    Each distinct cell text gets a code and each row slot holds the
+    code of its cell. A search tests every distinct text once and
+    maps the result back to rows with C level map calls, so rows
+    sharing a value cost nothing extra. The last MASK_CACHE results
+    are kept: repeating a search only tests texts added since, and
+    a "contains" search only tests the texts that matched a shorter
+    needle it contains, as when typing ahead. Kept up to date by the
+    model's listener events.
+    '''
+
+    def __init__(self, model: TableModel, index: int):
+        self.model = model
+        self.index = index
+        self.rebuild()
+
+    def rebuild(self) -> None:
+        '''index the whole column again, dropping unused texts'''
+        _strings = list(map(str, self.model.slot_column(self.index)))
+        self._codes: Dict[str, int] = dict.fromkeys(_strings)
+        self._texts: List[str] = list(self._codes)
+        self._codes.update(zip(self._texts, range(len(self._texts))))
+        self._folded: List[str] = list(map(str.casefold, self._texts))
+        # the value of each text, for "where", read when first needed
+        self._raw: List[Any] | None = None
+        self._numbers: List[float] = []
+        # built by numbers(), None until then
+        self._number_array: Any = None
+        self._masks: OrderedDict[Tuple[str, Any, bool], Any] = OrderedDict()
+        self._slot_codes: List[int] = list(map(self._codes.__getitem__,
+                _strings))
+
+    def _code(self, value: Any) -> int:
+        _text = str(value)
+        _code = self._codes.get(_text)
+        if _code is None:
+            _code = self._codes[_text] = len(self._texts)
+            self._texts.append(_text)
+            self._folded.append(_text.casefold())
+            if self._raw is not None:
+                self._raw.append(value)
+        return _code
+
+    def values(self) -> List[Any]:
+        '''the cell value each text was read from'''
+        if self._raw is None:
+            _column = self.model.slot_column(self.index)
+            _values = dict(zip(map(str, _column), _column))
+            self._raw = [_values.get(t, t) for t in self._texts]
+        return self._raw
+
+    def update(self, iids: Sequence[str]) -> None:
+        '''re-read the cells of iids'''
+        _column = self.model.slot_column(self.index)
+        _codes = self._slot_codes
+        if len(_codes) < len(_column):
+            _codes.extend([0] * (len(_column) - len(_codes)))
+        for _slot in self.model.slots(iids):
+            _codes[_slot] = self._code(_column[_slot])
+
+    @property
+    def stale(self) -> bool:
+        '''True once most of the indexed texts are no longer used'''
+        return len(self._texts) > 2 * len(self.model) + 1024
+
+    def mask(self, kind: str, arg: Any, case: bool = False) -> Any:
+        '''
+        for each code, whether its text passes the test. A NumPy bool
+        array when NumPy is installed, otherwise a list.
+        '''
+        if kind not in FILTER_KINDS:
+            raise ValueError(f"unknown filter kind {kind!r}, "
+                             f"expected one of {list(FILTER_KINDS)}")
+        if kind == "where":
+            # a predicate can change its mind, so is never kept
+            return _as_mask(list(map(_safe(arg), self.values())))
+        if kind == "contains":
+            arg = str(arg) if case else str(arg).casefold()
+        elif kind == "regex" and not isinstance(arg, re.Pattern):
+            arg = re.compile(arg, 0 if case else re.IGNORECASE)
+        elif kind == "between":
+            arg = tuple(arg)
+        _key = (kind, arg, case)
+        _mask = self._kept(_key)
+        if _mask is not None:
+            self._masks.move_to_end(_key)
+            return _mask
+        if kind == "contains":
+            _mask = self._narrow(arg, case)
+        if _mask is None:
+            _mask = self._test(kind, arg, case, 0)
+        self._masks[_key] = _mask
+        if len(self._masks) > MASK_CACHE:
+            self._masks.popitem(last=False)
+        return _mask
+
+    def _kept(self, key: Tuple[str, Any, bool]) -> Any:
+        '''a kept mask, extended to texts added since, or None'''
+        _mask = self._masks.get(key)
+        if _mask is not None and len(_mask) < len(self._texts):
+            _mask = self._masks[key] = _concat(_mask,
+                    self._test(*key, len(_mask)))
+        return _mask
+
+    def _narrow(self, needle: str, case: bool) -> Any:
+        '''
+        the "contains" mask of needle, testing only the texts that
+        contain the longest kept needle inside it. None if there is
+        no such needle.
+        '''
+        _keys = [k for k in self._masks
+                 if k[0] == "contains" and k[2] == case and k[1] in needle]
+        if not _keys:
+            return None
+        _prior = self._kept(max(_keys, key=lambda k: len(k[1])))
+        _texts = self._texts if case else self._folded
+        if np is not None:
+            _candidates = np.flatnonzero(_prior)
+            _hits = [needle in _texts[c] for c in _candidates.tolist()]
+            _mask = np.zeros(len(_texts), dtype=bool)
+            _mask[_candidates[np.asarray(_hits, dtype=bool)]] = True
+            return _mask
+        _mask = [False] * len(_texts)
+        for _code in compress(range(len(_prior)), _prior):
+            if needle in _texts[_code]:
+                _mask[_code] = True
+        return _mask
+
+    def _test(self, kind: str, arg: Any, case: bool, start: int) -> Any:
+        '''the mask of the texts from code start on'''
+        if kind == "contains":
+            _texts = self._texts if case else self._folded
+            return _as_mask(list(map(operator.contains,
+                    _texts[start:] if start else _texts, repeat(arg))))
+        if kind == "regex":
+            return _as_mask(list(map(bool, map(arg.search,
+                    self._texts[start:] if start else self._texts))))
+        _low, _high = arg
+        _numbers = self.numbers()[start:]
+        if np is not None:
+            return (_numbers >= _low) & (_numbers <= _high)
+        return [_low <= n <= _high for n in _numbers]
+
+    def numbers(self) -> Any:
+        '''
+        the number each text reads as, nan if it is not one. A NumPy
+        array when NumPy is installed, otherwise a list.
+        '''
+        if self._number_array is not None and \
+                len(self._numbers) == len(self._texts):
+            return self._number_array
+        _texts = self._texts[len(self._numbers):]
+        try:
+            self._numbers.extend(list(map(float, _texts)))
+        except ValueError:
+            for _text in _texts:
+                try:
+                    self._numbers.append(float(_text.replace(",", "")))
+                except ValueError:
+                    self._numbers.append(float("nan"))
+        self._number_array = self._numbers if np is None \
+                else np.asarray(self._numbers, dtype=float)
+        return self._number_array
+
+    def row_codes(self, slots: Sequence[int]) -> Any:
+        '''the code of each slot'''
+        _codes = list(map(self._slot_codes.__getitem__, slots))
+        if np is not None:
+            return np.asarray(_codes, dtype=np.intp)
+        return _codes
+
+def _safe(predicate: Callable[[Any], Any]) -> Callable[[Any], bool]:
+    '''a predicate that fails, instead of raising, on odd cells'''
+    def _test(value: Any) -> bool:
+        try:
+            return bool(predicate(value))
+        except (TypeError, ValueError):
+            return False
+    return _test
+
+
+class FilterEngine:
+    '''
+    Filtering and search for a TableModel.
+
+    Columns are indexed the first time they are searched and kept
+    up to date incrementally from then on, through the model's
+    listener events for inserts, edits, pastes and deletes. The
+    codes of each parent's rows are cached per column, extended by
+    appends and patched by small edits.
+
+    Parameters:
+        model -> the TableModel to search
+    '''
+
+    def __init__(self, model: TableModel):
+        self.model = model
+        self._indexes: Dict[int, ColumnIndex] = {}
+        # per parent its children and their slots, and per parent
+        # and column the codes of those children
+        self._slots: Dict[str, Tuple[Sequence[str], List[int]]] = {}
+        self._codes: Dict[Tuple[str, int], Any] = {}
+        model.subscribe(self._model_changed)
+
+    def column_index(self, col: str | int) -> ColumnIndex:
+        '''the index of a column, built if needed'''
+        _index = self.model.column_index(col)
+        _column = self._indexes.get(_index)
+        if _column is None:
+            _column = self._indexes[_index] = ColumnIndex(self.model, _index)
+        elif _column.stale:
+            _column.rebuild()
+            self._codes = {k: v for k, v in self._codes.items()
+                           if k[1] != _index}
+        return _column
+
+    def _row_codes(self, parent: str, index: int) -> Any:
+        _children = self.model.children(parent)
+        _cached = self._slots.get(parent)
+        if _cached is None or _cached[0] is not _children:
+            # new, or reordered since, e.g. by a sort
+            self._forget(parent)
+            _cached = self._slots[parent] = (_children,
+                    self.model.slots(_children))
+        _codes = self._codes.get((parent, index))
+        if _codes is None:
+            _codes = self._codes[(parent, index)] = \
+                    self.column_index(index).row_codes(_cached[1])
+        return _codes
+
+    def _hits(self, parent: str, col: str | int | None, kind: str,
+            arg: Any, case: bool, kept: Sequence[List[bool]] = ()) -> Any:
+        '''
+        for each child of parent, whether it passes. With kept, only
+        for the children passing each of those earlier hits in turn.
+        '''
+        if col is None:
+            _any = None
+            for i in range(-1, len(self.model.columns)):
+                _hits = self._hits(parent, i, kind, arg, case, kept)
+                _any = _hits if _any is None else _or(_any, _hits)
+            return _any
+        _index = self.model.column_index(col)
+        _mask = self.column_index(_index).mask(kind, arg, case)
+        _codes = self._row_codes(parent, _index)
+        if np is not None:
+            return _mask[_codes]
+        for _keep in kept:
+            _codes = compress(_codes, _keep)
+        return list(map(_mask.__getitem__, _codes))
+
+    def rows(self, parent: str,
+            conditions: Sequence[Condition]) -> List[str]:
+        '''the children of parent, in order, that pass every condition'''
+        _children = self.model.children(parent)
+        if not conditions:
+            return list(_children)
+        if np is not None:
+            _keep = None
+            for _col, _kind, _arg, _case in conditions:
+                _hits = self._hits(parent, _col, _kind, _arg, _case)
+                _keep = _hits if _keep is None else _keep & _hits
+            return list(compress(_children, _keep.tolist()))
+        # each condition only tests the rows passing those before
+        _rows = iter(_children)
+        _kept: List[List[bool]] = []
+        for _col, _kind, _arg, _case in conditions:
+            _hits = self._hits(parent, _col, _kind, _arg, _case, _kept)
+            _rows = compress(_rows, _hits)
+            _kept.append(_hits)
+        return list(_rows)
+
+    def search(self, parent: str, text: str,
+            col: str | int | None = None, case: bool = False) -> List[str]:
+        '''the children of parent, in order, with a cell containing text'''
+        return self.rows(parent, [(col, "contains", text, case)])
+
+    def _forget(self, parent: str) -> None:
+        self._slots.pop(parent, None)
+        self._codes = {k: v for k, v in self._codes.items()
+                       if k[0] != parent}
+
+    def _appended(self, parent: str, iids: Sequence[str]) -> bool:
+        '''extend the cache of parent by rows added at its end'''
+        _cached = self._slots.get(parent)
+        _children = self.model.children(parent)
+        if _cached is None or _cached[0] is not _children or \
+                len(_cached[1]) + len(iids) != len(_children) or \
+                self.model.index(iids[0]) != len(_cached[1]):
+            return False
+        _slots = self.model.slots(iids)
+        _cached[1].extend(_slots)
+        for (_parent, _index), _codes in list(self._codes.items()):
+            if _parent == parent:
+                self._codes[(_parent, _index)] = _concat(_codes,
+                        self._indexes[_index].row_codes(_slots))
+        return True
+
+    def _patch(self, iids: Sequence[str], columns: List[int]) -> None:
+        '''update the cached codes of edited rows'''
+        if len(iids) > PATCH_LIMIT:
+            self._codes = {k: v for k, v in self._codes.items()
+                           if k[1] not in columns}
+            return
+        for _iid, _slot in zip(iids, self.model.slots(iids)):
+            _parent = self.model.parent(_iid)
+            _position = None
+            for _index in columns:
+                _codes = self._codes.get((_parent, _index))
+                if _codes is not None:
+                    if _position is None:
+                        _position = self.model.index(_iid)
+                    _codes[_position] = self._indexes[_index]._slot_codes[_slot]
+
+    def _model_changed(self, event: str, parent: str | None,
+            iids: Sequence[str], col: int | None) -> None:
+        # deleted rows are never asked for, their slots are
+        # re-read when reused
+        if event == "insert":
+            for _index in self._indexes.values():
+                _index.update(iids)
+            if not self._appended(parent, iids):
+                self._forget(parent)
+        elif event == "delete":
+            self._forget(parent)
+            self._forget(iids[0])
+        else:
+            _columns = list(self._indexes) if col is None \
+                    else [col] if col in self._indexes else []
+            for _index in _columns:
+                self._indexes[_index].update(iids)
+            self._patch(iids, _columns)
+
+def _as_mask(hits: List[bool]) -> Any:
+    if np is not None:
+        return np.asarray(hits, dtype=bool)
+    return hits
+
+def _or(a: Any, b: Any) -> Any:
+    if np is not None:
+        return a | b
+    return list(map(operator.or_, a, b))
+
+def _concat(a: Any, b: Any) -> Any:
+    if np is not None:
+        return np.concatenate((a, b))
+    return a + b
@@ -0,0 +1,303 @@
+# Copyright (c) 2024 kbt | terminus, LLC
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+from typing import Any, Dict, List, Tuple, Iterable, Sequence, TYPE_CHECKING
+from tk_table_model import np
+
+if TYPE_CHECKING:
+    from tk_treeview_table import TreeviewTable
+
+AGGREGATES = ("count", "sum", "min", "max", "mean")
+
+# joins the key values of a group into its text
+GROUP_SEPARATOR = " / "
+
+# cached cell that is neither blank nor a number
+_TEXT = object()
+
+
+def parse_cell(value: Any) -> Any:
+    '''a cell as a float, None if blank or _TEXT for anything else'''
+    if value is None or value == "":
+        return None
+    try:
+        _number = float(value)
+    except (TypeError, ValueError):
+        return _TEXT
+    return _TEXT if _number != _number else _number
+
+def group_rows(rows: Iterable[Sequence[Any]],
+        key_cols: Sequence[int]) -> Dict[Tuple, List[Sequence[Any]]]:
+    '''split rows on the values of key columns, groups in first seen order'''
+    _groups: Dict[Tuple, List[Sequence[Any]]] = {}
+    for _row in rows:
+        _key = tuple(_row[i] if i < len(_row) else "" for i in key_cols)
+        _groups.setdefault(_key, []).append(_row)
+    return _groups
+
+def check_aggregates(aggregates: Dict[Any, str]) -> None:
+    '''raise ValueError for an aggregate not in AGGREGATES'''
+    for _kind in aggregates.values():
+        if _kind not in AGGREGATES:
+            raise ValueError(f"unknown aggregate {_kind!r}, "
+                             f"expected one of {list(AGGREGATES)}")
+
+def _format(number: float) -> Any:
+    _number = round(number, 10)
+    return int(_number) if _number.is_integer() else _number
+
+
+class _Stats:
+    '''running aggregates of one column of one group'''
+
+    __slots__ = ("cells", "count", "total", "low", "high")
+
+    def __init__(self):
+        self.cells: int = 0
+        self.count: int = 0
+        self.total: float = 0.0
+        self.low: float = float("inf")
+        self.high: float = float("-inf")
+
+    def add(self, cell: Any) -> None:
+        if cell is None:
+            return
+        self.cells += 1
+        if cell is not _TEXT:
+            self.count += 1
+            self.total += cell
+            self.low = min(self.low, cell)
+            self.high = max(self.high, cell)
+
+    def remove(self, cell: Any) -> bool:
+        '''take a cell out. False if min or max must be recomputed.'''
+        if cell is None:
+            return True
+        self.cells -= 1
+        if cell is _TEXT:
+            return True
+        self.count -= 1
+        self.total = self.total - cell if self.count else 0.0
+        return self.low < cell < self.high
+
+    def value(self, kind: str) -> Any:
+        if kind == "count":
+            return self.cells
+        if kind == "sum":
+            return _format(self.total)
+        if not self.count:
+            return ""
+        if kind == "min":
+            return _format(self.low)
+        if kind == "max":
+            return _format(self.high)
+        return _format(self.total / self.count)
+
+
+class GroupAggregates:
+    '''
+    Per group aggregates of a tree TreeviewTable, shown in the
+    group rows' values.
+
+    Built once over every group, with NumPy when it is installed.
+    After that the model's listener events update the aggregates of
+    the groups whose rows changed, a cell at a time: an edit or paste
+    costs the cells it changed, not the table. Only a min or max
+    whose row changed rescans its group. Group rows are rewritten
+    once per idle.
+
+    "count" counts cells that are not blank. The others use the
+    cells that are numbers and are blank for a group without any.
+
+    Parameters:
+        table -> the TreeviewTable holding the groups
+        groups -> group row iid -> its key values
+        key_cols -> value indexes of the key columns, shown in the
+            group rows
+        aggregates -> value index -> one of AGGREGATES
+    '''
+
+    def __init__(self, table: "TreeviewTable", groups: Dict[str, Tuple],
+            key_cols: Sequence[int], aggregates: Dict[int, str]):
+        check_aggregates(aggregates)
+        self.table = table
+        self.model = table.model
+        self.keys = dict(groups)
+        self.key_cols = list(key_cols)
+        self.aggregates = dict(aggregates)
+        self._stats: Dict[Tuple[str, int], _Stats] = {}
+        # parsed cells of the grouped rows, per aggregated column
+        self._cells: Dict[int, Dict[str, Any]] = {}
+        self._stale: set[Tuple[str, int]] = set()
+        self._dirty: set[str] = set()
+        self._after_id: str | None = None
+        self.build()
+        self.model.subscribe(self._model_changed)
+
+    def close(self) -> None:
+        '''stop updating the group rows'''
+        self.model.unsubscribe(self._model_changed)
+        if self._after_id is not None:
+            self.table.after_cancel(self._after_id)
+            self._after_id = None
+
+    def value(self, group: str, col: str | int) -> Any:
+        '''the aggregate of a column for a group'''
+        _index = self.model.column_index(col)
+        if (group, _index) in self._stale:
+            self._rescan(group, _index)
+        return self._stats[(group, _index)].value(self.aggregates[_index])
+
+    def build(self) -> None:
+        '''compute the aggregates of every group and show them'''
+        _groups = list(self.keys)
+        _iids: List[str] = []
+        _codes: List[int] = []
+        for g, _group in enumerate(_groups):
+            _children = self.model.children(_group)
+            _iids.extend(_children)
+            _codes.extend([g] * len(_children))
+        self._stats.clear()
+        self._stale.clear()
+        for _col in self.aggregates:
+            _parsed = list(map(parse_cell, self.model.column(_col, _iids)))
+            self._cells[_col] = dict(zip(_iids, _parsed))
+            if np is not None:
+                self._build_numpy(_col, _groups, _codes, _parsed)
+                continue
+            _stats = [_Stats() for _ in _groups]
+            for g, _cell in zip(_codes, _parsed):
+                _stats[g].add(_cell)
+            for _group, _stat in zip(_groups, _stats):
+                self._stats[(_group, _col)] = _stat
+        self._dirty.update(_groups)
+        self._flush()
+
+    def _build_numpy(self, col: int, groups: Sequence[str],
+            codes: Sequence[int], parsed: Sequence[Any]) -> None:
+        _size = len(groups)
+        _codes = np.asarray(codes, dtype=np.intp)
+        _x = np.fromiter((np.nan if c is None or c is _TEXT else c
+                          for c in parsed), dtype=float, count=len(parsed))
+        _numbers = ~np.isnan(_x)
+        _filled = np.fromiter((c is not None for c in parsed), dtype=bool,
+                              count=len(parsed))
+        _cells = np.bincount(_codes, weights=_filled, minlength=_size)
+        _count = np.bincount(_codes, weights=_numbers, minlength=_size)
+        _total = np.bincount(_codes, weights=np.where(_numbers, _x, 0.0),
+                             minlength=_size)
+        _low = np.full(_size, np.inf)
+        np.fmin.at(_low, _codes, _x)
+        _high = np.full(_size, -np.inf)
+        np.fmax.at(_high, _codes, _x)
+        for g, _group in enumerate(groups):
+            _stat = _Stats()
+            _stat.cells = int(_cells[g])
+            _stat.count = int(_count[g])
+            _stat.total = float(_total[g])
+            _stat.low = float(_low[g])
+            _stat.high = float(_high[g])
+            self._stats[(_group, col)] = _stat
+
+    def _rescan(self, group: str, col: int) -> None:
+        '''recompute one group's aggregates of a column'''
+        self._stale.discard((group, col))
+        _cells = self._cells[col]
+        _stat = _Stats()
+        for _iid in self.model.children(group):
+            _stat.add(_cells[_iid])
+        self._stats[(group, col)] = _stat
+
+    def _add(self, group: str, iids: Sequence[str]) -> None:
+        for _col in self.aggregates:
+            _stat = self._stats[(group, _col)]
+            _cells = self._cells[_col]
+            for _iid, _value in zip(iids, self.model.column(_col, iids)):
+                _cell = parse_cell(_value)
+                _cells[_iid] = _cell
+                _stat.add(_cell)
+
+    def _remove(self, group: str, iids: Sequence[str]) -> None:
+        for _col in self.aggregates:
+            _stat = self._stats[(group, _col)]
+            _cells = self._cells[_col]
+            for _iid in iids:
+                if not _stat.remove(_cells.pop(_iid, None)):
+                    self._stale.add((group, _col))
+
+    def _update(self, iids: Sequence[str], col: int | None) -> None:
+        _cols = self.aggregates if col is None else \
+                [col] if col in self.aggregates else []
+        for _col in _cols:
+            _cells = self._cells[_col]
+            for _iid in iids:
+                if _iid not in _cells:
+                    # a group row or a row that is not grouped
+                    continue
+                _old = _cells[_iid]
+                _new = parse_cell(self.model.get(_iid, _col))
+                if _new is _old or _new == _old:
+                    continue
+                _group = self.model.parent(_iid)
+                _stat = self._stats[(_group, _col)]
+                if not _stat.remove(_old):
+                    self._stale.add((_group, _col))
+                _stat.add(_new)
+                _cells[_iid] = _new
+                self._dirty.add(_group)
+
+    def _model_changed(self, event: str, parent: str | None,
+            iids: Sequence[str], col: int | None) -> None:
+        if event == "update":
+            if col != -1:
+                self._update(iids, col)
+        elif parent in self.keys:
+            if event == "insert":
+                self._add(parent, iids)
+            else:
+                self._remove(parent, iids)
+            self._dirty.add(parent)
+        elif event == "delete" and parent == "":
+            for _iid in iids:
+                if self.keys.pop(_iid, None) is not None:
+                    for _col in self.aggregates:
+                        self._stats.pop((_iid, _col), None)
+                        self._stale.discard((_iid, _col))
+                    self._dirty.discard(_iid)
+        else:
+            return
+        if self._dirty and self._after_id is None:
+            self._after_id = self.table.after_idle(self._flush)
+
+    def _flush(self) -> None:
+        '''write the aggregates of changed groups into their rows'''
+        self._after_id = None
+        _groups = [g for g in self._dirty if g in self.keys]
+        self._dirty.clear()
+        _width = len(self.model.columns)
+        for _group in _groups:
+            _values: List[Any] = [""] * _width
+            for _col, _key in zip(self.key_cols, self.keys[_group]):
+                _values[_col] = _key
+            for _col in self.aggregates:
+                _values[_col] = self.value(_group, _col)
+            self.model.set_values(_group, _values)
+        if _groups:
+            self.table._refresh_rows(_groups)
@@ -0,0 +1,145 @@
+# Copyright (c) 2024 kbt | terminus, LLC
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+from typing import Any, Dict, List, Callable, Sequence
+from tk_table_model import TableModel
+
+# takes a wanted iid and n = 1, 2, ... and returns the n-th
+# alternative tried when the wanted iid is taken
+UniqueStrategy = Callable[[str, int], str]
+
+
+def numbered(base: str, n: int) -> str:
+    '''"Sedan", "Sedan1", "Sedan2", ...'''
+    return f"{base}{n}"
+
+def parenthesized(base: str, n: int) -> str:
+    '''"Sedan", "Sedan (2)", "Sedan (3)", ...'''
+    return f"{base} ({n + 1})"
+
+UNIQUE_STRATEGIES: Dict[str, UniqueStrategy] = {
+        "numbered": numbered,
+        "parenthesized": parenthesized,
+        }
+
+
+class IidRegistry:
+    '''
+    Row id allocation and external keys for a TableModel.
+
+    The model's rows are the registry of used iids, so checking an
+    iid is a dict lookup. unique() hands out the wanted iid, or the
+    first free alternative from the strategy. The next alternative
+    to try is remembered per wanted iid, so adding many groups with
+    the same name does not rescan the ones before.
+
+    Rows can also be bound to an external key, e.g. a primary key, to
+    find them again in O(1) for update in place feeds. Bindings go
+    when their row is deleted. If key_col is set, editing that column
+    of a bound row rebinds it to the new value.
+
+    Parameters:
+        model -> the TableModel whose iids are allocated
+        strategy -> a name in UNIQUE_STRATEGIES or a function
+    '''
+
+    def __init__(self, model: TableModel,
+            strategy: str | UniqueStrategy = "numbered"):
+        if isinstance(strategy, str) and strategy not in UNIQUE_STRATEGIES:
+            raise ValueError(f"unknown strategy {strategy!r}, "
+                             f"expected one of {list(UNIQUE_STRATEGIES)}")
+        self.model = model
+        self.strategy: UniqueStrategy = UNIQUE_STRATEGIES[strategy] \
+                if isinstance(strategy, str) else strategy
+        self.key_col: int | None = None
+        self._next: Dict[str, int] = {}
+        self._rows: Dict[Any, str] = {}
+        self._keys: Dict[str, Any] = {}
+        # bound rows that had a delete event. A move sends one too,
+        # so they are only unbound if they are really gone.
+        self._deleted: List[str] = []
+        model.subscribe(self._model_changed)
+
+    def unique(self, base: str) -> str:
+        '''base if no row has it as iid, otherwise a free alternative'''
+        if base == "":
+            return self.model.new_iid()
+        if base not in self.model:
+            return base
+        n = self._next.get(base, 1)
+        _iid = self.strategy(base, n)
+        while _iid in self.model:
+            n += 1
+            _iid = self.strategy(base, n)
+        self._next[base] = n + 1
+        return _iid
+
+    def bind(self, key: Any, iid: str) -> None:
+        '''find iid by key from now on'''
+        self._purge()
+        _old = self._keys.pop(iid, None)
+        if _old is not None:
+            self._rows.pop(_old, None)
+        _previous = self._rows.get(key)
+        if _previous is not None:
+            self._keys.pop(_previous, None)
+        self._rows[key] = iid
+        self._keys[iid] = key
+
+    def row(self, key: Any) -> str | None:
+        '''the iid bound to key, or None'''
+        if self._deleted:
+            self._purge()
+        return self._rows.get(key)
+
+    def key(self, iid: str) -> Any:
+        '''the key iid is bound to, or None'''
+        if self._deleted:
+            self._purge()
+        return self._keys.get(iid)
+
+    def unbind(self, iid: str) -> None:
+        _key = self._keys.pop(iid, None)
+        if _key is not None:
+            self._rows.pop(_key, None)
+
+    def clear(self) -> None:
+        '''forget every key'''
+        self._rows.clear()
+        self._keys.clear()
+        self._deleted.clear()
+
+    def _purge(self) -> None:
+        for _iid in self._deleted:
+            if _iid not in self.model:
+                self.unbind(_iid)
+        self._deleted.clear()
+
+    def _model_changed(self, event: str, parent: str | None,
+            iids: Sequence[str], col: int | None) -> None:
+        if not self._keys:
+            return
+        if event == "delete":
+            self._deleted.extend(k for k in iids if k in self._keys)
+        elif event == "update" and self.key_col is not None and \
+                col in (None, self.key_col):
+            for _iid in iids:
+                if _iid in self._keys:
+                    self.bind(self.model.get(_iid, self.key_col), _iid)
@@ -0,0 +1,137 @@
+# Copyright (c) 2024 kbt | terminus, LLC
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import csv
+import io
+from itertools import islice
+from typing import Any, List, Dict, Sequence, Iterable, Iterator, Callable, TextIO
+
+# delimiters sniff_delimiter picks from, in order of preference
+DELIMITERS = "\t,;|"
+
+# delimiters of the formats write_rows knows
+FORMATS = {"tsv": "\t", "csv": ","}
+
+# how much of a file sniff_delimiter looks at
+SNIFF_CHARS = 64 * 1024
+
+# A parser takes the text to parse, either a str or an open text
+# file, and yields rows as lists of str.
+Parser = Callable[[str | TextIO], Iterator[List[str]]]
+
+
+def sniff_delimiter(sample: str, lines: int = 20) -> str:
+    '''
+    guess the delimiter of delimited text. Tabs win if there are
+    any, since Excel and most spreadsheets copy as TSV. Otherwise
+    a delimiter is only picked if it splits the first lines into
+    the same number of fields, so a single "Smith, John" stays
+    one cell.
+    '''
+    if "\t" in sample:
+        return "\t"
+    for _delimiter in DELIMITERS[1:]:
+        if _delimiter not in sample:
+            continue
+        _rows = [r for r in islice(csv.reader(
+                io.StringIO(sample, newline=""), delimiter=_delimiter,
+                strict=False), lines) if r]
+        # the last row may be cut off mid-row
+        if len(_rows) > 2:
+            _rows = _rows[:-1]
+        _widths = {len(r) for r in _rows}
+        if len(_rows) > 1 and len(_widths) == 1 and 1 not in _widths:
+            return _delimiter
+    return "\t"
+
+def iter_rows(source: str | TextIO, delimiter: str | None = None,
+        quotechar: str = '"') -> Iterator[List[str]]:
+    '''
+    Streaming RFC 4180 style parser. Yields rows lazily.
+
+    Quoted fields may hold delimiters, newlines and doubled quotes.
+    \r\n and \r line endings read as \n, and a trailing line ending
+    does not add an empty row. The delimiter is sniffed from the
+    start of the text when it is not given.
+
+    Parameters:
+        source -> a str, or a text file opened with newline=""
+        delimiter -> field delimiter, or None to sniff it
+        quotechar -> quote character
+    '''
+    _lines: Iterable[str]
+    if isinstance(source, str):
+        if delimiter is None:
+            delimiter = sniff_delimiter(source[:SNIFF_CHARS])
+        _lines = io.StringIO(source, newline="")
+    else:
+        if delimiter is None:
+            _sample = source.read(SNIFF_CHARS)
+            delimiter = sniff_delimiter(_sample)
+            _lines = _chain_sample(_sample, source)
+        else:
+            _lines = source
+    return csv.reader(_lines, delimiter=delimiter, quotechar=quotechar,
+                      doublequote=True, strict=False)
+
+def _chain_sample(sample: str, source: TextIO) -> Iterator[str]:
+    '''lines of a file whose start has already been read'''
+    _rest = io.StringIO(sample, newline="")
+    _head = _rest.readlines()
+    if _head and not _head[-1].endswith(("\n", "\r")):
+        # finish the line the sample cut off
+        _head[-1] += source.readline()
+    yield from _head
+    yield from source
+
+def iter_tsv(source: str | TextIO) -> Iterator[List[str]]:
+    return iter_rows(source, delimiter="\t")
+
+def iter_csv(source: str | TextIO) -> Iterator[List[str]]:
+    return iter_rows(source, delimiter=",")
+
+def iter_plain(source: str | TextIO) -> Iterator[List[str]]:
+    '''split lines on tabs with no quoting, the old parse_new rules'''
+    _text = source if isinstance(source, str) else source.read()
+    for _line in io.StringIO(_text):
+        yield _line.rstrip("\r\n").split("\t")
+
+def write_rows(rows: Iterable[Sequence[Any]], format: str = "tsv",
+        header: Sequence[Any] | None = None) -> str:
+    '''
+    serialize rows as TSV or CSV text in one pass, quoting fields
+    that hold the delimiter, quotes or newlines so iter_rows reads
+    them back. header is written first if given. There is no
+    line ending after the last row.
+    '''
+    _out = io.StringIO()
+    _writer = csv.writer(_out, delimiter=FORMATS[format],
+            lineterminator="\n")
+    if header is not None:
+        _writer.writerow(header)
+    _writer.writerows(rows)
+    return _out.getvalue()[:-1]
+
+PARSERS: Dict[str, Parser] = {
+        "auto": iter_rows,
+        "tsv": iter_tsv,
+        "csv": iter_csv,
+        "plain": iter_plain,
+        }
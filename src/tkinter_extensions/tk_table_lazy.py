@@ -0,0 +1,201 @@
+# Copyright (c) 2024 kbt | terminus, LLC
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+from collections import OrderedDict
+from functools import partial
+from tkinter import ttk
+from typing import Any, Dict, Iterable, AsyncIterable, Callable, Sequence, \
+        TYPE_CHECKING
+from tk_table_loader import TableLoader
+
+if TYPE_CHECKING:
+    from tk_treeview_table import TreeviewTable
+
+# loaded groups kept before closed ones are released
+LAZY_MAX_GROUPS = 64
+
+# child rows inserted at a time while a group loads
+LAZY_BATCH_ROWS = 2_000
+
+# iid prefix of the Tk only item that gives an unloaded group its arrow
+PLACEHOLDER_PREFIX = "lazy:"
+
+# called with a group's iid, returns its child rows. The rows are
+# iterated in a worker thread, see TableLoader.
+ChildProvider = Callable[[str], Iterable[Any] | AsyncIterable[Any]]
+
+
+class LazyChildren:
+    '''
+    Lazily loaded groups of a tree TreeviewTable.
+
+    A group with a child provider starts out empty in the model. In
+    Tk it holds one placeholder item so it can be opened. Opening it
+    (<<TreeviewOpen>>) calls the provider and loads the rows it gives
+    in batches through a TableLoader. Until then sorting, striping
+    and filtering skip the group, and once loaded it is sorted again.
+
+    At most max_groups groups stay loaded. When there are more, the
+    closed groups opened least recently are released: their rows
+    are deleted and fetched again the next time they are opened.
+    Groups whose rows were edited after loading are never released,
+    so edits are not lost.
+
+    Parameters:
+        table -> the TreeviewTable, not flat
+        max_groups -> loaded groups kept before releasing closed ones
+        batch_rows -> rows inserted at a time while loading
+    '''
+
+    def __init__(self, table: "TreeviewTable", *,
+            max_groups: int = LAZY_MAX_GROUPS,
+            batch_rows: int = LAZY_BATCH_ROWS):
+        self.table = table
+        self.max_groups = max_groups
+        self.batch_rows = batch_rows
+        self.providers: Dict[str, ChildProvider] = {}
+        # loaded groups, least recently opened first
+        self.loaded: OrderedDict[str, None] = OrderedDict()
+        self.loading: Dict[str, TableLoader] = {}
+        # groups edited after loading
+        self.kept: set[str] = set()
+        self._releasing: bool = False
+        table.model.subscribe(self._model_changed)
+
+    def set_provider(self, parent: str, provider: ChildProvider) -> None:
+        '''load the children of parent from provider when it's opened'''
+        self.providers[parent] = provider
+        if self.unloaded(parent):
+            self._add_placeholder(parent)
+            if self._is_open(parent):
+                self.opened(parent)
+
+    def unloaded(self, parent: str) -> bool:
+        '''True if parent has a provider and its rows are not loaded'''
+        return parent in self.providers and parent not in self.loaded \
+                and parent not in self.loading
+
+    def opened(self, parent: str) -> None:
+        '''a group was opened: load it, or mark it recently used'''
+        if parent in self.loaded:
+            self.loaded.move_to_end(parent)
+            return
+        if not self.unloaded(parent):
+            return
+        _rows = self.providers[parent](parent)
+        _placeholder = PLACEHOLDER_PREFIX + parent
+        if ttk.Treeview.exists(self.table, _placeholder):
+            ttk.Treeview.delete(self.table, _placeholder)
+        self.loading[parent] = self.table.load_rows(_rows, parent=parent,
+                batch_rows=self.batch_rows,
+                on_done=partial(self._loaded, parent))
+
+    def closed(self, parent: str) -> None:
+        '''a group was closed, release groups past max_groups'''
+        self.trim()
+
+    def _loaded(self, parent: str, loader: TableLoader) -> None:
+        if self.loading.get(parent) is not loader:
+            # released while loading
+            return
+        if loader.cancelled:
+            # not loaded: drop the rows it got and show it unloaded
+            self.release(parent)
+            return
+        del self.loading[parent]
+        self.loaded[parent] = None
+        self.table._group_loaded(parent)
+        self.trim()
+
+    def trim(self) -> None:
+        '''release closed groups, least recently opened first'''
+        _excess = len(self.loaded) - self.max_groups
+        if _excess <= 0 or self.table.journal.recording:
+            # releasing inside an edit would be recorded for undo
+            return
+        for _parent in list(self.loaded):
+            if _excess <= 0:
+                break
+            if _parent in self.kept or self._is_open(_parent):
+                continue
+            self.release(_parent)
+            _excess -= 1
+
+    def release(self, parent: str) -> None:
+        '''
+        drop the rows of a lazy group, loaded or loading, and close
+        it. They are fetched again when it's opened.
+        '''
+        if parent not in self.providers:
+            return
+        _loader = self.loading.pop(parent, None)
+        if _loader is not None:
+            _loader.cancel()
+        self.loaded.pop(parent, None)
+        self.kept.discard(parent)
+        self._releasing = True
+        try:
+            self.table.delete_rows(list(self.table.model.children(parent)),
+                                   restripe=False)
+        finally:
+            self._releasing = False
+        ttk.Treeview.item(self.table, parent, open=False)
+        self._add_placeholder(parent)
+
+    def forget(self, parent: str) -> None:
+        '''stop loading parent lazily, keeping any rows it has'''
+        _loader = self.loading.pop(parent, None)
+        if _loader is not None:
+            _loader.cancel()
+        self.providers.pop(parent, None)
+        self.loaded.pop(parent, None)
+        self.kept.discard(parent)
+        _placeholder = PLACEHOLDER_PREFIX + parent
+        if ttk.Treeview.exists(self.table, _placeholder):
+            ttk.Treeview.delete(self.table, _placeholder)
+
+    def _add_placeholder(self, parent: str) -> None:
+        _placeholder = PLACEHOLDER_PREFIX + parent
+        if not ttk.Treeview.exists(self.table, _placeholder):
+            ttk.Treeview.insert(self.table, parent, "end", iid=_placeholder)
+
+    def _is_open(self, parent: str) -> bool:
+        return self.table.tk.getboolean(
+                ttk.Treeview.item(self.table, parent, "open"))
+
+    def _model_changed(self, event: str, parent: str | None,
+            iids: Sequence[str], col: int | None) -> None:
+        if self._releasing or not self.providers:
+            return
+        if event == "delete" and parent == "":
+            for _iid in iids:
+                if _iid in self.providers:
+                    self.forget(_iid)
+            return
+        if event == "insert" and parent in self.loading:
+            # the group's own rows arriving
+            return
+        if event == "update":
+            _groups = {self.table.model.parent(k) for k in iids}
+        else:
+            _groups = {parent}
+        for _group in _groups:
+            if _group in self.loaded or _group in self.loading:
+                self.kept.add(_group)
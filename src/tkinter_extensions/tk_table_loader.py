@@ -0,0 +1,191 @@
+# Copyright (c) 2024 kbt | terminus, LLC
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import asyncio
+import queue
+import threading
+import time
+from typing import Any, List, Iterable, AsyncIterable, Callable, \
+        TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from tk_treeview_table import TreeviewTable
+
+# rows the worker hands to the main loop at a time
+LOAD_BATCH_ROWS = 5_000
+
+# batches the queue holds before the worker waits (backpressure)
+LOAD_QUEUE_BATCHES = 8
+
+# milliseconds of each pump spent inserting, and between pumps
+LOAD_FRAME_MS = 12
+LOAD_INTERVAL_MS = 10
+
+_DONE = object()
+
+
+class TableLoader:
+    '''
+    Loads rows produced off the main loop into a TreeviewTable.
+
+    A worker thread reads the rows, from an iterable or an async
+    iterable, and puts them in batches on a bounded queue. The
+    worker waits while the queue is full, so a fast producer can't
+    run ahead of the table. A pump on the main loop, run through
+    after(), drains batches into insert_rows for at most frame_ms
+    at a time so the UI stays responsive.
+
+    Rows from another process can be loaded by passing an iterable
+    that reads them, e.g. from a multiprocessing.Queue.
+
+    Parameters:
+        table -> the TreeviewTable to load into
+        rows -> iterable or async iterable of row values. It is
+            iterated in the worker thread.
+        parent -> the parent to append the rows to
+        batch_rows -> rows per batch
+        queue_batches -> batches queued before the worker waits
+        frame_ms -> time spent inserting per pump
+        on_done -> called with the loader when all rows are loaded
+            or it is cancelled
+        on_error -> called with the loader and the exception if the
+            rows raise. on_done is still called afterwards.
+    '''
+
+    def __init__(self, table: "TreeviewTable",
+            rows: Iterable[Any] | AsyncIterable[Any], *,
+            parent: str = "",
+            batch_rows: int = LOAD_BATCH_ROWS,
+            queue_batches: int = LOAD_QUEUE_BATCHES,
+            frame_ms: int = LOAD_FRAME_MS,
+            on_done: Callable[["TableLoader"], Any] | None = None,
+            on_error: Callable[["TableLoader", BaseException], Any]
+                | None = None):
+        self.table = table
+        self.parent = parent
+        self.batch_rows = batch_rows
+        self.frame_ms = frame_ms
+        self.on_done = on_done
+        self.on_error = on_error
+        self.rows_done: int = 0
+        self.batches: int = 0
+        self.error: BaseException | None = None
+        self.cancelled: bool = False
+        self.finished: bool = False
+
+        self._queue: queue.Queue = queue.Queue(maxsize=queue_batches)
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._work, args=(rows,),
+                name="TableLoader", daemon=True)
+        self._thread.start()
+        self._after_id: str | None = table.after(LOAD_INTERVAL_MS,
+                self._pump)
+
+    # worker thread
+
+    def _put(self, item: Any) -> bool:
+        '''queue item, waiting while the queue is full. False on cancel.'''
+        while not self._stop.is_set():
+            try:
+                self._queue.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _work(self, rows) -> None:
+        self._batch: List[Any] = []
+        try:
+            if hasattr(rows, "__aiter__"):
+                asyncio.run(self._work_async(rows))
+            else:
+                for _row in rows:
+                    if not self._add(_row):
+                        return
+        except BaseException as _error:
+            # keep the rows read before the error
+            if self._batch and not self._put(self._batch):
+                return
+            self._batch = []
+            self._put(_error)
+        if self._batch and not self._put(self._batch):
+            return
+        self._put(_DONE)
+
+    def _add(self, row: Any) -> bool:
+        self._batch.append(row)
+        if len(self._batch) < self.batch_rows:
+            return True
+        _batch, self._batch = self._batch, []
+        return self._put(_batch)
+
+    async def _work_async(self, rows: AsyncIterable[Any]) -> None:
+        async for _row in rows:
+            self._batch.append(_row)
+            if len(self._batch) >= self.batch_rows:
+                _batch, self._batch = self._batch, []
+                # don't block the event loop the rows come from
+                if not await asyncio.to_thread(self._put, _batch):
+                    return
+
+    # main loop
+
+    def _pump(self) -> None:
+        '''insert queued batches for up to frame_ms, then reschedule'''
+        self._after_id = None
+        if self.cancelled:
+            return
+        _deadline = time.perf_counter() + self.frame_ms / 1000
+        while time.perf_counter() < _deadline:
+            try:
+                _item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if _item is _DONE:
+                self._finish()
+                return
+            if isinstance(_item, BaseException):
+                self.error = _item
+                if self.on_error is not None:
+                    self.on_error(self, _item)
+                continue
+            self.table.insert_rows(self.parent, _item)
+            self.rows_done += len(_item)
+            self.batches += 1
+        self._after_id = self.table.after(LOAD_INTERVAL_MS, self._pump)
+
+    def cancel(self) -> None:
+        '''stop loading. Rows already loaded are kept.'''
+        if self.finished:
+            return
+        self.cancelled = True
+        self._stop.set()
+        if self._after_id is not None:
+            self.table.after_cancel(self._after_id)
+            self._after_id = None
+        self._finish()
+
+    def _finish(self) -> None:
+        self.finished = True
+        self._stop.set()
+        if self in self.table.loaders:
+            self.table.loaders.remove(self)
+        if self.on_done is not None:
+            self.on_done(self)
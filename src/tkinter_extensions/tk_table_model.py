@@ -0,0 +1,503 @@
+# Copyright (c) 2024 kbt | terminus, LLC
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+from bisect import bisect_right
+from itertools import chain, islice
+from typing import Any, List, Dict, Sequence, Iterable, Iterator, Callable
+
+# optional. The sort, filter and group modules import np from here.
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# BlockedList blocks are split when they grow past twice this size
+BLOCK_SIZE = 512
+
+
+class BlockedList(Sequence):
+    '''
+    Ordered list of unique iids split into blocks, with an
+    iid -> block map and the start position of each block.
+
+    Looking up an iid's position or a neighbor costs a bisect over
+    the block starts and a scan of one block, instead of a scan of
+    the whole list. Block starts are refreshed lazily from the first
+    block changed since the last lookup.
+
+    Parameters:
+        iids -> initial contents
+    '''
+
+    def __init__(self, iids: Iterable[str] = ()):
+        self._blocks: List[List[str]] = []
+        self._block_of: Dict[str, List[str]] = {}
+        self._starts: List[int] = []
+        self._number: Dict[int, int] = {}
+        self._dirty: int | None = 0
+        self._len: int = 0
+        self._append_blocks(list(iids), len(self._blocks))
+
+    def __len__(self) -> int:
+        return self._len
+
+    def __contains__(self, iid: object) -> bool:
+        return iid in self._block_of
+
+    def __iter__(self) -> Iterator[str]:
+        return chain.from_iterable(list(self._blocks))
+
+    def __repr__(self) -> str:
+        return f"BlockedList({list(self)!r})"
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            _start, _stop, _step = index.indices(self._len)
+            if _step != 1:
+                return list(self)[index]
+            return self._range(_start, _stop)
+        if index < 0:
+            index += self._len
+        if not 0 <= index < self._len:
+            raise IndexError("BlockedList index out of range")
+        _number = self._locate(index)
+        return self._blocks[_number][index - self._starts[_number]]
+
+    def _range(self, start: int, stop: int) -> List[str]:
+        if start >= stop:
+            return []
+        _number = self._locate(start)
+        _offset = start - self._starts[_number]
+        _items = chain.from_iterable(self._blocks[_number:])
+        return list(islice(_items, _offset, _offset + stop - start))
+
+    def _refresh(self) -> None:
+        '''recompute block starts from the first changed block'''
+        if self._dirty is None:
+            return
+        _first = self._dirty
+        _blocks = self._blocks
+        if not all(_blocks[_first:]):
+            _blocks[_first:] = [b for b in _blocks[_first:] if b]
+        del self._starts[_first:]
+        _position = 0
+        if _first > 0:
+            _position = self._starts[_first - 1] + len(_blocks[_first - 1])
+        for _number in range(_first, len(_blocks)):
+            self._starts.append(_position)
+            self._number[id(_blocks[_number])] = _number
+            _position += len(_blocks[_number])
+        self._dirty = None
+
+    def _changed(self, number: int) -> None:
+        if self._dirty is None or number < self._dirty:
+            self._dirty = number
+
+    def _locate(self, index: int) -> int:
+        '''number of the block holding position index'''
+        self._refresh()
+        return max(0, bisect_right(self._starts, index) - 1)
+
+    def _block_number(self, iid: str) -> int:
+        self._refresh()
+        return self._number[id(self._block_of[iid])]
+
+    def index(self, iid: str, *args) -> int:
+        '''position of iid'''
+        if iid not in self._block_of:
+            raise ValueError(f"{iid!r} is not in list")
+        _number = self._block_number(iid)
+        return self._starts[_number] + self._blocks[_number].index(iid)
+
+    def neighbor(self, iid: str, offset: int, wrap: bool = True) -> str | None:
+        '''the iid offset places from iid, wrapping around the ends'''
+        _index = self.index(iid) + offset
+        if wrap:
+            return self[_index % self._len]
+        if 0 <= _index < self._len:
+            return self[_index]
+        return None
+
+    def insert(self, index: int, iid: str) -> None:
+        self.splice(index, (iid,))
+
+    def append(self, iid: str) -> None:
+        self.splice(self._len, (iid,))
+
+    def splice(self, index: int, iids: Sequence[str]) -> None:
+        '''insert iids before position index'''
+        if not iids:
+            return
+        index = max(0, min(index, self._len))
+        if index == self._len:
+            _last = self._blocks[-1] if self._blocks else None
+            if _last is not None and len(_last) + len(iids) <= 2 * BLOCK_SIZE:
+                self._extend_block(len(self._blocks) - 1, iids)
+            else:
+                self._append_blocks(list(iids), len(self._blocks))
+            return
+        _number = self._locate(index)
+        _block = self._blocks[_number]
+        _offset = index - self._starts[_number]
+        if len(_block) + len(iids) <= 2 * BLOCK_SIZE:
+            _block[_offset:_offset] = iids
+            for k in iids:
+                self._block_of[k] = _block
+            self._len += len(iids)
+            self._changed(_number)
+            return
+        # split the block around the new iids
+        _tail = _block[_offset:]
+        del _block[_offset:]
+        self._len -= len(_tail)
+        self._changed(_number)
+        self._append_blocks(list(iids) + _tail, _number + 1)
+
+    def _extend_block(self, number: int, iids: Sequence[str]) -> None:
+        _block = self._blocks[number]
+        _block.extend(iids)
+        for k in iids:
+            self._block_of[k] = _block
+        self._len += len(iids)
+        self._changed(number)
+
+    def _append_blocks(self, iids: List[str], number: int) -> None:
+        '''put iids in new blocks starting at block number'''
+        _new = [iids[i:i + BLOCK_SIZE]
+                for i in range(0, len(iids), BLOCK_SIZE)]
+        for _block in _new:
+            for k in _block:
+                self._block_of[k] = _block
+        self._blocks[number:number] = _new
+        self._len += len(iids)
+        self._changed(number)
+
+    def remove(self, iid: str) -> None:
+        _number = self._block_number(iid)
+        self._blocks[_number].remove(iid)
+        del self._block_of[iid]
+        self._len -= 1
+        self._changed(_number)
+
+
+# what children() returns for rows without any
+_NO_CHILDREN = BlockedList()
+
+
+class TableModel:
+    '''
+    Headless, columnar row store for a TreeviewTable.
+
+    Each column is a list indexed by a row slot, and rows are
+    found by iid through a slot index. Children are kept in
+    display order for each parent, so tables can read, sort and
+    edit their data without going through Tcl. Needs no display.
+
+    Listeners added with subscribe are called as
+    listener(event, parent, iids, col):
+        "insert" -> after rows are added to parent
+        "delete" -> before a row is removed from parent
+        "update" -> after cells change. col is the values index,
+                    -1 for the text or None for the whole row.
+    A move is reported as a delete followed by an insert.
+
+    Parameters:
+        columns -> the column names of the table
+    '''
+
+    def __init__(self, columns: Sequence[str]):
+        self.columns: tuple[str, ...] = tuple(columns)
+        self._data: List[List[Any]] = [[] for _ in self.columns]
+        self._text: List[str] = []
+        self._length: List[int] = []
+        self._parent: List[str] = []
+        self._slot: Dict[str, int] = {}
+        self._free: List[int] = []
+        self._children: Dict[str, BlockedList] = {"": BlockedList()}
+        self._counter: int = 0
+        self._listeners: List[Callable[..., Any]] = []
+
+    def subscribe(self, listener: Callable[..., Any]) -> None:
+        self._listeners.append(listener)
+
+    def unsubscribe(self, listener: Callable[..., Any]) -> None:
+        self._listeners.remove(listener)
+
+    def _notify(self, event: str, parent: str | None,
+            iids: Sequence[str], col: int | None = None) -> None:
+        for _listener in self._listeners:
+            _listener(event, parent, iids, col)
+
+    def __len__(self) -> int:
+        return len(self._slot)
+
+    def __contains__(self, iid: str) -> bool:
+        return iid in self._slot
+
+    def column_index(self, col: str | int) -> int:
+        '''
+        values index of a column. Accepts a column name, '#n'
+        or an int. '#0' (the tree column) returns -1.
+        '''
+        if isinstance(col, int):
+            return col
+        if col.startswith("#"):
+            return int(col[1:]) - 1
+        return self.columns.index(col)
+
+    def new_iid(self) -> str:
+        '''allocate an unused row id'''
+        self._counter += 1
+        while f"R{self._counter}" in self._slot:
+            self._counter += 1
+        return f"R{self._counter}"
+
+    def _new_slot(self) -> int:
+        if self._free:
+            return self._free.pop()
+        for _column in self._data:
+            _column.append("")
+        self._text.append("")
+        self._length.append(0)
+        self._parent.append("")
+        return len(self._text) - 1
+
+    def insert(self, parent: str, index: int | str, *,
+            iid: str | None = None,
+            text: str = "",
+            values: Sequence[Any] = ()) -> str:
+        '''insert a row and return its iid. index may be 'end'.'''
+        if iid is None:
+            iid = self.new_iid()
+        _siblings = self._siblings(parent)
+        if index == "end":
+            _siblings.append(iid)
+        else:
+            _siblings.insert(int(index), iid)
+        self._add(iid, parent, text, values)
+        self._notify("insert", parent, (iid,))
+        return iid
+
+    def insert_rows(self, parent: str, index: int | str,
+            rows: Iterable[Sequence[Any]],
+            iids: Sequence[str] | None = None) -> List[str]:
+        '''
+        insert many rows of values at index and return their iids,
+        new ones unless iids are given. The children of parent are
+        spliced once for the whole batch.
+        '''
+        _rows = list(rows)
+        _iids = [self.new_iid() for _ in _rows] if iids is None \
+                else list(iids)
+        _width = len(self._data)
+
+        # new rows reuse free slots first, then go in fresh ones,
+        # one column at a time. Free slots already have a blank text.
+        _split = max(len(self._free) - len(_rows), 0)
+        _slots = self._free[_split:]
+        del self._free[_split:]
+        _reused = len(_slots)
+        _fresh = len(_rows) - _reused
+        _slots.extend(range(len(self._text), len(self._text) + _fresh))
+
+        def _fill(column: List[Any], cells: List[Any]) -> None:
+            list(map(column.__setitem__, _slots[:_reused], cells))
+            column.extend(cells[_reused:])
+
+        for _index, _column in enumerate(self._data):
+            _fill(_column, [r[_index] if _index < len(r) else ""
+                            for r in _rows])
+        self._text.extend([""] * _fresh)
+        _fill(self._parent, [parent] * len(_rows))
+        _fill(self._length, [min(len(r), _width) for r in _rows])
+        self._slot.update(zip(_iids, _slots))
+
+        _siblings = self._siblings(parent)
+        if index == "end":
+            index = len(_siblings)
+        _siblings.splice(int(index), _iids)
+        self._notify("insert", parent, _iids)
+        return _iids
+
+    def _add(self, iid: str, parent: str, text: str,
+            values: Sequence[Any]) -> None:
+        '''store a row that has already been placed in its parent'''
+        _slot = self._new_slot()
+        self._slot[iid] = _slot
+        self._text[_slot] = text
+        self._parent[_slot] = parent
+        self._write_row(_slot, values)
+
+    def delete(self, iid: str) -> None:
+        '''delete a row and all of its children'''
+        for _child in list(self._children.get(iid, ())):
+            self.delete(_child)
+        self._notify("delete", self.parent(iid), (iid,))
+        _slot = self._slot.pop(iid)
+        self._children[self._parent[_slot]].remove(iid)
+        self._children.pop(iid, None)
+        self._write_row(_slot, ())
+        self._text[_slot] = ""
+        self._free.append(_slot)
+
+    def move(self, iid: str, parent: str, index: int | str) -> None:
+        '''move a row to a new parent and position'''
+        _slot = self._slot[iid]
+        self._notify("delete", self._parent[_slot], (iid,))
+        self._children[self._parent[_slot]].remove(iid)
+        _siblings = self._siblings(parent)
+        if index == "end":
+            index = len(_siblings)
+        _siblings.insert(int(index), iid)
+        self._parent[_slot] = parent
+        self._notify("insert", parent, (iid,))
+
+    def reorder(self, parent: str, iids: Sequence[str]) -> None:
+        '''replace the order of the children of parent'''
+        self._children[parent] = BlockedList(iids)
+
+    def children(self, parent: str = "") -> BlockedList:
+        '''children of parent in display order. Do not mutate.'''
+        _children = self._children.get(parent)
+        if _children is None:
+            if parent not in self._slot:
+                raise KeyError(parent)
+            return _NO_CHILDREN
+        return _children
+
+    def _siblings(self, parent: str) -> BlockedList:
+        '''
+        the children of parent, to add to. Rows only get a list
+        once they have children, which keeps flat tables light.
+        '''
+        _children = self._children.get(parent)
+        if _children is None:
+            if parent not in self._slot:
+                raise KeyError(parent)
+            _children = self._children[parent] = BlockedList()
+        return _children
+
+    def parent(self, iid: str) -> str:
+        return self._parent[self._slot[iid]]
+
+    def index(self, iid: str) -> int:
+        '''position of iid in its parent'''
+        return self._children[self.parent(iid)].index(iid)
+
+    def sibling(self, iid: str, offset: int = 1,
+            wrap: bool = True) -> str | None:
+        '''
+        the row offset places from iid in the same parent. Wraps
+        around the ends, or returns None past them if wrap is False.
+        '''
+        return self._children[self.parent(iid)].neighbor(iid, offset, wrap)
+
+    def text(self, iid: str) -> str:
+        return self._text[self._slot[iid]]
+
+    def set_text(self, iid: str, text: str) -> None:
+        self._text[self._slot[iid]] = text
+        self._notify("update", None, (iid,), -1)
+
+    def values(self, iid: str) -> List[Any]:
+        '''values of a row as a new list'''
+        _slot = self._slot[iid]
+        return [_column[_slot]
+                for _column in self._data[:self._length[_slot]]]
+
+    def rows(self, iids: Iterable[str]) -> Iterator[List[Any]]:
+        '''values of many rows, like values, in one pass'''
+        _slot = self._slot
+        _length = self._length
+        _data = self._data
+        for _iid in iids:
+            _s = _slot[_iid]
+            yield [_column[_s] for _column in _data[:_length[_s]]]
+
+    def row_length(self, iid: str) -> int:
+        '''number of values a row has, without copying them'''
+        return self._length[self._slot[iid]]
+
+    def set_values(self, iid: str, values: Sequence[Any]) -> None:
+        self._write_row(self._slot[iid], values)
+        self._notify("update", None, (iid,), None)
+
+    def _write_row(self, slot: int, values: Sequence[Any]) -> None:
+        '''values past the last column are dropped'''
+        _length = min(len(values), len(self._data))
+        for _index, _column in enumerate(self._data):
+            _column[slot] = values[_index] if _index < _length else ""
+        self._length[slot] = _length
+
+    def get(self, iid: str, col: str | int) -> Any:
+        '''value of a single cell, '' if the row is short'''
+        _index = self.column_index(col)
+        if _index == -1:
+            return self.text(iid)
+        return self._data[_index][self._slot[iid]]
+
+    def set(self, iid: str, col: str | int, value: Any) -> None:
+        '''set a single cell, padding short rows with blanks'''
+        _index = self.column_index(col)
+        _slot = self._slot[iid]
+        if _index == -1:
+            self._text[_slot] = value
+        else:
+            self._data[_index][_slot] = value
+            if self._length[_slot] <= _index:
+                self._length[_slot] = _index + 1
+        self._notify("update", None, (iid,), _index)
+
+    def slots(self, iids: Iterable[str]) -> List[int]:
+        '''storage slots of iids. Slots are reused after a delete.'''
+        return list(map(self._slot.__getitem__, iids))
+
+    def slot_column(self, col: str | int) -> List[Any]:
+        '''a whole column by slot, including free slots. Do not mutate.'''
+        _index = self.column_index(col)
+        return self._text if _index == -1 else self._data[_index]
+
+    # Column operations. These work on whole columns in Python
+    # and are what the table uses for bulk reads and writes.
+
+    def column(self, col: str | int, iids: Iterable[str]) -> List[Any]:
+        '''values of one column for iids, in order'''
+        _index = self.column_index(col)
+        _slot = self._slot
+        _column = self._text if _index == -1 else self._data[_index]
+        return [_column[_slot[k]] for k in iids]
+
+    def set_column(self, col: str | int, iids: Iterable[str],
+            values: Iterable[Any]) -> None:
+        '''set one column for iids from values, pairwise'''
+        _index = self.column_index(col)
+        _iids = list(iids)
+        if _index == -1:
+            for k, v in zip(_iids, values):
+                self._text[self._slot[k]] = v
+        else:
+            _column = self._data[_index]
+            _length = self._length
+            for k, v in zip(_iids, values):
+                _slot = self._slot[k]
+                _column[_slot] = v
+                if _length[_slot] <= _index:
+                    _length[_slot] = _index + 1
+        self._notify("update", None, _iids, _index)
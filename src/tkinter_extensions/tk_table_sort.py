@@ -0,0 +1,366 @@
+# Copyright (c) 2024 kbt | terminus, LLC
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import re
+from bisect import bisect_right
+from datetime import datetime
+from typing import Any, List, Dict, Tuple, Callable, Sequence
+from tk_table_model import TableModel, np
+
+# formats tried, in order, by date_key after ISO 8601
+DATE_FORMATS = ("%m/%d/%Y", "%m/%d/%y", "%d-%b-%Y", "%d %b %Y",
+                "%b %d, %Y", "%Y/%m/%d")
+
+_DIGITS = re.compile(r"(\d+)")
+
+# Keys are tuples that start with 0 for values of the column's type
+# and 1 for anything else, so mixed and blank cells sort last instead
+# of raising TypeError. They stay last in descending order too.
+
+def string_key(value: Any) -> Tuple:
+    '''plain text order'''
+    return (0, str(value))
+
+def numeric_key(value: Any) -> Tuple:
+    '''numbers by value. Accepts thousands separators. nan is text.'''
+    try:
+        _number = float(str(value).replace(",", ""))
+    except ValueError:
+        return (1, str(value))
+    return (0, _number) if _number == _number else (1, str(value))
+
+def date_key(value: Any) -> Tuple:
+    '''dates and times by value. See DATE_FORMATS.'''
+    _text = str(value).strip()
+    try:
+        return (0, datetime.fromisoformat(_text))
+    except ValueError:
+        pass
+    for _format in DATE_FORMATS:
+        try:
+            return (0, datetime.strptime(_text, _format))
+        except ValueError:
+            continue
+    return (1, _text)
+
+def natural_key(value: Any) -> Tuple:
+    '''text with runs of digits compared as numbers, "a2" < "a10"'''
+    _parts = _DIGITS.split(str(value).lower())
+    return (0, tuple((0, int(p), "") if i % 2 else (1, 0, p)
+                     for i, p in enumerate(_parts) if p != ""))
+
+SORT_KEYS: Dict[str, Callable[[Any], Any]] = {
+        "string": string_key,
+        "numeric": numeric_key,
+        "date": date_key,
+        "natural": natural_key,
+        }
+
+
+def _flag(key: Any) -> int:
+    '''0 for a key of the column's type, 1 for anything else'''
+    return key[0] if isinstance(key, tuple) else 0
+
+def _sort_descending(positions: List[int], keys: Sequence[Any]) -> None:
+    '''
+    sort positions on keys, largest first, with cells of other types
+    still last. Stable, so ties keep their order.
+    '''
+    positions.sort(key=keys.__getitem__, reverse=True)
+    positions.sort(key=lambda i: _flag(keys[i]))
+
+def _sorts_before(a: Sequence[Any], b: Sequence[Any],
+        sort_keys: Sequence[Tuple[str | int, bool]]) -> bool:
+    '''True if row keys a sort strictly before row keys b'''
+    for (_, _reverse), x, y in zip(sort_keys, a, b):
+        if x != y:
+            if _reverse and _flag(x) == _flag(y):
+                return x > y
+            return x < y
+    return False
+
+
+class SortEngine:
+    '''
+    Column sorting for a TableModel.
+
+    Each column has a key type (a name in SORT_KEYS or a key
+    function). Extracted keys are cached per cell and the ascending
+    and descending orders of each parent's children are cached per
+    column, so sorting again does not re-sort, and the descending
+    order is one pass over the ascending one. Ties keep their
+    current order either way. The model's listener events drop
+    stale entries.
+
+    Parameters:
+        model -> the TableModel to sort
+        default -> key type for columns without one
+    '''
+
+    def __init__(self, model: TableModel, default: str = "natural"):
+        self.model = model
+        self.default = default
+        self._types: Dict[int, str | Callable[[Any], Any]] = {}
+        self._keys: Dict[int, Dict[str, Any]] = {}
+        self._orders: Dict[Tuple[Any, ...], List[str]] = {}
+        # per (parent, column), the children the orders were built for
+        self._bases: Dict[Tuple[str, int], Any] = {}
+        model.subscribe(self._model_changed)
+
+    def set_column_type(self, col: str | int,
+            kind: str | Callable[[Any], Any]) -> None:
+        '''set a column's key type, a SORT_KEYS name or a key function'''
+        _index = self.model.column_index(col)
+        if isinstance(kind, str) and kind not in SORT_KEYS:
+            raise ValueError(f"unknown sort type {kind!r}, "
+                             f"expected one of {list(SORT_KEYS)}")
+        self._types[_index] = kind
+        self._forget_column(_index)
+
+    def column_type(self, col: str | int) -> str | Callable[[Any], Any]:
+        return self._types.get(self.model.column_index(col), self.default)
+
+    def key_function(self, col: str | int) -> Callable[[Any], Any]:
+        _kind = self.column_type(col)
+        return SORT_KEYS[_kind] if isinstance(_kind, str) else _kind
+
+    def keys(self, col: str | int, iids: Sequence[str]) -> List[Any]:
+        '''cached sort keys of a column for iids'''
+        _index = self.model.column_index(col)
+        _cache = self._keys.setdefault(_index, {})
+        _missing = [k for k in iids if k not in _cache]
+        if _missing:
+            _key = self.key_function(_index)
+            _cache.update(zip(_missing,
+                    map(_key, self.model.column(_index, _missing))))
+        return [_cache[k] for k in iids]
+
+    def ascending(self, parent: str, col: str | int) -> List[str]:
+        '''children of parent in ascending order. Do not mutate.'''
+        _index = self.model.column_index(col)
+        self._check_orders(parent, _index)
+        _order = self._orders.get((parent, _index))
+        if _order is None:
+            _children = list(self.model.children(parent))
+            if np is not None and self.column_type(_index) == "numeric":
+                _order = self._numeric_order(_index, _children)
+            else:
+                _keys = self.keys(_index, _children)
+                _positions = sorted(range(len(_children)),
+                                    key=_keys.__getitem__)
+                _order = [_children[i] for i in _positions]
+            self._orders[(parent, _index)] = _order
+        return _order
+
+    def _check_orders(self, parent: str, index: int) -> None:
+        '''
+        drop the cached orders of a column if parent's children were
+        reordered since without an event, e.g. sorted on another
+        column, as ties follow the current order. They still hold if
+        the children are in one of them, as after sorting on this
+        column.
+        '''
+        _children = self.model.children(parent)
+        if self._bases.get((parent, index)) is _children:
+            return
+        self._bases[(parent, index)] = _children
+        _orders = [self._orders.get(k) for k in
+                   ((parent, index), (parent, index, True))]
+        if any(o is not None for o in _orders):
+            _current = list(_children)
+            if _current not in _orders:
+                self._orders.pop((parent, index), None)
+                self._orders.pop((parent, index, True), None)
+
+    def _numeric_order(self, index: int, children: Sequence[str]) -> List[str]:
+        '''
+        NumPy argsort of the cached keys of the numbers, followed by
+        the other cells sorted as text, the same order as sorting on
+        numeric_key.
+        '''
+        _keys = self.keys(index, children)
+        _flags = np.fromiter(map(_flag, _keys), dtype=np.int8,
+                             count=len(_keys))
+        _numbers = np.flatnonzero(_flags == 0)
+        _values = np.fromiter((_keys[i][1] for i in _numbers.tolist()),
+                              dtype=float, count=len(_numbers))
+        _positions = _numbers[np.argsort(_values, kind="stable")].tolist()
+        _others = np.flatnonzero(_flags).tolist()
+        _others.sort(key=_keys.__getitem__)
+        return [children[i] for i in _positions + _others]
+
+    def descending(self, parent: str, col: str | int) -> List[str]:
+        '''
+        children of parent in descending order, cells of other types
+        still last. Do not mutate.
+        '''
+        _index = self.model.column_index(col)
+        self._check_orders(parent, _index)
+        _order = self._orders.get((parent, _index, True))
+        if _order is None:
+            _ascending = self.ascending(parent, _index)
+            _positions = list(range(len(_ascending)))
+            _sort_descending(_positions, self.keys(_index, _ascending))
+            _order = [_ascending[i] for i in _positions]
+            self._orders[(parent, _index, True)] = _order
+        return _order
+
+    def sorted_children(self, parent: str, col: str | int,
+            reverse: bool = False) -> List[str]:
+        '''children of parent sorted on col as a new list'''
+        if reverse:
+            return list(self.descending(parent, col))
+        return list(self.ascending(parent, col))
+
+    def sort_order(self, parent: str,
+            sort_keys: Sequence[Tuple[str | int, bool]]) -> List[str]:
+        '''
+        children of parent sorted on several (col, reverse) keys,
+        most significant first, as a new list. Rows that tie on every
+        key keep their current order.
+        '''
+        if len(sort_keys) == 1:
+            return self.sorted_children(parent, *sort_keys[0])
+        return self._sorted(list(self.model.children(parent)), sort_keys)
+
+    def _sorted(self, iids: List[str],
+            sort_keys: Sequence[Tuple[str | int, bool]]) -> List[str]:
+        '''iids sorted on sort_keys, ties in their order'''
+        _positions = list(range(len(iids)))
+        # stable sorts from the least significant key up
+        for _col, _reverse in reversed(sort_keys):
+            _keys = self.keys(_col, iids)
+            if _reverse:
+                _sort_descending(_positions, _keys)
+            else:
+                _positions.sort(key=_keys.__getitem__)
+        return [iids[i] for i in _positions]
+
+    def merge(self, parent: str, iids: Sequence[str],
+            sort_keys: Sequence[Tuple[str | int, bool]]) -> Tuple[List[str], int]:
+        '''
+        children of parent with iids, some of them, moved to where
+        they belong, and the first position that changed. The other
+        children must already be sorted on sort_keys. iids are
+        sorted on their own and each is bisected in after the one
+        before, so a batch costs a sort of the batch and a copy of
+        the children, not a sort of every child. Rows go after equal
+        rows.
+        '''
+        _children = list(self.model.children(parent))
+        _batch = list(iids)
+        if _children[len(_children) - len(_batch):] == _batch:
+            # appended, the usual case
+            _old = _children[:len(_children) - len(_batch)]
+        else:
+            _new = set(_batch)
+            _old = [k for k in _children if k not in _new]
+        _batch = self._sorted(_batch, sort_keys)
+        _rows = zip(*[self.keys(c, _batch) for c, _ in sort_keys])
+        # the other children's keys straight from the caches
+        _caches = [self._keys[self.model.column_index(c)]
+                   for c, _ in sort_keys]
+        def _keys_of(iid: str) -> List[Any]:
+            try:
+                return [c[iid] for c in _caches]
+            except KeyError:
+                return self.row_keys(iid, sort_keys)
+        # one ascending key bisects in C
+        _ascending = len(sort_keys) == 1 and not sort_keys[0][1]
+        _low = 0
+        _order: List[str] = []
+        _first = None
+        for _iid, _row in zip(_batch, _rows):
+            _start = _low
+            _high = len(_old)
+            if _ascending:
+                try:
+                    _low = _high = bisect_right(_old, _row[0], _low,
+                                                key=_caches[0].__getitem__)
+                except KeyError:
+                    # an edited row, its key is read below
+                    pass
+            while _low < _high:
+                _mid = (_low + _high) // 2
+                if _sorts_before(_row, _keys_of(_old[_mid]), sort_keys):
+                    _high = _mid
+                else:
+                    _low = _mid + 1
+            _order.extend(_old[_start:_low])
+            if _first is None:
+                _first = len(_order)
+            _order.append(_iid)
+        _order.extend(_old[_low:])
+        return _order, len(_order) if _first is None else _first
+
+    def row_keys(self, iid: str,
+            sort_keys: Sequence[Tuple[str | int, bool]]) -> List[Any]:
+        return [self.keys(_col, (iid,))[0] for _col, _ in sort_keys]
+
+    def bisect(self, parent: str, iid: str,
+            sort_keys: Sequence[Tuple[str | int, bool]]) -> int:
+        '''
+        position iid belongs at among the other children of parent,
+        which must already be sorted on sort_keys. Rows go after
+        equal rows. The result is a move index for iid.
+        '''
+        _children = self.model.children(parent)
+        _skip = self.model.index(iid)
+        _row = self.row_keys(iid, sort_keys)
+        _low, _high = 0, len(_children) - 1
+        while _low < _high:
+            _mid = (_low + _high) // 2
+            _other = _children[_mid if _mid < _skip else _mid + 1]
+            if _sorts_before(_row, self.row_keys(_other, sort_keys),
+                    sort_keys):
+                _high = _mid
+            else:
+                _low = _mid + 1
+        return _low
+
+    def _forget_column(self, index: int) -> None:
+        self._keys.pop(index, None)
+        for _key in [k for k in self._orders if k[1] == index]:
+            del self._orders[_key]
+
+    def _model_changed(self, event: str, parent: str | None,
+            iids: Sequence[str], col: int | None) -> None:
+        if event == "update":
+            _columns = list(self._keys) if col is None else [col]
+            for _index in _columns:
+                _cache = self._keys.get(_index)
+                if _cache is not None:
+                    for k in iids:
+                        _cache.pop(k, None)
+            for _key in [k for k in self._orders
+                         if col is None or k[1] == col]:
+                del self._orders[_key]
+        else:
+            if event == "delete":
+                for _cache in self._keys.values():
+                    for k in iids:
+                        _cache.pop(k, None)
+                self._orders = {k: v for k, v in self._orders.items()
+                                if k[0] != iids[0] and k[0] != parent}
+                self._bases = {k: v for k, v in self._bases.items()
+                               if k[0] != iids[0]}
+            else:
+                for _key in [k for k in self._orders if k[0] == parent]:
+                    del self._orders[_key]
@@ -0,0 +1,169 @@
+# Copyright (c) 2024 kbt | terminus, LLC
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import time
+from collections import deque
+from typing import Any, List, Iterable, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from tk_treeview_table import TreeviewTable
+
+# milliseconds between flushes, about one frame
+STREAM_FRAME_MS = 16
+
+# milliseconds of each frame a flush may spend inserting rows
+STREAM_BUDGET_MS = 8
+
+
+class LiveFeed:
+    '''
+    Streaming append mode for tail style feeds.
+
+    append and extend only queue rows, so they are cheap and can be
+    called from any thread. Once a frame the queued rows are added
+    to the table in one insert_rows call. The number of rows added
+    per flush adapts to keep the flush inside budget_ms. Rows that
+    can't keep up stay queued.
+
+    With max_rows the table is a ring buffer: the rows added first
+    are dropped once there are more than max_rows, wherever a sort
+    has put them. While they are on top an even number is dropped at
+    a time so the rows left keep their stripes. Queued
+    rows that would be dropped straight away are never inserted.
+
+    With autoscroll the table follows new rows while it is scrolled
+    to the bottom. Scroll up and it stays put.
+
+    Parameters:
+        table -> the TreeviewTable to append to
+        parent -> the parent to append rows to
+        max_rows -> most rows kept, or None to keep them all
+        frame_ms -> milliseconds between flushes
+        budget_ms -> milliseconds a flush may take
+        autoscroll -> follow new rows when scrolled to the bottom
+    '''
+
+    def __init__(self, table: "TreeviewTable", *, parent: str = "",
+            max_rows: int | None = None,
+            frame_ms: int = STREAM_FRAME_MS,
+            budget_ms: float = STREAM_BUDGET_MS,
+            autoscroll: bool = True):
+        self.table = table
+        self.parent = parent
+        self.max_rows = max_rows
+        self.frame_ms = frame_ms
+        self.budget_ms = budget_ms
+        self.autoscroll = autoscroll
+        self.rows_added: int = 0
+        self.rows_dropped: int = 0
+        self.flushes: int = 0
+        self.closed: bool = False
+
+        self._pending: deque = deque()
+        # rows added, oldest first, whatever order the table shows
+        self._rows: deque = deque()
+        # rows inserted per millisecond, measured
+        self._rate: float | None = None
+        self._after_id: str | None = table.after(frame_ms, self._flush)
+
+    def append(self, row: Iterable[Any]) -> None:
+        '''queue one row of values'''
+        self._pending.append(row)
+
+    def extend(self, rows: Iterable[Iterable[Any]]) -> None:
+        '''queue many rows of values'''
+        self._pending.extend(rows)
+
+    @property
+    def pending(self) -> int:
+        '''rows queued and not yet in the table'''
+        return len(self._pending)
+
+    def _take(self) -> List[Any]:
+        '''the queued rows that fit in this frame's budget'''
+        _pending = self._pending
+        if self.max_rows is not None:
+            while len(_pending) > self.max_rows:
+                _pending.popleft()
+                self.rows_dropped += 1
+        _count = len(_pending)
+        if self._rate is not None:
+            _count = min(_count, max(1, int(self._rate * self.budget_ms)))
+        return [_pending.popleft() for _ in range(_count)]
+
+    def _flush(self) -> None:
+        '''add the queued rows, trim and follow, then reschedule'''
+        self._after_id = None
+        if self.closed:
+            return
+        _rows = self._take()
+        if _rows:
+            _start = time.perf_counter()
+            _table = self.table
+            _pinned = self.autoscroll and _table.yview()[1] >= 1.0
+            _iids = _table.insert_rows(self.parent, _rows)
+            self._rows.extend(_iids)
+            self._trim()
+            if _pinned and _iids[-1] in _table.model:
+                _table.see_row(_iids[-1])
+            _rate = len(_rows) / max(0.001,
+                    (time.perf_counter() - _start) * 1000)
+            self._rate = _rate if self._rate is None \
+                    else (self._rate + _rate) / 2
+            self.rows_added += len(_rows)
+            self.flushes += 1
+        self._after_id = self.table.after(self.frame_ms, self._flush)
+
+    def _trim(self) -> None:
+        '''drop the oldest rows past max_rows'''
+        if self.max_rows is None:
+            return
+        _children = self.table.model.children(self.parent)
+        _excess = len(_children) - self.max_rows
+        if _excess <= 0:
+            return
+        _oldest = self._oldest(_excess)
+        # unless sorted or moved the oldest rows are on top, and an
+        # even count keeps the stripes of the rows left
+        _on_top = _oldest == _children[:len(_oldest)]
+        if _on_top and len(_oldest) % 2:
+            _oldest += self._oldest(1)
+        self.table.delete_rows(_oldest, restripe=not _on_top)
+        self.rows_dropped += len(_oldest)
+
+    def _oldest(self, count: int) -> List[str]:
+        '''take up to count of the oldest rows still in the table'''
+        _children = self.table.model.children(self.parent)
+        _oldest: List[str] = []
+        while self._rows and len(_oldest) < count:
+            _iid = self._rows.popleft()
+            if _iid in _children:
+                _oldest.append(_iid)
+        return _oldest
+
+    def close(self) -> None:
+        '''stop flushing. Rows still queued are discarded.'''
+        self.closed = True
+        self._pending.clear()
+        if self._after_id is not None:
+            self.table.after_cancel(self._after_id)
+            self._after_id = None
+        if self in self.table.feeds:
+            self.table.feeds.remove(self)
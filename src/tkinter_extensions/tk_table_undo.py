@@ -0,0 +1,287 @@
+# Copyright (c) 2024 kbt | terminus, LLC
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+from contextlib import contextmanager
+from typing import Any, List, Tuple, Sequence, Iterable, Iterator, \
+        TYPE_CHECKING
+from tk_table_model import TableModel
+
+if TYPE_CHECKING:
+    from tk_treeview_table import TreeviewTable
+
+# cells the journal keeps before dropping the oldest edits
+UNDO_MAX_CELLS = 2_000_000
+
+# edits the journal keeps before dropping the oldest
+UNDO_MAX_EDITS = 100
+
+# A saved row is (parent, index, iid, text, values), parents before
+# their children, so saved rows can be inserted again in order.
+SavedRow = Tuple[str, int, str, str, List[Any]]
+
+
+class CellChange:
+    '''
+    One column of cells changed by an edit, stored column-wise as
+    the iids and their old and new values. Unchanged cells are left
+    out when the edit ends.
+    '''
+
+    def __init__(self, col: int, iids: List[str], old: List[Any]):
+        self.col = col
+        self.iids = iids
+        self.old = old
+        self.new: List[Any] = old
+
+    @property
+    def cells(self) -> int:
+        return len(self.iids)
+
+    def finish(self, model: TableModel) -> None:
+        '''read the new values and drop the cells that did not change'''
+        if all(k in model for k in self.iids):
+            _new = model.column(self.col, self.iids)
+        else:
+            # rows deleted later in the edit keep their old values
+            _new = [model.get(k, self.col) if k in model else o
+                    for k, o in zip(self.iids, self.old)]
+        _keep = [i for i, (o, n) in enumerate(zip(self.old, _new)) if o != n]
+        if len(_keep) != len(self.iids):
+            self.iids = [self.iids[i] for i in _keep]
+            self.old = [self.old[i] for i in _keep]
+            _new = [_new[i] for i in _keep]
+        self.new = _new
+
+    def undo(self, table: "TreeviewTable") -> None:
+        table._restore_cells(self.col, self.iids, self.old)
+
+    def redo(self, table: "TreeviewTable") -> None:
+        table._restore_cells(self.col, self.iids, self.new)
+
+
+class RowsAdded:
+    '''rows added by an edit. They are saved when the edit is undone.'''
+
+    def __init__(self, iids: List[str]):
+        self.iids = iids
+        self.saved: List[SavedRow] = []
+
+    @property
+    def cells(self) -> int:
+        return len(self.iids) + sum(len(r[4]) for r in self.saved)
+
+    def finish(self, model: TableModel) -> None:
+        self.iids = [k for k in self.iids if k in model]
+
+    def undo(self, table: "TreeviewTable") -> None:
+        # rows deleted since, outside an edit, are gone for good
+        self.iids = [k for k in self.iids if k in table.model]
+        self.saved = save_rows(table.model, self.iids)
+        table.delete_rows(self.iids)
+
+    def redo(self, table: "TreeviewTable") -> None:
+        table._restore_rows(self.saved)
+        self.saved = []
+
+
+class RowsDeleted:
+    '''rows deleted by an edit, saved with their children'''
+
+    def __init__(self, saved: List[SavedRow]):
+        self.saved = saved
+
+    @property
+    def cells(self) -> int:
+        return sum(len(r[4]) + 1 for r in self.saved)
+
+    def finish(self, model: TableModel) -> None:
+        pass
+
+    def undo(self, table: "TreeviewTable") -> None:
+        table._restore_rows(self.saved)
+
+    def redo(self, table: "TreeviewTable") -> None:
+        _saved = {r[2] for r in self.saved}
+        table.delete_rows([r[2] for r in self.saved if r[0] not in _saved])
+
+
+Change = CellChange | RowsAdded | RowsDeleted
+
+
+def save_rows(model: TableModel, iids: Iterable[str]) -> List[SavedRow]:
+    '''
+    save rows and their children so they can be inserted again.
+    Rows under another saved row are saved with it.
+    '''
+    _iids = set(iids)
+    _tops = []
+    for _iid in _iids:
+        _parent = model.parent(_iid)
+        while _parent != "" and _parent not in _iids:
+            _parent = model.parent(_parent)
+        if _parent == "":
+            _tops.append((model.parent(_iid), model.index(_iid), _iid))
+    _saved: List[SavedRow] = []
+    def _save(parent: str, index: int, iid: str) -> None:
+        _saved.append((parent, index, iid, model.text(iid), model.values(iid)))
+        for i, _child in enumerate(model.children(iid)):
+            _save(iid, i, _child)
+    # in position order, so each index is right when inserted again
+    for _parent, _index, _iid in sorted(_tops, key=lambda t: (t[0], t[1])):
+        _save(_parent, _index, _iid)
+    return _saved
+
+
+class Edit:
+    '''the changes made by one user action, undone and redone together'''
+
+    def __init__(self, label: str):
+        self.label = label
+        self.changes: List[Change] = []
+
+    @property
+    def cells(self) -> int:
+        return sum(c.cells for c in self.changes)
+
+
+class UndoJournal:
+    '''
+    Undo and redo history for a TreeviewTable.
+
+    Changes are only recorded inside an edit (see edit()). Cell
+    changes are kept column-wise: the old values are read when
+    recorded and the new ones when the edit ends, and cells that did
+    not change are dropped. Undoing an edit writes each changed
+    column back in one batch.
+
+    The oldest edits are dropped once the history holds more than
+    max_cells cells or max_edits edits. An edit bigger than
+    max_cells on its own is not kept.
+
+    Parameters:
+        model -> the TableModel the changes are read from
+        max_cells -> most cells kept
+        max_edits -> most edits kept
+    '''
+
+    def __init__(self, model: TableModel, max_cells: int = UNDO_MAX_CELLS,
+            max_edits: int = UNDO_MAX_EDITS):
+        self.model = model
+        self.max_cells = max_cells
+        self.max_edits = max_edits
+        self.undo_stack: List[Edit] = []
+        self.redo_stack: List[Edit] = []
+        self._open: Edit | None = None
+        self._depth: int = 0
+        self._cells: int = 0
+
+    @property
+    def recording(self) -> bool:
+        return self._open is not None
+
+    def begin(self, label: str) -> None:
+        '''start an edit. Edits begun inside it are part of it.'''
+        if self._depth == 0:
+            self._open = Edit(label)
+        self._depth += 1
+
+    def end(self) -> None:
+        '''finish the edit begun last'''
+        self._depth -= 1
+        if self._depth > 0 or self._open is None:
+            return
+        _edit, self._open = self._open, None
+        for _change in _edit.changes:
+            _change.finish(self.model)
+        _edit.changes = [c for c in _edit.changes if c.cells]
+        if not _edit.changes:
+            return
+        self.redo_stack.clear()
+        self._push(_edit)
+
+    @contextmanager
+    def edit(self, label: str) -> Iterator["UndoJournal"]:
+        '''record the changes made in a with block as one edit'''
+        self.begin(label)
+        try:
+            yield self
+        finally:
+            self.end()
+
+    def _push(self, edit: Edit) -> None:
+        self.undo_stack.append(edit)
+        self._cells += edit.cells
+        while self.undo_stack and (self._cells > self.max_cells or
+                len(self.undo_stack) > self.max_edits):
+            self._cells -= self.undo_stack.pop(0).cells
+
+    # recording, called before or after the table changes
+
+    def record_cells(self, iids: Sequence[str],
+            cols: Iterable[int] | None = None) -> None:
+        '''before cells change: save the old values of cols of iids'''
+        if self._open is None or not iids:
+            return
+        _iids = list(iids)
+        if cols is None:
+            cols = range(len(self.model.columns))
+        for _col in cols:
+            self._open.changes.append(CellChange(_col, _iids,
+                    self.model.column(_col, _iids)))
+
+    def record_insert(self, iids: Sequence[str]) -> None:
+        '''after rows are added'''
+        if self._open is not None and iids:
+            self._open.changes.append(RowsAdded(list(iids)))
+
+    def record_delete(self, iids: Iterable[str]) -> None:
+        '''before rows are deleted'''
+        if self._open is not None:
+            _saved = save_rows(self.model, iids)
+            if _saved:
+                self._open.changes.append(RowsDeleted(_saved))
+
+    # undo and redo
+
+    def undo(self, table: "TreeviewTable") -> Edit | None:
+        '''undo the last edit on table and return it'''
+        if self._open is not None or not self.undo_stack:
+            return None
+        _edit = self.undo_stack.pop()
+        self._cells -= _edit.cells
+        for _change in reversed(_edit.changes):
+            _change.undo(table)
+        self.redo_stack.append(_edit)
+        return _edit
+
+    def redo(self, table: "TreeviewTable") -> Edit | None:
+        '''redo the last undone edit on table and return it'''
+        if self._open is not None or not self.redo_stack:
+            return None
+        _edit = self.redo_stack.pop()
+        for _change in _edit.changes:
+            _change.redo(table)
+        self._push(_edit)
+        return _edit
+
+    def clear(self) -> None:
+        self.undo_stack.clear()
+        self.redo_stack.clear()
+        self._cells = 0
@@ -18,26 +18,133 @@
 # OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 # SOFTWARE.
 
-from typing import Any, List, Dict, Tuple, Literal
+import re
+from itertools import chain, islice
+from typing import Any, List, Dict, Tuple, Sequence, Iterable, \
+        Iterator, Callable
 import tkinter as tk
 from tkinter import ttk
+from tk_table_model import TableModel
+from tk_table_sort import SortEngine
+from tk_table_filter import FilterEngine, Condition
+from tk_table_io import Parser, PARSERS, write_rows
+from tk_table_loader import TableLoader
+from tk_table_stream import LiveFeed
+from tk_table_undo import UndoJournal, SavedRow, UNDO_MAX_CELLS
+from tk_cell_editor import CellEditor, Validator
+from tk_table_iids import IidRegistry, UniqueStrategy
+from tk_scroll_controller import ScrollController
+from tk_table_lazy import LazyChildren, ChildProvider, LAZY_MAX_GROUPS
+from tk_table_group import GroupAggregates, group_rows, check_aggregates, \
+        GROUP_SEPARATOR
 
 UPARROW = "⬆"
 DOWNARROW = "⬇"
+SLOT_PREFIX = "slot"
+
+# above this many rows, rows placed in a sorted table are merged in
+# and shown with one reorder instead of a move each
+PLACE_SORTED_LIMIT = 64
+
+# pastes bigger than this many cells are applied in slices of this size
+PASTE_SLICE_CELLS = 50_000
+
+# rows import_file sends to the table at a time
+IMPORT_CHUNK_ROWS = 10_000
+
+# rows below the view restriped ahead of scrolling. Rows further down
+# get their stripes when they are scrolled into view.
+STRIPE_AHEAD_ROWS = 200
+
+# inserts a flat list of {iid values tag} triples in one Tcl call
+_INSERT_BATCH = ("w parent index rows", '''
+    foreach {iid values tag} $rows {
+        $w insert $parent $index -id $iid -values $values -tags [list $tag]
+        if {$index ne "end"} {incr index}
+    }
+''')
+
+# sets the text and values of a flat list of {iid text values} triples
+# in one Tcl call
+_ROW_BATCH = ("w rows", '''
+    foreach {iid text values} $rows {
+        $w item $iid -text $text -values $values
+    }
+''')
+
+# fills virtual mode slots from a flat list of {iid text values tag}
+# quadruples in one Tcl call
+_SLOT_BATCH = ("w rows", '''
+    foreach {iid text values tag} $rows {
+        $w item $iid -text $text -values $values -tags [list $tag]
+    }
+''')
+
+# sets one column of a flat list of {iid value} pairs in one Tcl call
+_SET_BATCH = ("w col rows", '''
+    foreach {iid value} $rows {
+        $w set $iid $col $value
+    }
+''')
+
+# sets the text of a flat list of {iid text} pairs in one Tcl call
+_TEXT_BATCH = ("w rows", '''
+    foreach {iid text} $rows {
+        $w item $iid -text $text
+    }
+''')
+
+# sets the values of a flat list of {iid values} pairs in one Tcl call
+_ITEM_BATCH = ("w rows", '''
+    foreach {iid values} $rows {
+        $w item $iid -values $values
+    }
+''')
 
 class TreeviewTable(ttk.Treeview):
     '''
     Extension of a Treeview object.
     Has some similar functionality to Excel.
 
+    The rows are kept in self.model (a TableModel) and the Treeview
+    items are a view over it. Reads come from the model. Treeview
+    insert, item, set, move and delete are mirrored into the model.
+
     Parameters:
         master(parent) -> the parent Tk object
         root -> tK object. Used for the clipboard
+        virtual -> only materialize the rows in view (plus overscan)
+            as Treeview items. Virtual tables are always flat.
+        yscrollcommand -> pass it as a keyword, not with configure.
+            The table uses it to stripe rows scrolled into view, and
+            in virtual mode to report the model's scroll position.
+        overscan -> extra rows materialized below the viewport
+        parser -> how pasted, typed and imported text is split into
+            cells. A name from tk_table_io.PARSERS ("auto", "tsv",
+            "csv", "plain") or a function taking a str or text file
+            and yielding rows. "auto" sniffs the delimiter. Text
+            typed or pasted into one cell, with no tab or newline, is
+            written as is.
+        debug -> print what the table is doing to stdout
+        undo_cells -> cells of undo history kept. See UndoJournal.
+        lazy_groups -> groups with a child provider kept loaded
+            before closed ones are released. See LazyChildren.
+        unique_iids -> how a group named like an existing row gets a
+            free iid: "numbered" (Sedan1, Sedan2), "parenthesized"
+            (Sedan (2)) or a function. See IidRegistry.
     '''
 
-    def __init__(self, root: tk.Tk, parent_obj: tk.Frame | tk.Tk, *, flat=False, **kw):
+    def __init__(self, root: tk.Tk, parent_obj: tk.Frame | tk.Tk, *,
+            flat=False, virtual=False, overscan=10,
+            parser: str | Parser = "auto", debug=False,
+            undo_cells: int = UNDO_MAX_CELLS,
+            lazy_groups: int = LAZY_MAX_GROUPS,
+            unique_iids: str | UniqueStrategy = "numbered", **kw):
 
+        self._yscrollcommand = kw.pop("yscrollcommand", None)
         super().__init__(parent_obj, **kw)
+        if not virtual:
+            self.configure(yscrollcommand=self._tree_yscroll)
 
         self.selected_iid: str = ''
         self.selected_column: str = '#0'
@@ -48,6 +155,10 @@ class TreeviewTable(ttk.Treeview):
         self.bind("<Control-V>", self.accept_new_text_paste)
         self.bind("<Delete>", self.delete_items)
         self.bind("<Tab>", self.next_cell_tab)
+        self.bind("<Escape>", self.cancel_paste)
+        self.bind("<Control-z>", self.undo)
+        self.bind("<Control-y>", self.redo)
+        self.bind("<Control-Z>", self.redo)
 
         # config options are: background, foreground, font, image
         self.tag_configure("odd", background="lightblue")
@@ -55,12 +166,74 @@ class TreeviewTable(ttk.Treeview):
         self.tag_configure("tree", background="#06428B")
         self.parent_obj: tk.Frame | tk.Tk = parent_obj
         self.root = root
-        self.flat = flat
-
-        # set column sort:
+        self.flat = flat or virtual
+        self.virtual = virtual
+        self.overscan = overscan
+        self.debug = debug
+        self.parser: Parser = PARSERS[parser] if isinstance(parser, str) \
+                else parser
+        self.model = TableModel(self['columns'])
+        self.iids = IidRegistry(self.model, unique_iids)
+        self.sorter = SortEngine(self.model)
+        self.filters = FilterEngine(self.model)
+        self.journal = UndoJournal(self.model, max_cells=undo_cells)
+        self.editor = CellEditor(self, self._accept_text_array)
+        self.lazy = LazyChildren(self, max_groups=lazy_groups)
+        self.groups: GroupAggregates | None = None
+
+        # rows shown per filtered parent. Other rows are detached.
+        self.filter_conditions: List[Condition] = []
+        self._filtered: Dict[str, List[str]] = {}
+        self._filter_dirty: set[str] = set()
+        self._refilter_pending: bool = False
+        self.model.subscribe(self._filter_model_changed)
+
+        # stripe tag each row has in Tk, and per parent the first
+        # position that may need a new stripe
+        self._stripes: Dict[str, str] = {}
+        self._stripe_dirty: Dict[str, int] = {}
+        self._restripe_pending: bool = False
+        self.paste_job: PasteJob | None = None
+        self.loaders: List[TableLoader] = []
+        self.feeds: List[LiveFeed] = []
+
+        if not self.flat:
+            self.bind("<<TreeviewOpen>>",
+                    lambda _: self.lazy.opened(self.focus()))
+            self.bind("<<TreeviewClose>>",
+                    lambda _: self.lazy.closed(self.focus()))
+
+        if virtual:
+            self._top: int = 0
+            self._visible: int = int(self['height'])
+            self._slots: List[str] = []
+            self._attached: int = 0
+            self._slot_rows: Dict[str, str] = {}
+            self._row_slots: Dict[str, str] = {}
+            self._virtual_selection: set[str] = set()
+            self._render_pending: bool = False
+
+            self.bind("<Configure>", self._virtual_configure)
+            self.bind("<<TreeviewSelect>>", self._virtual_sync_selection)
+            self.bind("<ButtonPress-1>", self._virtual_click)
+            self.bind("<Up>", lambda _: self._virtual_step(-1))
+            self.bind("<Down>", lambda _: self._virtual_step(1))
+            # the class bindings scroll the slots in Tcl, not the model
+            self.bind("<Prior>", lambda _: self._virtual_step(-self._visible))
+            self.bind("<Next>", lambda _: self._virtual_step(self._visible))
+
+        # wheel and middle drag scrolling, once a frame. In virtual
+        # mode this goes through yview and scrolls the model.
+        self.scroller = ScrollController(self,
+                lambda units: self.yview_scroll(units, tk.UNITS))
+
+        # set column sort. shift-click adds a column to the sort:
+        self.sort_stack: List[Tuple[str, bool]] = []
+        self._heading_suffix: Dict[str, str] = {}
         for col in self['columns']:
             self.heading(col, command= lambda _col=col:
-                    self.sort_by_col(_col, False))
+                    self.sort_heading(_col))
+        self.bind("<Shift-Button-1>", self._shift_heading_click)
 
         # add right click popup
         self.popup = RightClickMenu(parent_obj, self)
@@ -74,40 +247,77 @@ class TreeviewTable(ttk.Treeview):
     @property
     def selected_parent(self) -> str:
         '''parent of selected_iid'''
-        return self.parent(self.selected_iid)
+        return self._parent_of(self.selected_iid)
 
     @property
     def selected_item(self):
         '''item of selected_iid'''
-        return self.item(self.selected_iid)
+        return {"text": self.model.text(self.selected_iid),
+                "values": self.model.values(self.selected_iid)}
+
+    # The selected_* properties read the model, not Tk, so they are
+    # cheap to call repeatedly in a handler.
 
     @property
     def selected_text(self) -> str:
         '''text of selected_iid'''
-        if self.selected_item.get("text") == None:
-            return ""
-        return self.selected_item.get("text")
+        return self.model.text(self.selected_iid) or ""
 
     @property
-    def selected_values(self) -> list[Any] | Literal['']:
+    def selected_values(self) -> list[Any]:
         '''values of selected_iid'''
-        return self.selected_item.get("values")
+        return self.model.values(self.selected_iid)
 
     @property
     def other_selected_options(self) -> list[str]:
-        print(f'other selected options: {list(self.get_children(self.selected_parent))}')
-        return list(self.get_children(self.selected_parent))
+        return list(self._children(self.selected_parent))
 
     @property
     def other_selected_options_index(self) -> int:
-        return list(self.get_children(
-            self.selected_parent)).index(self.selected_iid)
+        return self.model.index(self.selected_iid)
 
     def parse_new(self, text) -> List[List[str]]:
         ''' parse the new enterered text'''
-        text_array = [t.split('\t') for t in text.split('\n')]
-        return text_array
-
+        if not any(c in text for c in "\t\r\n"):
+            # one cell as typed, quotes and all
+            return [[text]]
+        # pasted cells
+        return list(self.parser(text)) or [[""]]
+
+    def parse_rows(self, text) -> Iterator[List[str]]:
+        '''parse pasted text lazily, one row at a time'''
+        return self.parser(text)
+
+    def import_file(self, path: str, *, parent: str = "",
+            header: bool = False, encoding: str = "utf-8-sig") -> int:
+        '''
+        Append the rows of a delimited text file to parent, parsed
+        with self.parser. The file is streamed and the rows are sent
+        to the table IMPORT_CHUNK_ROWS at a time. With header the
+        first row names the column headings. Returns the number of
+        rows added.
+        '''
+        _count = 0
+        with open(path, newline="", encoding=encoding) as _file:
+            _rows = self.parser(_file)
+            if header:
+                for i, _name in enumerate(next(_rows, [])[:len(self['columns'])]):
+                    self.heading(f"#{i + 1}", text=_name)
+                    self._heading_suffix.pop(f"#{i + 1}", None)
+                self._show_sort_headings()
+            while True:
+                _chunk = list(islice(_rows, IMPORT_CHUNK_ROWS))
+                if not _chunk:
+                    break
+                self.insert_rows(parent, _chunk)
+                _count += len(_chunk)
+        return _count
+
+
+    def _debug(self, *args) -> None:
+        '''print only when the table was made with debug=True'''
+        if self.debug:
+            print(*args)
 
     def select_item(self) -> None:
         '''Some useful development code'''
@@ -119,137 +329,1006 @@ class TreeviewTable(ttk.Treeview):
         print(self.item(cur_item))
 
 
-    def redo_row_colors(self) -> None:
-        if self.flat:
-            for i, _item in enumerate(self.get_children()):
-                _tags = list(self.item(_item, 'tags'))
-                if i % 2 == 0 and 'odd' in _tags:
-                    _tags.remove('odd')
-                    _tags.append('even')
-                elif i % 2 != 0 and 'even' in _tags:
-                    _tags.remove('even')
-                    _tags.append('odd')
-                self.item(_item, tags=_tags)
+    # Treeview writes are mirrored into the model so code using
+    # the plain Treeview API keeps it current. Slot items used by
+    # virtual mode are not rows and are passed straight through.
+
+    def insert(self, parent, index, iid=None, **kw):
+        if self.virtual:
+            return super().insert(parent, index, iid, **kw)
+        if iid is None:
+            iid = self.model.new_iid()
+        _iid = super().insert(parent, index, iid, **kw)
+        self.model.insert(parent, index,
+                iid=_iid,
+                text=kw.get("text", ""),
+                values=kw.get("values", ()))
+        return _iid
+
+    def item(self, item, option=None, **kw):
+        if not self.virtual and item in self.model:
+            if "text" in kw:
+                self.model.set_text(item, kw["text"])
+            if "values" in kw:
+                self.model.set_values(item, kw["values"])
+        return super().item(item, option, **kw)
+
+    def set(self, item, column=None, value=None):
+        if value is not None and not self.virtual and item in self.model:
+            self.model.set(item, column, value)
+        return super().set(item, column, value)
+
+    def move(self, item, parent, index):
+        super().move(item, parent, index)
+        if not self.virtual and item in self.model:
+            self.model.move(item, parent, index)
+
+    def delete(self, *items):
+        super().delete(*items)
+        if not self.virtual:
+            for i in items:
+                if i in self.model:
+                    self.model.delete(i)
+
+    def set_children(self, item, *newchildren):
+        super().set_children(item, *newchildren)
+        if not self.virtual:
+            self.model.reorder(item, newchildren)
+
+
+    # Row access through the model.
+
+    def _children(self, parent: str = "") -> Sequence[str]:
+        '''children of parent in order. Do not mutate.'''
+        return self.model.children(parent)
+
+    def _parent_of(self, iid: str) -> str:
+        return self.model.parent(iid)
+
+    def _values_of(self, iid: str) -> List[Any]:
+        '''values of a row as a new list'''
+        return self.model.values(iid)
+
+    def _reorder(self, parent: str, iids: Sequence[str]) -> None:
+        '''show the children of parent in a new order'''
+        if self.virtual:
+            self.model.reorder(parent, iids)
+            self._schedule_render()
+        elif self.lazy.unloaded(parent):
+            # only the placeholder is in Tk
+            return
+        else:
+            self.set_children(parent, *iids)
+        if parent in self._filtered:
+            # set_children attached the hidden rows again
+            self._filter_dirty.add(parent)
+            self._refilter()
+
+    def _move_row(self, iid: str, parent: str, index: int) -> None:
+        if self.virtual:
+            self.model.move(iid, parent, index)
+            self._schedule_render()
+        else:
+            self.move(iid, parent, index)
 
+    def _write_values(self, iid: str, values: List[Any]) -> None:
+        self.journal.record_cells([iid])
+        if self.virtual:
+            self.model.set_values(iid, values)
+            self._schedule_render()
         else:
-            _parent_list = self.get_children()
-            for p in _parent_list:
-                for i, _item in enumerate(self.get_children(p)):
-                    _tags = list(self.item(_item, 'tags'))
-                    if i % 2 == 0 and 'odd' in _tags:
-                        _tags.remove('odd')
-                        _tags.append('even')
-                    elif i % 2 != 0 and 'even' in _tags:
-                        _tags.remove('even')
-                        _tags.append('odd')
-                    self.item(_item, tags=_tags)
+            self.item(iid, values=values)
 
+    def _write_values_batch(self, updates: Sequence[Tuple[str, List[Any]]]) -> None:
+        '''set the values of many rows with one Tcl call'''
+        if not updates:
+            return
+        self.journal.record_cells([_iid for _iid, _ in updates])
+        for _iid, _values in updates:
+            self.model.set_values(_iid, _values)
+        if self.virtual:
+            self._schedule_render()
+            return
+        self.tk.call("apply", _ITEM_BATCH, self._w, tuple(chain.from_iterable(
+                (_iid, tuple(_values)) for _iid, _values in updates)))
+
+    def _write_text(self, iid: str, text: str) -> None:
+        self.journal.record_cells([iid], [-1])
+        if self.virtual:
+            self.model.set_text(iid, text)
+            self._schedule_render()
+        else:
+            self.item(iid, text=text)
+
+    def _row_iid(self, item: str) -> str:
+        '''row iid of a Treeview item (slots map to model rows)'''
+        if self.virtual:
+            return self._slot_rows.get(item, "")
+        return item
+
+    def _view_iid(self, iid: str) -> str:
+        '''Treeview item currently showing a row'''
+        if self.virtual:
+            return self._row_slots.get(iid, "")
+        return iid
+
+    def _focus_row(self, iid: str) -> None:
+        '''focus a row, scrolling it into view'''
+        self.see_row(iid)
+        self.focus(self._view_iid(iid))
+
+    def _select_row(self, iid: str) -> None:
+        '''make iid the only selected row'''
+        if self.virtual:
+            self._virtual_selection = {iid}
+            self.see_row(iid)
+        else:
+            self.selection_set(iid)
+        self.focus(self._view_iid(iid))
 
-    def insert_row(self,*,parent,text="",index,values=(), open=False):
-        '''Returns a new node in a Treview object'''
+    def selected_rows(self) -> List[str]:
+        '''selected row iids in display order'''
+        if self.virtual:
+            return [k for k in self._shown("")
+                    if k in self._virtual_selection]
+        return list(self.selection())
+
+
+    # Virtual mode. A fixed pool of slot items is reused for the rows
+    # between self._top and self._top + self._visible + self.overscan.
 
+    def _row_height(self) -> int:
+        _height = ttk.Style(self).lookup(
+                self.cget("style") or "Treeview", "rowheight")
+        try:
+            return int(_height)
+        except (TypeError, ValueError):
+            return 20
+
+    def _schedule_render(self) -> None:
+        '''coalesce model changes into a single render'''
+        if not self._render_pending:
+            self._render_pending = True
+            self.after_idle(self._render)
+
+    def _render(self) -> None:
+        '''materialize the rows in view into the slot pool'''
+        self._render_pending = False
+        _rows = self._shown("")
+        self._top = max(0, min(self._top, len(_rows) - self._visible))
+        _window = _rows[self._top:self._top + self._visible + self.overscan]
+
+        while len(self._slots) < len(_window):
+            self._slots.append(self.insert("", tk.END,
+                    iid=f"{SLOT_PREFIX}{len(self._slots)}"))
+        if self._attached != len(_window):
+            # detaches any slots that are not needed
+            self.set_children("", *self._slots[:len(_window)])
+            self._attached = len(_window)
+
+        _selected = []
+        _batch: List[Any] = []
+        for _n, (_slot, _iid) in enumerate(zip(self._slots, _window)):
+            _batch.append(_slot)
+            _batch.append(self.model.text(_iid))
+            _batch.append(tuple(self.model.values(_iid)))
+            _batch.append("even" if (self._top + _n) % 2 == 0 else "odd")
+            if _iid in self._virtual_selection:
+                _selected.append(_slot)
+        if _batch:
+            self.tk.call("apply", _SLOT_BATCH, self._w, tuple(_batch))
+        self._slot_rows = dict(zip(self._slots, _window))
+        self._row_slots = dict(zip(_window, self._slots))
+        self.selection_set(_selected)
+        if self.selected_iid in self._row_slots:
+            self.focus(self._row_slots[self.selected_iid])
+
+        if self._yscrollcommand is not None:
+            self._yscrollcommand(*self.yview())
+
+    def see_row(self, iid: str) -> None:
+        '''scroll so a model row is in view'''
+        if not self.virtual:
+            self.see(iid)
+            return
+        _index = self._shown_index(iid)
+        if _index < self._top:
+            self._top = _index
+        elif _index >= self._top + self._visible:
+            self._top = _index - self._visible + 1
+        elif not self._render_pending and iid in self._row_slots:
+            # already in view
+            return
+        self._render()
+
+    def yview(self, *args):
+        '''Treeview yview. In virtual mode this scrolls the model.'''
+        if not self.virtual:
+            return super().yview(*args)
+        _total = len(self._shown(""))
+        if not args:
+            if _total == 0:
+                return (0.0, 1.0)
+            return (self._top / _total,
+                    min(1.0, (self._top + self._visible) / _total))
+        if args[0] == tk.MOVETO:
+            self._top = int(float(args[1]) * _total)
+        elif args[0] == tk.SCROLL:
+            _amount = int(args[1])
+            if args[2] == tk.PAGES:
+                _amount *= self._visible
+            self._top += _amount
+        self._render()
+
+    def yview_moveto(self, fraction) -> None:
+        self.yview(tk.MOVETO, fraction)
+
+    def yview_scroll(self, number, what) -> None:
+        self.yview(tk.SCROLL, number, what)
+
+    def _virtual_configure(self, event) -> None:
+        '''resize the slot pool to fit the widget'''
+        _rowheight = self._row_height()
+        _bbox = self.bbox(self._slots[0]) if self._attached else ''
+        _heading = int(_bbox[1]) if _bbox else _rowheight
+        self._visible = max(1, (event.height - _heading) // _rowheight)
+        self._schedule_render()
+
+    def _virtual_sync_selection(self, event) -> None:
+        '''keep off screen selected rows, take the rest from the slots'''
+        _selected = {self._slot_rows[s] for s in self.selection()
+                     if s in self._slot_rows}
+        self._virtual_selection = (self._virtual_selection -
+                set(self._row_slots)) | _selected
+
+    def _virtual_click(self, event) -> None:
+        '''a plain click replaces the selection, including off screen'''
+        if not event.state & 0x0005:  # shift or control
+            self._virtual_selection.clear()
+
+    def _virtual_step(self, step: int) -> str:
+        '''move the selection up or down a row'''
+        _rows = self._shown("")
+        if len(_rows) == 0:
+            return "break"
+        _current = self._row_iid(self.focus())
+        _index = self._shown_index(_current) + step if _current else 0
+        self.selected_iid = _rows[max(0, min(_index, len(_rows) - 1))]
+        self._select_row(self.selected_iid)
+        return "break"
+
+
+    def redo_row_colors(self) -> None:
+        '''restripe every row now'''
+        if self.virtual:
+            # stripes are computed when rows are rendered
+            self._schedule_render()
+            return
+
+        self._stripes.clear()
         if self.flat:
-            if len(self.get_children()) % 2 == 0:
-                return self.insert(parent="",
-                                   index=index,
-                                   values=values,
-                                   tags=("even",))
-            else:
-                return self.insert(parent="",
-                                   index=index,
-                                   values=values,
-                                   tags=("odd",))
+            self._mark_stripes("", 0)
+        else:
+            for p in self.model.children(""):
+                self._mark_stripes(p, 0)
+        self._restripe()
+
+    def _mark_stripes(self, parent: str, index: int) -> None:
+        '''restripe the children of parent from index on, when idle'''
+        if self.virtual:
+            self._schedule_render()
+            return
+        if not self.flat and parent == "":
+            # tree rows are not striped
+            return
+        if parent in self._filtered:
+            # positions differ from the model's, start over
+            index = 0
+        _start = self._stripe_dirty.get(parent, index)
+        self._stripe_dirty[parent] = min(_start, index)
+        if not self._restripe_pending:
+            self._restripe_pending = True
+            self.after_idle(self._restripe)
+
+    def _restripe(self) -> None:
+        '''
+        retag the rows after each marked position whose stripe
+        changed, down to STRIPE_AHEAD_ROWS past the view. The rest
+        stay marked until they are scrolled to. Other tags are kept.
+        Uses at most six Tcl calls.
+        '''
+        # filter first, it decides which rows are shown
+        self._refilter()
+        self._restripe_pending = False
+        _retag: Dict[str, List[str]] = {"even": [], "odd": []}
+        _left: Dict[str, int] = {}
+        _bottom = self.identify_row(self.winfo_height() - 1)
+        for _parent, _start in self._stripe_dirty.items():
+            if _parent != "" and _parent not in self.model:
+                continue
+            _rows = self._shown(_parent)
+            _end = self._stripe_end(_parent, len(_rows), _bottom)
+            for i, _iid in enumerate(_rows[_start:_end], _start):
+                _tag = "even" if i % 2 == 0 else "odd"
+                if self._stripes.get(_iid) != _tag:
+                    self._stripes[_iid] = _tag
+                    _retag[_tag].append(_iid)
+            if _end < len(_rows):
+                _left[_parent] = max(_start, _end)
+        self._stripe_dirty = _left
+
+        for _tag, _other in (("even", "odd"), ("odd", "even")):
+            if _retag[_tag]:
+                self.tk.call(self._w, "tag", "remove", _other, _retag[_tag])
+                self.tk.call(self._w, "tag", "add", _tag, _retag[_tag])
+
+
+    def _stripe_end(self, parent: str, count: int, bottom: str) -> int:
+        '''
+        position in the count rows shown in parent that restriping
+        stops at, given the row at the bottom of the view:
+        STRIPE_AHEAD_ROWS past it, all of them if parent ends above
+        it, none if parent starts below it.
+        '''
+        if bottom not in self.model:
+            # rows end above the bottom, the table is not shown yet,
+            # or a lazy group's placeholder
+            return count
+        _parent = self.model.parent(bottom)
+        if _parent == parent:
+            return self._shown_index(bottom) + 1 + STRIPE_AHEAD_ROWS
+        # a group, or a row of another group, is at the bottom
+        _group = bottom if _parent == "" else _parent
+        if self.model.index(parent) < self.model.index(_group):
+            return count
+        return 0
+
+    def _tree_yscroll(self, first, last) -> None:
+        '''pass the view on, and stripe rows scrolled into it'''
+        if self._yscrollcommand is not None:
+            self._yscrollcommand(first, last)
+        if self._stripe_dirty and not self._restripe_pending:
+            self._restripe_pending = True
+            self.after_idle(self._restripe)
+
 
+    def insert_row(self,*,parent,text="",index,values=(), open=False):
+        '''Returns a new node in a Treview object'''
 
-        if parent == "":
-            if text in self.get_children():
-                text +="1"
-            return self.insert(parent=parent,
+        if self.virtual:
+            _iid = self.model.insert("", index, text=text, values=values)
+            self.journal.record_insert([_iid])
+            if index == tk.END and self.sort_stack:
+                self._place_sorted("", [_iid])
+            self._schedule_render()
+            return _iid
+
+        if parent == "" and not self.flat:
+            _iid = self.iids.unique(text)
+            if text:
+                # a group's text is its iid
+                text = _iid
+            _iid = self.insert(parent=parent,
                                    text=text,
                                    index=index,
                                    values=values,
-                                   iid=text,
+                                   iid=_iid,
                                    tags=("tree",),
                                    open=open)
+            self.journal.record_insert([_iid])
+            return _iid
 
-        elif len(self.get_children(parent)) % 2 == 0:
-            return self.insert(parent=parent,
-                                   index=index,
-                                   values=values,
-                                   tags=("even",))
+        if self.flat:
+            parent = ""
+        _siblings = len(self.model.children(parent))
+        _position = _siblings if index == tk.END else min(int(index), _siblings)
+        _tag = "even" if _position % 2 == 0 else "odd"
+        _iid = self.insert(parent=parent,
+                               index=index,
+                               values=values,
+                               tags=(_tag,))
+        self._stripes[_iid] = _tag
+        self.journal.record_insert([_iid])
+        if _position < _siblings:
+            # rows after the new one moved down
+            self._mark_stripes(parent, _position + 1)
+        elif self.sort_stack:
+            self._place_sorted(parent, [_iid])
+        return _iid
+
+
+    def insert_rows(self, parent: str, rows, index: int | str = tk.END,
+            iids: Sequence[str] | None = None) -> List[str]:
+        '''
+        Insert many rows of values under parent and return their iids,
+        new ones unless iids are given.
+
+        Stripes are worked out from the model and the rows are sent
+        to Tk in one call, so Tk does not redraw until the batch is
+        done. Flat tables ignore parent.
+        '''
+        if self.flat:
+            parent = ""
+        _start = len(self.model.children(parent)) if index == tk.END \
+                else min(int(index), len(self.model.children(parent)))
+        _rows = [tuple(r) for r in rows]
+        _iids = self.model.insert_rows(parent, _start, _rows, iids)
+        self.journal.record_insert(_iids)
+
+        if self.virtual:
+            if index == tk.END and self.sort_stack:
+                self._place_sorted(parent, _iids)
+            self._schedule_render()
+            return _iids
+
+        _batch: List[Any] = []
+        for i, (_iid, _values) in enumerate(zip(_iids, _rows)):
+            _tag = "even" if (_start + i) % 2 == 0 else "odd"
+            self._stripes[_iid] = _tag
+            _batch.append(_iid)
+            _batch.append(_values)
+            _batch.append(_tag)
+        self.tk.call("apply", _INSERT_BATCH, self._w, parent, index,
+                tuple(_batch))
+
+        if _start + len(_iids) < len(self.model.children(parent)):
+            # rows after the batch moved down
+            self._mark_stripes(parent, _start + len(_iids))
+        elif self.sort_stack:
+            self._place_sorted(parent, _iids)
+        return _iids
+
+    def group_by(self, rows: Iterable[Sequence[Any]],
+            keys: str | Sequence[str],
+            aggregates: Dict[str, str] | None = None) -> GroupAggregates:
+        '''
+        add flat rows to a tree table as groups, one per distinct
+        value of the key columns, in first seen order. Group rows
+        show their key values and, for each column in aggregates, one
+        of "count", "sum", "min", "max" or "mean" over their rows.
+        The aggregates follow later edits. See GroupAggregates.
+        '''
+        if self.flat:
+            raise ValueError("group_by needs a tree table")
+        _keys = [self.model.column_index(k)
+                 for k in ([keys] if isinstance(keys, str) else keys)]
+        _aggregates = {self.model.column_index(c): kind
+                       for c, kind in (aggregates or {}).items()}
+        check_aggregates(_aggregates)
+        _groups: Dict[str, Tuple] = {}
+        with self.journal.edit("Group Rows"):
+            for _key, _rows in group_rows(rows, _keys).items():
+                _iid = self.insert_row(parent="", index=tk.END,
+                        text=GROUP_SEPARATOR.join(map(str, _key)))
+                self.insert_rows(_iid, _rows)
+                _groups[_iid] = _key
+        if self.groups is not None:
+            self.groups.close()
+        self.groups = GroupAggregates(self, _groups, _keys, _aggregates)
+        return self.groups
+
+    def set_child_provider(self, parent: str,
+            provider: ChildProvider) -> None:
+        '''
+        load the children of a group when it is first opened.
+        provider is called with the group's iid and returns its rows,
+        which are inserted in batches. Closed groups may be released
+        and loaded again later. See LazyChildren.
+        '''
+        if self.flat:
+            raise ValueError("child providers need a tree table")
+        self.lazy.set_provider(parent, provider)
+
+    def release_children(self, parent: str) -> None:
+        '''drop the loaded children of a lazy group, e.g. to free memory'''
+        self.lazy.release(parent)
+
+    def _group_loaded(self, parent: str) -> None:
+        '''a lazy group finished loading: sort and stripe it'''
+        if self.sort_stack:
+            self._reorder(parent,
+                    self.sorter.sort_order(parent, self.sort_stack))
+        self._mark_stripes(parent, 0)
+
+    def upsert_rows(self, rows: Iterable[Sequence[Any]], key_col: str,
+            parent: str = "") -> List[str]:
+        '''
+        update rows in place by a key column, e.g. a primary key, and
+        add the rows whose key is new under parent. Returns the iids
+        in row order. Keys are looked up in O(1), see IidRegistry.
+        '''
+        if self.flat:
+            parent = ""
+        _index = self.model.column_index(key_col)
+        self.iids.key_col = _index
+        _rows = [list(r) for r in rows]
+        _keys = [r[_index] if _index < len(r) else "" for r in _rows]
+        _updates: Dict[str, List[Any]] = {}
+        _new: Dict[Any, List[Any]] = {}
+        for _key, _row in zip(_keys, _rows):
+            _iid = self.iids.row(_key)
+            if _iid is None:
+                # the last row with a new key wins
+                _new[_key] = _row
+            else:
+                _updates[_iid] = _row
+        self._write_values_batch(list(_updates.items()))
+        if self.sort_stack:
+            _moved: Dict[str, List[str]] = {}
+            for _iid in _updates:
+                _moved.setdefault(self.model.parent(_iid), []).append(_iid)
+            for _parent, _iids in _moved.items():
+                self._place_sorted(_parent, _iids)
+        if _new:
+            for _key, _iid in zip(_new, self.insert_rows(parent,
+                    _new.values())):
+                self.iids.bind(_key, _iid)
+        return [self.iids.row(k) for k in _keys]
+
+    def row_for_key(self, key: Any) -> str | None:
+        '''the row upsert_rows added for key, or None'''
+        return self.iids.row(key)
+
+    def extend(self, rows, parent: str = "") -> List[str]:
+        '''append many rows of values to the end of parent'''
+        return self.insert_rows(parent, rows, tk.END)
+
+    def delete_rows(self, iids: Iterable[str], restripe: bool = True) -> None:
+        '''
+        delete many rows in one Tk call. Pass restripe=False when the
+        rows left keep their stripes, e.g. after dropping an even
+        number of rows from the top.
+        '''
+        _iids = [i for i in iids if i in self.model]
+        self.journal.record_delete(_iids)
+        if self.virtual:
+            # keep the rows in view where they are
+            _above = set(self._shown("")[:self._top])
+            self._top -= sum(1 for i in _iids if i in _above)
+            for i in _iids:
+                self.model.delete(i)
+                self._virtual_selection.discard(i)
+            self._schedule_render()
+            return
+        for i in _iids:
+            if restripe:
+                # rows after the first deleted one move up
+                self._mark_stripes(self.model.parent(i), self.model.index(i))
+            self._stripes.pop(i, None)
+        self.delete(*_iids)
+
+    def undo(self, event=None) -> str:
+        '''undo the last edit'''
+        self.cancel_paste()
+        _edit = self.journal.undo(self)
+        if _edit is not None:
+            self._debug(f"undo {_edit.label}")
+        return "break"
+
+    def redo(self, event=None) -> str:
+        '''redo the last undone edit'''
+        _edit = self.journal.redo(self)
+        if _edit is not None:
+            self._debug(f"redo {_edit.label}")
+        return "break"
+
+    def _refresh_rows(self, iids: Sequence[str]) -> None:
+        '''show the model's text and values of rows, in one Tcl call'''
+        if self.virtual:
+            self._schedule_render()
+            return
+        _texts = self.model.column("#0", iids)
+        self.tk.call("apply", _ROW_BATCH, self._w, tuple(chain.from_iterable(
+                (_iid, _text, tuple(_values)) for _iid, _text, _values
+                in zip(iids, _texts, self.model.rows(iids)))))
+
+    def _refresh_column(self, col: int, iids: Sequence[str]) -> None:
+        '''show the model's cells of one column, in one Tcl call'''
+        if self.virtual:
+            self._schedule_render()
+            return
+        _cells = tuple(chain.from_iterable(
+                zip(iids, self.model.column(col, iids))))
+        if col == -1:
+            self.tk.call("apply", _TEXT_BATCH, self._w, _cells)
         else:
-            return self.insert(parent=parent,
-                                   index=index,
-                                   values=values,
-                                   tags=("odd",))
+            self.tk.call("apply", _SET_BATCH, self._w, f"#{col + 1}", _cells)
 
+    def _restore_cells(self, col: int, iids: Sequence[str],
+            values: Sequence[Any]) -> None:
+        '''
+        write one column of cells back, for undo and redo. Rows
+        deleted since, outside an edit, are skipped.
+        '''
+        if not all(k in self.model for k in iids):
+            _cells = [(k, v) for k, v in zip(iids, values) if k in self.model]
+            iids = [k for k, _ in _cells]
+            values = [v for _, v in _cells]
+        self.model.set_column(col, iids, values)
+        self._refresh_column(col, iids)
+        if self.sort_stack:
+            _parents: Dict[str, List[str]] = {}
+            for _iid in iids:
+                _parents.setdefault(self.model.parent(_iid), []).append(_iid)
+            for _parent, _iids in _parents.items():
+                self._place_sorted(_parent, _iids)
+
+    def _restore_rows(self, saved: Sequence[SavedRow]) -> None:
+        '''
+        insert saved rows again where they were, for undo and redo.
+        Rows whose parent was deleted since are skipped.
+        '''
+        i = 0
+        while i < len(saved):
+            _parent, _index, _iid, _text, _values = saved[i]
+            if _parent != "" and _parent not in self.model:
+                i += 1
+                continue
+            if _parent == "" and not self.flat:
+                self.insert(_parent, _index, iid=_iid, text=_text,
+                        values=_values, tags=("tree",), open=True)
+                i += 1
+                continue
+            # runs of neighbouring rows go in one batch
+            j = i + 1
+            while j < len(saved) and saved[j][0] == _parent and \
+                    saved[j][1] == saved[j - 1][1] + 1:
+                j += 1
+            _run = saved[i:j]
+            _iids = self.insert_rows(_parent, [r[4] for r in _run], _index,
+                    iids=[r[2] for r in _run])
+            _texts = [r[3] for r in _run]
+            if any(_texts):
+                self.model.set_column("#0", _iids, _texts)
+                self._refresh_rows(_iids)
+            i = j
+
+
+    # Column operations. Each is one model update, one Tcl call and
+    # one undo step. By default they cover every row holding values
+    # (in a tree, the rows of every group); parent limits them to
+    # one parent's rows and shown to the rows the filter shows.
+
+    def column_rows(self, parent: str | None = None,
+            shown: bool = False) -> List[str]:
+        '''the rows a column operation works on'''
+        _parents = self._filter_parents() if parent is None else [parent]
+        if shown:
+            return [k for p in _parents for k in self._shown(p)]
+        return [k for p in _parents for k in self.model.children(p)]
+
+    def clear_column(self, col: str, *, parent: str | None = None,
+            shown: bool = False) -> int:
+        '''blank a column. Returns the number of rows changed.'''
+        return self.fill_column(col, "", parent=parent, shown=shown)
+
+    def fill_column(self, col: str, value: Any, *,
+            parent: str | None = None, shown: bool = False) -> int:
+        '''set a column to one value. Returns the number of rows.'''
+        _iids = self.column_rows(parent, shown)
+        self._set_column(col, _iids, [value] * len(_iids), "Fill Column")
+        return len(_iids)
+
+    def transform_column(self, col: str, function: Callable[[Any], Any], *,
+            parent: str | None = None, shown: bool = False) -> int:
+        '''
+        replace each cell of a column with function(cell). Returns
+        the number of rows.
+        '''
+        _iids = self.column_rows(parent, shown)
+        _values = list(map(function, self.model.column(col, _iids)))
+        self._set_column(col, _iids, _values, "Change Column")
+        return len(_iids)
+
+    def _set_column(self, col: str, iids: List[str], values: List[Any],
+            label: str) -> None:
+        _index = self.model.column_index(col)
+        with self.journal.edit(label):
+            self.journal.record_cells(iids, [_index])
+            self.model.set_column(_index, iids, values)
+        self._refresh_column(_index, iids)
+        if self._column_id(col) in dict(self.sort_stack):
+            self.sort_by_cols(self.sort_stack)
+
+
+    def set_column_type(self, col: str, kind) -> None:
+        '''
+        how a column sorts: "string", "numeric", "date", "natural"
+        (the default) or a key function taking the cell value
+        '''
+        self.sorter.set_column_type(col, kind)
+
+    def set_column_editor(self, col: str, kind: str = "entry", *,
+            validate: Validator | None = None, **options) -> None:
+        '''
+        how a column's cells are edited: "entry" (the default),
+        "combobox" with values=[...] or "spinbox" with from_=, to=
+        and increment=. validate takes the new text and returns False
+        to reject it. See CellEditor.
+        '''
+        self.editor.set_column_editor(col, kind, validate=validate,
+                                      **options)
 
     def sort_by_col(self, col: str, reverse: bool) -> None:
         '''sort children based on values in a column'''
-        if self.flat:
-            _child_list = [(self.set(k, col), k) for k in self.get_children()]
-            _child_list.sort(reverse = reverse)
+        self.sort_by_cols([(col, reverse)])
 
+    def sort_by_cols(self, sort_keys) -> None:
+        '''
+        sort children on several (column, reverse) keys, most
+        significant first. The keys are kept in self.sort_stack and
+        rows added or edited later are placed in sorted position.
+        '''
+        self.sort_stack = [(self._column_id(c), r) for c, r in sort_keys]
+        _parent_list = [""] if self.flat else self.model.children("")
+        for p in _parent_list:
             # rearrange items in sorted positions:
-            for i, (_, k) in enumerate(_child_list):
-                self.move(k,"", i)
+            self._reorder(p, self.sorter.sort_order(p, self.sort_stack))
 
             # redo colors
-            self.redo_row_colors()
+            self._mark_stripes(p, 0)
 
-            # reverse sort next time
-            self.heading(col, command=lambda _col=col:
-                    self.sort_by_col(_col, not reverse))
+        self._show_sort_headings()
 
-        else:
-            _parent_list = self.get_children()
-            for p in _parent_list:
-                _child_list = [(self.set(k, col), k) for k in self.get_children(p)]
-                _child_list.sort(reverse = reverse)
+    def add_sort_key(self, col: str, reverse: bool) -> None:
+        '''sort on col after the keys already in the sort stack'''
+        _col = self._column_id(col)
+        _stack = [(c, r) for c, r in self.sort_stack if c != _col]
+        self.sort_by_cols(_stack + [(_col, reverse)])
+
+    def clear_sort(self) -> None:
+        '''forget the sort stack. Rows keep their order.'''
+        self.sort_stack = []
+        self._show_sort_headings()
 
-                # rearrange items in sorted positions:
-                for i, (_, k) in enumerate(_child_list):
-                    self.move(k, p, i)
+    def sort_heading(self, col: str, extend: bool = False) -> None:
+        '''
+        heading click. A plain click sorts on col alone, flipping
+        direction if it already was. extend (shift-click) adds col
+        to the sort stack or flips it if it is already there.
+        '''
+        _col = self._column_id(col)
+        _stack = list(self.sort_stack)
+        _columns = [c for c, _ in _stack]
+        if _col in _columns and (extend or len(_stack) == 1):
+            _index = _columns.index(_col)
+            _stack[_index] = (_col, not _stack[_index][1])
+        elif extend:
+            _stack.append((_col, False))
+        else:
+            _stack = [(_col, False)]
+        self.sort_by_cols(_stack)
 
-                # redo colors
-                self.redo_row_colors()
+    def _shift_heading_click(self, event) -> str | None:
+        if self.identify_region(event.x, event.y) != "heading":
+            return None
+        _col = self.identify_column(event.x)
+        if _col == "#0":
+            return "break"
+        self.sort_heading(_col, extend=True)
+        return "break"
+
+    def _column_id(self, col: str) -> str:
+        ''''#n' id of a column name or id'''
+        return f"#{self.model.column_index(col) + 1}"
+
+    def _heading_text(self, col: str) -> str:
+        '''heading text without the sort arrows'''
+        _text = self.heading(col, "text")
+        _suffix = self._heading_suffix.get(col, "")
+        if _suffix and _text.endswith(_suffix):
+            return _text[:-len(_suffix)]
+        return _text
+
+    def _show_sort_headings(self) -> None:
+        '''
+        show the sort direction on each sorted heading, with the
+        key's priority when sorting on more than one column
+        '''
+        _order = {c: (i, r) for i, (c, r) in enumerate(self.sort_stack)}
+        for i in range(len(self['columns']) + 1):
+            _col = f"#{i}"
+            _text = self._heading_text(_col)
+            _suffix = ""
+            if _col in _order:
+                _priority, _reverse = _order[_col]
+                _suffix = f" {DOWNARROW if _reverse else UPARROW}"
+                if len(self.sort_stack) > 1:
+                    _suffix += str(_priority + 1)
+            self._heading_suffix[_col] = _suffix
+            self.heading(_col, text=_text + _suffix)
+
+    def _place_sorted(self, parent: str, iids: Sequence[str]) -> None:
+        '''
+        move rows of a sorted table to their sorted position by
+        bisection. Many rows at once are merged into the rest, which
+        are already sorted, and reordered in one go.
+        '''
+        if not self.sort_stack or parent in self.lazy.loading:
+            # a lazy group is sorted once it has loaded
+            return
+        if len(iids) > PLACE_SORTED_LIMIT:
+            _order, _first = self.sorter.merge(parent, iids, self.sort_stack)
+            self._reorder(parent, _order)
+            self._mark_stripes(parent, _first)
+            return
+        for _iid in iids:
+            _old = self.model.index(_iid)
+            _new = self.sorter.bisect(parent, _iid, self.sort_stack)
+            if _new != _old:
+                self._move_row(_iid, parent, _new)
+                self._mark_stripes(parent, min(_old, _new))
+
+
+    # Filtering. Rows that do not pass self.filter_conditions are
+    # detached from Tk (or left out of the render in virtual mode)
+    # and attached again when the filter is cleared.
+
+    def filter_rows(self, col: str | None = None, *,
+            contains: str | None = None, regex: str | None = None,
+            between: Tuple[float, float] | None = None,
+            where: Callable[[Any], Any] | None = None,
+            case: bool = False) -> None:
+        '''
+        Hide the rows that do not pass a test, on top of any filter
+        already set. Give one of:
+            contains -> text the cell contains
+            regex -> a pattern the cell matches (re.search)
+            between -> (low, high), the cell is a number in range
+            where -> a function taking the cell value
+        With col None the test passes if any column passes. Text
+        tests ignore case unless case is True. In a tree the rows
+        of each group are filtered.
+        '''
+        _tests = {"contains": contains, "regex": regex,
+                  "between": between, "where": where}
+        _given = [(k, v) for k, v in _tests.items() if v is not None]
+        if len(_given) != 1:
+            raise ValueError("give exactly one of contains, regex, "
+                             "between or where")
+        _kind, _arg = _given[0]
+        self.filter_conditions.append((col, _kind, _arg, case))
+        if self.virtual:
+            self._top = 0
+        self._apply_filter(self._filter_parents())
+
+    def clear_filter(self) -> None:
+        '''show every row again'''
+        self.filter_conditions.clear()
+        self._filter_dirty.clear()
+        if self.virtual:
+            self._top = 0
+        self._apply_filter(list(self._filtered))
+
+    def find_rows(self, text: str, col: str | None = None, *,
+            case: bool = False) -> List[str]:
+        '''
+        rows with a cell containing text, hidden or not, in order.
+        With col None every column is searched.
+        '''
+        return [k for _parent in self._filter_parents()
+                for k in self.filters.search(_parent, text, col, case)]
+
+    def _filter_parents(self) -> List[str]:
+        '''parents whose children are filtered'''
+        return [""] if self.flat else list(self.model.children(""))
+
+    def _shown(self, parent: str = "") -> Sequence[str]:
+        '''children of parent that pass the filter, in order'''
+        if parent in self._filter_dirty:
+            self._refilter()
+        _rows = self._filtered.get(parent)
+        return self.model.children(parent) if _rows is None else _rows
+
+    def _shown_index(self, iid: str) -> int:
+        '''position of iid among the rows shown in its parent'''
+        _parent = self.model.parent(iid)
+        if _parent in self._filtered:
+            return self._shown(_parent).index(iid)
+        return self.model.index(iid)
+
+    def _next_shown(self, iid: str) -> str:
+        '''the next shown row in the same parent, wrapping around'''
+        _parent = self.model.parent(iid)
+        if _parent not in self._filtered:
+            return self.model.sibling(iid, 1)
+        _rows = self._shown(_parent)
+        if iid not in _rows:
+            return _rows[0] if _rows else iid
+        return _rows[(_rows.index(iid) + 1) % len(_rows)]
+
+    def _apply_filter(self, parents: Iterable[str]) -> None:
+        '''show the rows of parents that pass the filter'''
+        for _parent in parents:
+            if _parent != "" and _parent not in self.model or \
+                    self.lazy.unloaded(_parent):
+                self._filtered.pop(_parent, None)
+                continue
+            if self.filter_conditions:
+                _rows = self.filters.rows(_parent, self.filter_conditions)
+                self._filtered[_parent] = _rows
+            else:
+                _rows = self.model.children(_parent)
+                self._filtered.pop(_parent, None)
+            if self.virtual:
+                self._schedule_render()
+            else:
+                # detaches the rows left out, in one call
+                ttk.Treeview.set_children(self, _parent, *_rows)
+                self._mark_stripes(_parent, 0)
+
+    def _refilter(self) -> None:
+        '''filter again the parents whose rows changed'''
+        self._refilter_pending = False
+        if self._filter_dirty:
+            _parents = list(self._filter_dirty)
+            self._filter_dirty.clear()
+            self._apply_filter(_parents)
+
+    def _filter_model_changed(self, event: str, parent: str | None,
+            iids: Sequence[str], col: int | None) -> None:
+        if not self.filter_conditions:
+            return
+        if event == "update":
+            _parents = {self.model.parent(k) for k in iids}
+        else:
+            _parents = {parent}
+            if event == "delete":
+                self._filtered.pop(iids[0], None)
+        if not self.flat:
+            # groups are not filtered, their rows are
+            _parents.discard("")
+        if not _parents:
+            return
+        self._filter_dirty.update(_parents)
+        if not self._refilter_pending:
+            self._refilter_pending = True
+            self.after_idle(self._refilter)
 
-                # reverse sort next time
-                self.heading(col, command=lambda _col=col:
-                        self.sort_by_col(_col, not reverse))
 
+    def copy_text(self, iids: Iterable[str], format: str = "tsv",
+            headers: bool = False) -> str:
+        '''
+        rows as "tsv" or "csv" text, quoted where needed. Tree nodes
+        with text get a line of their own above their values. With
+        headers the column headings come first.
+        '''
+        _iids = list(iids)
+        _texts = self.model.column("#0", _iids)
+        if any(_texts):
+            _rows = []
+            for _text, _values in zip(_texts, self.model.rows(_iids)):
+                if _text != "":
+                    _rows.append([_text])
+                if _values:
+                    _rows.append(_values)
+        else:
+            _rows = [v for v in self.model.rows(_iids) if v]
+        _header = [self._heading_text(f"#{i + 1}")
+                   for i in range(len(self['columns']))] if headers else None
+        return write_rows(_rows, format, _header)
 
-    def copy_to_clipboard(self) -> None:
+    def copy_to_clipboard(self, format: str = "tsv",
+            headers: bool = False) -> None:
         '''
         Copy rows and tree nodes to clipboard
         '''
-        self.root.clipboard_clear()
-        _selection = self.selection()
-        _text_list = []
+        _selection = self.selected_rows()
         if len(_selection) == 0:
-            print("Nothing to copy")
+            self._debug("Nothing to copy")
             return
-        for _item in _selection:
-            if self.item(_item)["text"] != "":
-                _text_list.append(self.item(_item)["text"])
-            if len(self.item(_item)["values"]) > 0:
-                _text_list.append("\t".join(
-                    [str(x) for x in self.item(_item)["values"]]))
-        _text = "\n".join(_text_list)
-
+        _text = self.copy_text(_selection, format, headers)
+        self.root.clipboard_clear()
         self.root.clipboard_append(_text)
-        print("copied to clipboard:")
-        print(_text)
+        self._debug(f"copied {len(_selection)} rows to clipboard")
 
 
     #Event driven functions
 
     def delete_items(self, event) -> None:
         '''delete multiple rows'''
-        cur_items = self.selection()
-        for i in cur_items:
-            self.delete(i)
-        self.redo_row_colors()
+        with self.journal.edit("Delete Rows"):
+            self.delete_rows(self.selected_rows())
 
 
     def insert_one_row_from_menu(self, event) -> None:
@@ -260,46 +1339,44 @@ class TreeviewTable(ttk.Treeview):
         if _region_clicked == "nothing":
             # add to the end of the table
             if self.flat:
-                self.selected_iid = self.get_children()[-1]
+                self.selected_iid = self._children()[-1]
             else:
-                _parent = list(self.get_children())[-1]
-                self.selected_iid = self.get_children(_parent)[-1]
+                _parent = self._children()[-1]
+                self.selected_iid = self._children(_parent)[-1]
         elif _region_clicked == "tree":
             # row will be added before first item in tree
-            _tree_row = self.identify_row(event.y)
-            self.selected_iid = list(self.get_children(_tree_row))[0]
+            _tree_row = self._row_iid(self.identify_row(event.y))
+            self.selected_iid = self._children(_tree_row)[0]
             pass
         elif _region_clicked == "cell":
-            self.selected_iid = self.identify_row(event.y)
+            self.selected_iid = self._row_iid(self.identify_row(event.y))
         elif _region_clicked == "heading":
             if self.flat:
-                self.selected_iid = self.get_children()[0]
+                self.selected_iid = self._children()[0]
             else:
-                self.selected_iid = list(self.get_children(
-                                  list(self.get_children())[0]))[0]
+                self.selected_iid = self._children(
+                                  self._children()[0])[0]
         elif self.selected_iid == "":
             if self.flat:
-                self.selected_iid = self.get_children()[0]
+                self.selected_iid = self._children()[0]
             else:
-                self.selected_iid = list(self.get_children(
-                                  list(self.get_children())[0]))[0]
+                self.selected_iid = self._children(
+                                  self._children()[0])[0]
         else:
-            print(f"region: {_region_clicked} not in list")
+            self._debug(f"region: {_region_clicked} not in list")
 
         # TODO: what to do if there are no children in the table?
         if self.selected_parent == "" and \
-            len(self.get_children(self.selected_iid)) > 0:
-            self.selected_iid = list(
-                    self.get_children(self.selected_iid))[0]
+            len(self._children(self.selected_iid)) > 0:
+            self.selected_iid = self._children(self.selected_iid)[0]
 
-        _new_row = self.insert_row(parent=self.selected_parent,
-                index=self.other_selected_options_index + 1,
-                values=[""] * len(self["columns"]))
+        with self.journal.edit("Add Row"):
+            _new_row = self.insert_row(parent=self.selected_parent,
+                    index=self.other_selected_options_index + 1,
+                    values=[""] * len(self["columns"]))
 
-        self.redo_row_colors()
-        self.focus(_new_row)
-        self.selection_set(_new_row)
         self.selected_iid = _new_row
+        self._select_row(_new_row)
 
 
     def clear_cells_column(self, event) -> None:
@@ -309,33 +1386,14 @@ class TreeviewTable(ttk.Treeview):
         _region = self.identify_region(event.x, event.y)
         if _region not in ("heading"):
             return
-        _col = self.identify_column(event.x)
-        _parent_list = self.get_children()
-
-        if self.flat:
-             for k in self.get_children():
-                self.set(k, _col, '')
-
-        else:
-            for p in _parent_list:
-                for k in self.get_children(p):
-                    self.set(k, _col, '')
+        self.clear_column(self.identify_column(event.x))
 
 
     def clear_column_from_menu(self, event) -> None:
         '''
         Clear all cells in a column from the popup menu.
         '''
-        _col = self.identify_column(event.x)
-        _parent_list = self.get_children()
-
-        if self.flat:
-             for k in self.get_children():
-                self.set(k, _col, '')
-
-        for p in _parent_list:
-            for k in self.get_children(p):
-                self.set(k, _col, '')
+        self.clear_column(self.identify_column(event.x))
 
 
     def next_cell_tab(self, event) -> None:
@@ -347,27 +1405,24 @@ class TreeviewTable(ttk.Treeview):
 
         if self.selected_iid == "":
             # select the first cell in the group
-            print(f'self.selected_iid is empty string. using first parent: {self.get_children()[0]}')
-            self.selected_iid = self.get_children()[0]
+            self.selected_iid = self._children()[0]
             self.selected_column = '#0'
-            self.focus(self.selected_iid)
+            self._focus_row(self.selected_iid)
         else:
             # if at the end of a list of values, move to next row
-            if self.sel_column_index >= len(self.selected_values):
-                _iid_list = self.other_selected_options
-                _next_row = (_iid_list.index(self.selected_iid) + 1) % len(_iid_list)
-                self.selected_iid = _iid_list[_next_row]
-                self.focus(self.selected_iid)
+            if self.sel_column_index >= self.model.row_length(self.selected_iid):
+                self.selected_iid = self._next_shown(self.selected_iid)
+                self._focus_row(self.selected_iid)
                 self.selected_column = '#1'
             # otherwise, move to next value
             else:
                 self.selected_column = f'#{self.sel_column_index + 1}'
-            if (self.selected_iid in self.get_children() and
-                    self.selected_values == '' and
-                    len(self.get_children(self.selected_iid)) != 0):
+            if (self._parent_of(self.selected_iid) == "" and
+                    self.model.row_length(self.selected_iid) == 0 and
+                    len(self._children(self.selected_iid)) != 0):
                 self.selected_column = '#0'
-        _col_box = self.bbox(self.selected_iid, self.selected_column)
-        self.create_edit_box(int(_col_box[0]) + 5, int(_col_box[1]) + 5)
+        _region = "tree" if self.selected_column == '#0' else "cell"
+        self._edit_cell(self.selected_iid, self.selected_column, _region)
 
 
     def create_edit_box(self, coordx, coordy) -> None:
@@ -376,86 +1431,83 @@ class TreeviewTable(ttk.Treeview):
            values copy/pasted from excel or a csv file
            using \t and \n.'''
         _region_clicked = self.identify_region(coordx, coordy)
-        _text = ""
 
         if _region_clicked not in ("tree", "cell", "nothing"):
             return
 
-        self.selected_column = self.identify_column(coordx)
-        self.selected_iid = self.focus()
+        _column = self.identify_column(coordx)
+        _iid = self._row_iid(self.focus())
 
         #new row region
         if _region_clicked == "nothing":
-            _parent = list(self.get_children())[-1]
+            _parent = self._children()[-1]
             _values = [""] * len(self['columns'])
-            _new_row = self.insert_row(parent=_parent,
+            _iid = self.insert_row(parent=_parent,
                     values= _values,
                     index=tk.END)
-            self.selected_iid = _new_row
+            if self.virtual:
+                self.see_row(_iid)
+        self._edit_cell(_iid, _column, _region_clicked)
+
+    def _edit_cell(self, iid: str, column: str, region: str) -> None:
+        '''
+        open the cell editor over a cell. Reads come from the model,
+        so this costs the same few Tcl calls however big the table is.
+        '''
+        # an edit still open is written first, it may change this cell
+        self.editor.finish()
+        self.selected_iid = iid
+        self.selected_column = column
+        _text = ""
 
         # select the text to put in the entry box
 
         # parent region
-        elif _region_clicked == "tree":
+        if region == "tree":
             _text = self.selected_text
 
         # child region
-        elif _region_clicked == "cell" and len(self.selected_values) != 0:
-            if len(self.selected_values) < self.sel_column_index:
-                # fill in blanks. This will also be used in 'accept_new_text'
-                while len(self.selected_values) < self.sel_column_index:
-                    if type(self.selected_values) == list:
-                        self.selected_values.append("")
-                    else:
-                        print("Warning! self.selected_values is not type 'list'")
-                        print(f"Type:\t{type(self.selected_values)}")
-                        print(f"Value:\t{self.selected_values}")
-
-            _text = self.selected_values[self.sel_column_index - 1]
-
-        column_box = self.bbox(self.selected_iid, self.selected_column)
-        entry_edit = tk.Entry(self, width =int(column_box[2]))
-
-        # insert the existing text into the entry box
-        entry_edit.insert(0, _text)
-        entry_edit.select_range(0, tk.END)
+        elif region == "cell" and self.model.row_length(iid) != 0:
+            # short rows read as blanks. 'accept_new_text' fills them in
+            _text = self.model.get(iid, column)
 
-        entry_edit.focus()
-
-        entry_edit.bind("<FocusOut>", self.accept_new_text_array)
-        entry_edit.bind("<Return>", self.accept_new_text_array)
-
-        entry_edit.place(x=column_box[0],
-                         y=column_box[1],
-                         w=column_box[2],
-                         h=column_box[3])
+        column_box = self.bbox(self._view_iid(iid), column)
+        if not column_box:
+            return
+        self.editor.open(iid, column, str(_text), column_box)
 
 
     def accept_new_text_single(self, event) -> Any:
         '''treeview insert new text'''
         _new_text = event.widget.get()
+        self.editor.release(event.widget)
 
-        if self.sel_column_index == 0:
-            self.item(self.selected_iid, text= _new_text)
-        else:
-            current_values = self.selected_values
-            if type(current_values) == list:
-                current_values[self.sel_column_index - 1] = _new_text
-            elif type(current_values) == None:
-                current_values=list('')
-            if type(current_values) != list:
-                current_values = list(current_values)
-            self.item(self.selected_iid, values=current_values)
-
-        event.widget.destroy()
+        with self.journal.edit("Edit Cell"):
+            if self.sel_column_index == 0:
+                self._write_text(self.selected_iid, _new_text)
+            else:
+                current_values = self.selected_values
+                if type(current_values) == list:
+                    current_values[self.sel_column_index - 1] = _new_text
+                elif type(current_values) == None:
+                    current_values=list('')
+                if type(current_values) != list:
+                    current_values = list(current_values)
+                self._write_values(self.selected_iid, current_values)
+            self._place_sorted(self.selected_parent, [self.selected_iid])
 
 
     def accept_new_text_array(self, event) -> Any:
         '''treeview insert new text by array
            this function parses csv/excel object structures
            which use \t and \n as dividers'''
-
         _new_text = event.widget.get()
+        self.editor.release(event.widget)
+        self._accept_text_array(_new_text)
+
+    def _accept_text_array(self, new_text: str) -> None:
+        '''write text from the cell editor at the selected cell'''
+        _new_text = new_text
 
         _parsed_text = self.parse_new(_new_text)
 
@@ -463,42 +1515,113 @@ class TreeviewTable(ttk.Treeview):
 
         _colloc0 = self.sel_column_index - 1
 
-        if _colloc0 == -1:
-            self.item(_selected_iid, text= _new_text)
-        else:
-            # checked a few cases and this does return an 'ordered' tuple
-            # matching the order of children.
-            _iid_list = list(self.get_children(self.parent(_selected_iid)))
-
-            _rowloc0 = _iid_list.index(_selected_iid)
+        with self.journal.edit("Edit Cells"):
+            if _colloc0 == -1:
+                self._write_text(_selected_iid, _new_text)
+                self._place_sorted(self._parent_of(_selected_iid), [_selected_iid])
+            else:
+                self._apply_text_array(_parsed_text,
+                        self._parent_of(_selected_iid),
+                        self.model.index(_selected_iid),
+                        _colloc0)
 
-            for i, row in enumerate(_parsed_text):
 
-                if len(row) + _colloc0 > len(self['columns']):
-                    # truncate row
-                    row = row[0:(len(self['columns']) + _colloc0)]
+    def _apply_text_array(self, parsed_text: Sequence[List[str]],
+            parent: str, position: int, colloc0: int,
+            overwrite: int | None = None, place: bool = True) -> List[str]:
+        '''
+        write parsed rows into the children of parent from position
+        on, starting at column colloc0. At most overwrite existing
+        rows are written (all by default) and the rest are added at
+        the end. Writes and adds are batched. Returns the overwritten
+        iids. In a sorted table they are moved to their sorted
+        position unless place is False.
+        '''
+        _width = len(self['columns'])
+        _count = len(parsed_text) if overwrite is None \
+                else min(len(parsed_text), overwrite)
+        # the rows being overwritten. Rows past these are added.
+        iid_list = self._children(parent)[position:position + _count]
+        _updates: List[Tuple[str, List[Any]]] = []
+        _new_rows: List[List[Any]] = []
+        for i, row in enumerate(parsed_text):
+
+            if len(row) + colloc0 > _width:
+                # truncate row
+                row = row[0:max(0, _width - colloc0)]
+
+            if i > len(iid_list) - 1:
+                _new_rows.append([""] * colloc0 + row)
+            else:
+                _current_values = self._values_of(iid_list[i])
 
-                if i + _rowloc0 > len(_iid_list) - 1:
-                    row = [""] * _colloc0 + row
-                    self.insert_row(parent=self.parent(_selected_iid),
-                            values=row,
-                            index=tk.END)
-                else:
-                    _current_values: list[Any] | Literal[''] = \
-                        self.item(_iid_list[i + _rowloc0]).get("values")
+                for j, obj in enumerate(row):
+                    if len(_current_values) - 1 < j + colloc0:
+                        _current_values.append(obj)
+                    else:
+                        _current_values[j + colloc0] = obj
+                _updates.append((iid_list[i], _current_values))
+
+        self._write_values_batch(_updates)
+        if _new_rows:
+            self.insert_rows(parent, _new_rows)
+        _edited = [_iid for _iid, _ in _updates]
+        if place:
+            self._place_sorted(parent, _edited)
+        return _edited
+
+
+    def cancel_paste(self, event=None) -> None:
+        '''cancel the paste that is running, if any'''
+        if self.paste_job is not None:
+            self.paste_job.cancel()
+
+    def paste_rows(self, rows: Iterable[List[str]], start_iid: str,
+            colloc0: int, *, total: int | None = None,
+            on_done: Callable[["PasteJob"], Any] | None = None) -> "PasteJob":
+        '''
+        paste parsed rows from start_iid on in slices through
+        after(), cancelling any paste already running. Escape
+        cancels. See PasteJob.
+        '''
+        if self.paste_job is not None:
+            self.paste_job.cancel()
+        self.paste_job = PasteJob(self, rows, start_iid, colloc0,
+                total=total, on_done=on_done)
+        return self.paste_job
 
-                    if type(_current_values) == None:
-                        _current_values = list('')
 
-                    for j, obj in enumerate(row):
-                        if type(_current_values) == list:
-                            if len(_current_values) - 1 < j + _colloc0:
-                                _current_values.append(obj)
-                            else:
-                                _current_values[j + _colloc0] = obj
-                    self.item(_iid_list[i + _rowloc0], values=_current_values)
+    def load_rows(self, rows, parent: str = "", **kw) -> TableLoader:
+        '''
+        append rows produced by an iterable or async iterable in a
+        worker thread, without blocking the main loop. Keywords are
+        passed to TableLoader. Loads still running are cancelled
+        when the table is destroyed.
+        '''
+        _loader = TableLoader(self, rows, parent=parent, **kw)
+        self.loaders.append(_loader)
+        return _loader
 
-        event.widget.destroy()
+    def stream(self, parent: str = "", **kw) -> LiveFeed:
+        '''
+        start a streaming append mode feed into parent. Rows given to
+        the feed are added once a frame. Keywords are passed to
+        LiveFeed, e.g. max_rows for a ring buffer.
+        '''
+        _feed = LiveFeed(self, parent=parent, **kw)
+        self.feeds.append(_feed)
+        return _feed
+
+    def destroy(self) -> None:
+        for _loader in list(self.loaders):
+            _loader.cancel()
+        for _feed in list(self.feeds):
+            _feed.close()
+        if self.paste_job is not None:
+            self.paste_job.cancel()
+        if self.groups is not None:
+            self.groups.close()
+        super().destroy()
 
 
     def accept_new_text_paste(self, event) -> Any:
@@ -507,67 +1630,159 @@ class TreeviewTable(ttk.Treeview):
            which use \t and \n as dividers'''
 
         _text = self.root.clipboard_get()
-        print("text to paste:")
-        print(_text)
 
-        _parsed_text = self.parse_new(_text)
-        _region_clicked = self.identify_region(event.x, event.y)
-        print(_region_clicked)
-        if _region_clicked == "nothing":
-            self.insert_one_row_from_menu(event)
-            _parent = list(self.get_children())[-1]
-            if self.flat:
-                _selected_iid = self.get_children()[-1]
-            else:
-                _selected_iid = self.get_children(_parent)[-1]
+        # a long paste stays one edit until its PasteJob finishes
+        with self.journal.edit("Paste"):
+            _region_clicked = self.identify_region(event.x, event.y)
+            self._debug(_region_clicked)
+            if _region_clicked == "nothing":
+                self.insert_one_row_from_menu(event)
+                _parent = self._children()[-1]
+                if self.flat:
+                    _selected_iid = self._children()[-1]
+                else:
+                    _selected_iid = self._children(_parent)[-1]
 
-            print(f"_selected_iid: {_selected_iid}")
-        elif _region_clicked == "heading":
-            if self.flat:
-                _selected_iid = self.get_children()[0]
+                self._debug(f"_selected_iid: {_selected_iid}")
+            elif _region_clicked == "heading":
+                if self.flat:
+                    _selected_iid = self._children()[0]
+                else:
+                    _selected_iid = self._children(self._children()[0])[0]
             else:
-                _selected_iid = list(self.get_children(
-                                  list(self.get_children())[0]))[0]
-        else:
-            _selected_iid = self.identify_row(event.y)
-        _selected_column = self.identify_column(event.x)
+                _selected_iid = self._row_iid(self.identify_row(event.y))
+            _selected_column = self.identify_column(event.x)
 
-        _colloc0 = int(_selected_column[1:]) - 1
+            _colloc0 = int(_selected_column[1:]) - 1
 
-        if _colloc0 == -1:
-            self.item(_selected_iid, text= _text)
-        else:
-            _iid_list = list(self.get_children(self.parent(_selected_iid)))
-            print(f"_iid_list: {_iid_list}")
-            print(f"_selected_iid is now: {_selected_iid}")
+            if _colloc0 == -1:
+                self._write_text(_selected_iid, _text)
+                self._place_sorted(self._parent_of(_selected_iid), [_selected_iid])
+            else:
+                self._debug(f"_selected_iid is now: {_selected_iid}")
+
+                # parse up to a slice of cells. A paste that fits is
+                # applied at once, a longer one by a PasteJob.
+                _rows = self.parse_rows(_text)
+                _head = []
+                _cells = 0
+                for _row in _rows:
+                    _head.append(_row)
+                    _cells += max(len(_row), 1)
+                    if _cells > PASTE_SLICE_CELLS:
+                        break
+                if _cells <= PASTE_SLICE_CELLS:
+                    self._apply_text_array(_head,
+                            self._parent_of(_selected_iid),
+                            self.model.index(_selected_iid),
+                            _colloc0)
+                else:
+                    self.paste_rows(chain(_head, _rows), _selected_iid,
+                            _colloc0, total=_text.count("\n") + 1)
 
-            _rowloc0 = _iid_list.index(_selected_iid)
 
-            for i, row in enumerate(_parsed_text):
+class PasteJob:
+    '''
+    Applies a large paste to a TreeviewTable a slice at a time
+    through after(), so the event loop keeps running. A progress
+    bar is shown along the bottom of the table while it runs and
+    Escape cancels it. Rows already pasted are kept on cancel.
 
-                if len(row) + _colloc0 > len(self['columns']):
-                    # truncate row
-                    row = row[0:(len(self['columns']) + _colloc0)]
+    In a sorted table the pasted rows are placed when it finishes.
 
-                if i + _rowloc0 > len(_iid_list) - 1:
-                    row = [""] * _colloc0 + row
-                    self.insert_row(parent=self.parent(_selected_iid),
-                            values=row,
-                            index=tk.END)
-                else:
-                    _current_values: list[Any] | Literal[''] = \
-                        self.item(_iid_list[i + _rowloc0]).get("values")
+    Parameters:
+        table -> the TreeviewTable to paste into
+        rows -> iterable of parsed rows, read lazily
+        start_iid -> the first row to overwrite
+        colloc0 -> the first values column to overwrite
+        total -> number of rows, if known, for the progress bar
+        slice_cells -> cells applied per event loop slice
+        on_done -> called with the job when it finishes or is cancelled
+    '''
 
-                    if type(_current_values) == None:
-                        _current_values = list('')
+    def __init__(self, table: TreeviewTable, rows: Iterable[List[str]],
+            start_iid: str, colloc0: int, *,
+            total: int | None = None,
+            slice_cells: int = PASTE_SLICE_CELLS,
+            on_done: Callable[["PasteJob"], Any] | None = None):
+        self.table = table
+        self.colloc0 = colloc0
+        self.total = total
+        self.slice_cells = slice_cells
+        self.on_done = on_done
+        self.rows_done: int = 0
+        self.slices: int = 0
+        self.cancelled: bool = False
+        self.finished: bool = False
+
+        self._rows = iter(rows)
+        self._parent = table.model.parent(start_iid)
+        self._position = table.model.index(start_iid)
+        # rows that can be overwritten, the rest are added
+        self._overwrite = len(table.model.children(self._parent)) - self._position
+        self._edited: List[str] = []
+
+        self.progress = ttk.Progressbar(table,
+                mode="determinate" if total else "indeterminate",
+                maximum=total or 100)
+        self.progress.place(relx=0, rely=1, relwidth=1, anchor=tk.SW)
+        # the whole paste is undone at once
+        table.journal.begin("Paste")
+        self._after_id: str | None = table.after_idle(self._step)
+
+    def _next_slice(self) -> List[List[str]]:
+        _slice: List[List[str]] = []
+        _cells = 0
+        for _row in self._rows:
+            _slice.append(_row)
+            _cells += len(_row)
+            if _cells >= self.slice_cells:
+                break
+        return _slice
+
+    def _step(self) -> None:
+        '''apply one slice and schedule the next'''
+        self._after_id = None
+        if self.cancelled:
+            return
+        _slice = self._next_slice()
+        if _slice:
+            self._edited.extend(self.table._apply_text_array(_slice,
+                    self._parent,
+                    self._position + self.rows_done,
+                    self.colloc0,
+                    overwrite=max(0, self._overwrite - self.rows_done),
+                    place=False))
+            self.rows_done += len(_slice)
+            self.slices += 1
+            if self.total:
+                self.progress["value"] = self.rows_done
+            else:
+                self.progress.step()
+        if not _slice:
+            self._finish()
+            return
+        self._after_id = self.table.after(1, self._step)
 
-                    for j, obj in enumerate(row):
-                        if type(_current_values) == list:
-                            if len(_current_values) - 1 < j + _colloc0:
-                                _current_values.append(obj)
-                            else:
-                                _current_values[j + _colloc0] = obj
-                    self.item(_iid_list[i + _rowloc0], values=_current_values)
+    def cancel(self) -> None:
+        '''stop pasting. Rows already pasted are kept.'''
+        if self.finished:
+            return
+        self.cancelled = True
+        if self._after_id is not None:
+            self.table.after_cancel(self._after_id)
+            self._after_id = None
+        self._finish()
+
+    def _finish(self) -> None:
+        self.finished = True
+        self.table._place_sorted(self._parent, self._edited)
+        self.table.journal.end()
+        self.progress.destroy()
+        if self.table.paste_job is self:
+            self.table.paste_job = None
+        if self.on_done is not None:
+            self.on_done(self)
 
 
 class RightClickMenu(tk.Menu):
@@ -604,6 +1819,34 @@ class RightClickMenu(tk.Menu):
                     "label": f"{DOWNARROW} Sort Descending",
                     "command": self.sort_by_col_desc,
                     },
+                "thenascending": {
+                    "label": f"{UPARROW} Then Sort Ascending",
+                    "command": self.add_sort_key_asc,
+                    },
+                "thendescending": {
+                    "label": f"{DOWNARROW} Then Sort Descending",
+                    "command": self.add_sort_key_desc,
+                    },
+                "clearsort": {
+                    "label": "Clear Sort",
+                    "command": self.parent_obj.clear_sort,
+                    },
+                "filtervalue": {
+                    "label": "Filter to This Value",
+                    "command": self.filter_to_value,
+                    },
+                "clearfilter": {
+                    "label": "Clear Filter",
+                    "command": self.parent_obj.clear_filter,
+                    },
+                "undo": {
+                    "label": "Undo",
+                    "command": self.parent_obj.undo,
+                    },
+                "redo": {
+                    "label": "Redo",
+                    "command": self.parent_obj.redo,
+                    },
                 "deleterows": {
                     "label": "Delete Selected Rows",
                     "command": self.delete_items,
@@ -620,6 +1863,16 @@ class RightClickMenu(tk.Menu):
                     "label": "Copy",
                     "command": self.parent_obj.copy_to_clipboard,
                     },
+                "copycsv": {
+                    "label": "Copy as CSV",
+                    "command": lambda: self.parent_obj.copy_to_clipboard(
+                        "csv"),
+                    },
+                "copyheaders": {
+                    "label": "Copy with Headers",
+                    "command": lambda: self.parent_obj.copy_to_clipboard(
+                        headers=True),
+                    },
                 "paste": {
                     "label": "Paste",
                     "command": self.paste_text,
@@ -629,12 +1882,23 @@ class RightClickMenu(tk.Menu):
         sort_menu = tk.Menu(self, tearoff=False)
         sort_menu.add_command(cnf=config["sortascending"])
         sort_menu.add_command(cnf=config["sortdescending"])
+        sort_menu.add_command(cnf=config["thenascending"])
+        sort_menu.add_command(cnf=config["thendescending"])
+        sort_menu.add_command(cnf=config["clearsort"])
         self.add_cascade(menu=sort_menu, label=f'{UPARROW}{DOWNARROW} Sort')
+        filter_menu = tk.Menu(self, tearoff=False)
+        filter_menu.add_command(cnf=config["filtervalue"])
+        filter_menu.add_command(cnf=config["clearfilter"])
+        self.add_cascade(menu=filter_menu, label='Filter')
 
+        self.add_command(cnf=config["undo"])
+        self.add_command(cnf=config["redo"])
         self.add_command(cnf=config["deleterows"])
         self.add_command(cnf=config["clearcolumn"])
         self.add_command(cnf=config["addrow"])
         self.add_command(cnf=config["copy"])
+        self.add_command(cnf=config["copycsv"])
+        self.add_command(cnf=config["copyheaders"])
         self.add_command(cnf=config["paste"])
 
     def sort_by_col_desc(self) -> None:
@@ -646,6 +1910,24 @@ class RightClickMenu(tk.Menu):
         _col = self.parent_obj.identify_column(self.event.x)
         self.parent_obj.sort_by_col(_col, False)
 
+    def add_sort_key_desc(self) -> None:
+        _col = self.parent_obj.identify_column(self.event.x)
+        self.parent_obj.add_sort_key(_col, True)
+
+    def add_sort_key_asc(self) -> None:
+        _col = self.parent_obj.identify_column(self.event.x)
+        self.parent_obj.add_sort_key(_col, False)
+
+    def filter_to_value(self) -> None:
+        _col = self.parent_obj.identify_column(self.event.x)
+        _iid = self.parent_obj._row_iid(
+                self.parent_obj.identify_row(self.event.y))
+        if _iid == "":
+            return
+        _value = str(self.parent_obj.model.get(_iid, _col))
+        self.parent_obj.filter_rows(_col,
+                regex=f"\\A{re.escape(_value)}\\Z", case=True)
+
     def insert_row(self) -> None:
         self.parent_obj.insert_one_row_from_menu(self.event)
 
@@ -665,7 +1947,7 @@ class RightClickMenu(tk.Menu):
         try:
             self.tk_popup(event.x_root, event.y_root, 0)
         except:
-            print("Ran into an issue")
+            self.parent_obj._debug("Ran into an issue")
             return
         finally:
             self.grab_release()
@@ -675,6 +1957,44 @@ def endprogram(event, root):
     '''kill tk with a keystroke'''
     root.destroy()
 
+def virtual_example(root: tk.Tk | tk.Toplevel, rows: int = 1_000_000) -> None:
+    '''
+    a flat virtual table with a large number of rows, loaded from
+    a worker thread while the table stays usable
+    '''
+    column_names = ("column1", "column2", "column3")
+    _status = tk.Label(root, anchor=tk.W)
+    _scrollbar = ttk.Scrollbar(root, orient=tk.VERTICAL)
+    treeview_test = TreeviewTable(root, root,
+                        columns=column_names,
+                        virtual=True,
+                        yscrollcommand=_scrollbar.set)
+    _scrollbar["command"] = treeview_test.yview
+    treeview_test.heading("#1", text="Row")
+    treeview_test.heading("#2", text="Square")
+    treeview_test.heading("#3", text="Label")
+    treeview_test.set_column_type("column1", "numeric")
+    treeview_test.set_column_type("column2", "numeric")
+
+    def _rows():
+        # stands in for a database query or a log parser
+        for i in range(rows):
+            yield (i, i * i, f"label {i % 97}")
+
+    def _show_progress() -> None:
+        if _loader.finished:
+            _status["text"] = f"loaded {_loader.rows_done:,} rows"
+            return
+        _status["text"] = f"loading... {_loader.rows_done:,} of {rows:,}"
+        _status.after(100, _show_progress)
+
+    _loader = treeview_test.load_rows(_rows())
+    _show_progress()
+
+    _status.pack(fill=tk.X, side=tk.BOTTOM)
+    treeview_test.pack(fill=tk.BOTH, side= tk.LEFT, expand=True)
+    _scrollbar.pack(fill=tk.Y, side= tk.RIGHT, expand= tk.FALSE)
+
 def main() -> int:
     '''example program with car models'''
     root = tk.Tk()
@@ -689,6 +2009,7 @@ def main() -> int:
     treeview_test.heading("#2", text="Year")
     treeview_test.heading("#3", text="Color")
     treeview_test.heading("#4", text="Problem")
+    treeview_test.set_column_type("column2", "numeric")
 
     treeview_test.insert_row(parent="",
                         index=tk.END,
@@ -726,6 +2047,11 @@ def main() -> int:
                 command=treeview_test.yview)
     _scrollbar.pack(fill=tk.Y, side= tk.RIGHT, expand= tk.FALSE)
 
+    # a million rows loading in the background in a second window
+    _big = tk.Toplevel(root)
+    _big.title("1M rows")
+    virtual_example(_big)
+
     root.mainloop()
 
     return 0
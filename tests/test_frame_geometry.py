@@ -0,0 +1,48 @@
+# Copyright (c) 2024 kbt | terminus, LLC
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+'''
+FrameScroll coalesces the <Configure> events children cause into
+one geometry pass per event loop run.
+benchmarks/bench_frame_geometry.py times the same on more children.
+'''
+
+from tkinter import ttk
+
+from tk_frame_scroll import FrameScroll
+
+# most geometry passes allowed per event loop run
+MAX_PASSES = 2
+
+
+def test_one_geometry_pass_per_event_loop_run(root):
+    frame = FrameScroll(root)
+    root.update()
+    frame.geometry_passes = 0
+    updates = 0
+    try:
+        for i in range(1, 301):
+            ttk.Label(frame.interior, text=f"Label {i}").pack()
+            if i % 50 == 0:
+                root.update()
+                updates += 1
+        assert frame.geometry_passes <= MAX_PASSES * updates
+    finally:
+        frame.destroy()
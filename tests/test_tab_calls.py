@@ -0,0 +1,84 @@
+# Copyright (c) 2024 kbt | terminus, LLC
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+'''
+Tcl call budget for Tab navigation (next_cell_tab). Cell reads come
+from the model, so a Tab makes a few calls whatever the table size.
+benchmarks/bench_tab_calls.py measures the same on larger tables.
+'''
+
+import tkinter as tk
+
+import pytest
+
+from tk_treeview_table import TreeviewTable
+
+# most Tcl calls one Tab may make
+MAX_CALLS = 20
+
+
+class CountingTk:
+    '''wraps a tkapp and counts the calls made through it'''
+
+    def __init__(self, tkapp):
+        self._tkapp = tkapp
+        self.calls = 0
+
+    def call(self, *args):
+        self.calls += 1
+        return self._tkapp.call(*args)
+
+    def __getattr__(self, name):
+        return getattr(self._tkapp, name)
+
+def calls_per_tab(root, count, virtual, tabs=20):
+    table = TreeviewTable(root, root, flat=virtual, virtual=virtual,
+            height=20, columns=("id", "name", "number", "text"))
+    # virtual tables are flat, the others get one group
+    parent = "" if virtual else \
+            table.insert_row(parent="", index=tk.END, text="group")
+    table.insert_rows(parent, [(i, f"name {i}", i * 3 % 1000, "text")
+                               for i in range(count)])
+    table.pack()
+    root.update()
+    table.selected_iid = table.model.children(parent)[0]
+    table.selected_column = "#1"
+    counter = CountingTk(table.tk)
+    table.tk = counter
+    calls = 0
+    try:
+        for _ in range(tabs):
+            counter.calls = 0
+            table.next_cell_tab(None)
+            # includes the idle work a Tab schedules, e.g. a render
+            root.update_idletasks()
+            calls += counter.calls
+            table.editor.cancel()
+    finally:
+        table.tk = counter._tkapp
+        table.destroy()
+    return calls / tabs
+
+@pytest.mark.parametrize("virtual", [False, True])
+def test_tab_calls_do_not_grow_with_the_table(root, virtual):
+    small = calls_per_tab(root, 100, virtual)
+    large = calls_per_tab(root, 20_000, virtual)
+    assert large <= MAX_CALLS
+    assert large <= small + 0.5
@@ -0,0 +1,91 @@
+# Copyright (c) 2024 kbt | terminus, LLC
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+'''Tests for tk_table_filter, with and without NumPy.'''
+
+import pytest
+
+import tk_table_filter
+from tk_table_model import TableModel, np
+from tk_table_filter import FilterEngine
+
+
+@pytest.fixture(params=["numpy", "plain"])
+def numpy_mode(request, monkeypatch):
+    if request.param == "numpy":
+        if np is None:
+            pytest.skip("NumPy is not installed")
+    else:
+        monkeypatch.setattr(tk_table_filter, "np", None)
+    return request.param
+
+def make_model(rows) -> TableModel:
+    model = TableModel(("a", "b"))
+    model.insert_rows("", "end", rows)
+    return model
+
+def test_between_on_empty_model(numpy_mode):
+    engine = FilterEngine(TableModel(("a",)))
+    assert engine.rows("", [("a", "between", (0, 5), False)]) == []
+
+def test_between(numpy_mode):
+    model = make_model([(1, "x"), ("1,500", "y"), ("n/a", "z"), (7, "w")])
+    engine = FilterEngine(model)
+    children = list(model.children(""))
+    assert engine.rows("", [("a", "between", (0, 5), False)]) == \
+            [children[0]]
+    assert engine.rows("", [("a", "between", (5, 2000), False)]) == \
+            [children[1], children[3]]
+
+def test_between_after_append(numpy_mode):
+    model = make_model([(1, "x")])
+    engine = FilterEngine(model)
+    assert len(engine.rows("", [("a", "between", (0, 5), False)])) == 1
+    model.insert_rows("", "end", [(2, "y"), (9, "z")])
+    assert len(engine.rows("", [("a", "between", (0, 5), False)])) == 2
+
+def test_contains_narrows_and_follows_edits(numpy_mode):
+    model = make_model([("apple", 1), ("apricot", 2), ("banana", 3)])
+    engine = FilterEngine(model)
+    children = list(model.children(""))
+    assert engine.search("", "ap", "a") == children[:2]
+    # narrowed from the kept "ap" search
+    assert engine.search("", "APR", "a") == children[1:2]
+    model.set(children[2], "a", "April")
+    assert engine.search("", "apr", "a") == children[1:]
+
+def test_several_conditions(numpy_mode):
+    model = make_model([("red", 1), ("red", 9), ("blue", 1), ("Red", 2)])
+    engine = FilterEngine(model)
+    children = list(model.children(""))
+    assert engine.rows("", [("a", "contains", "red", False),
+                            ("b", "between", (0, 5), False)]) == \
+            [children[0], children[3]]
+    assert engine.rows("", [("a", "contains", "red", True),
+                            (None, "regex", "^9$", False)]) == [children[1]]
+
+def test_where_is_not_kept(numpy_mode):
+    model = make_model([(1, ""), (2, ""), (3, "")])
+    engine = FilterEngine(model)
+    limit = [1]
+    predicate = lambda value: value > limit[0]
+    assert len(engine.rows("", [("a", "where", predicate, False)])) == 2
+    limit[0] = 2
+    assert len(engine.rows("", [("a", "where", predicate, False)])) == 1
@@ -0,0 +1,199 @@
+# Copyright (c) 2024 kbt | terminus, LLC
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+'''Tests for tk_table_model: the row store and its BlockedList.'''
+
+import random
+
+import pytest
+
+import tk_table_model
+from tk_table_model import BlockedList, TableModel
+
+
+@pytest.fixture
+def small_blocks(monkeypatch):
+    '''blocks of 4 so a few rows split and merge them'''
+    monkeypatch.setattr(tk_table_model, "BLOCK_SIZE", 4)
+
+def check(blocked, expected):
+    '''BlockedList holds expected and its block bookkeeping agrees'''
+    assert list(blocked) == expected
+    assert len(blocked) == len(expected)
+    blocked._refresh()
+    assert all(blocked._blocks)
+    assert all(len(b) <= 2 * tk_table_model.BLOCK_SIZE
+               for b in blocked._blocks)
+    starts = [0]
+    for block in blocked._blocks[:-1]:
+        starts.append(starts[-1] + len(block))
+    assert blocked._starts == starts[:len(blocked._blocks)]
+    assert set(blocked._block_of) == set(expected)
+    for number, block in enumerate(blocked._blocks):
+        assert blocked._number[id(block)] == number
+        assert all(blocked._block_of[k] is block for k in block)
+    assert [blocked.index(k) for k in expected] == list(range(len(expected)))
+    assert [blocked[i] for i in range(len(expected))] == expected
+    assert blocked[1:-1] == expected[1:-1]
+
+def test_blocked_list_splits_and_merges(small_blocks):
+    expected = [f"i{n}" for n in range(10)]
+    blocked = BlockedList(expected)
+    check(blocked, expected)
+    # past twice the block size the block is split
+    batch = [f"b{n}" for n in range(7)]
+    blocked.splice(5, batch)
+    expected[5:5] = batch
+    check(blocked, expected)
+    # emptied blocks are dropped
+    for k in expected[:9]:
+        blocked.remove(k)
+    del expected[:9]
+    check(blocked, expected)
+    blocked.insert(0, "first")
+    blocked.append("last")
+    check(blocked, ["first"] + expected + ["last"])
+
+def test_blocked_list_random_edits(small_blocks):
+    random.seed(2)
+    expected = []
+    blocked = BlockedList()
+    for n in range(400):
+        action = random.random()
+        if action < 0.4 or not expected:
+            index = random.randint(0, len(expected))
+            batch = [f"k{n}.{m}" for m in range(random.randint(1, 11))]
+            blocked.splice(index, batch)
+            expected[index:index] = batch
+        elif action < 0.6:
+            blocked.append(f"k{n}")
+            expected.append(f"k{n}")
+        else:
+            k = random.choice(expected)
+            blocked.remove(k)
+            expected.remove(k)
+        if n % 20 == 0:
+            check(blocked, expected)
+    check(blocked, expected)
+
+def test_blocked_list_neighbor():
+    blocked = BlockedList(["a", "b", "c"])
+    assert blocked.neighbor("a", -1) == "c"
+    assert blocked.neighbor("c", 1) == "a"
+    assert blocked.neighbor("c", 1, wrap=False) is None
+    assert blocked.neighbor("a", 2, wrap=False) == "c"
+    with pytest.raises(ValueError):
+        blocked.index("z")
+
+class Recorder:
+    '''a listener that keeps the events it is sent'''
+
+    def __init__(self, model):
+        self.events = []
+        model.subscribe(self)
+
+    def __call__(self, event, parent, iids, col):
+        self.events.append((event, parent, list(iids), col))
+
+def test_insert():
+    model = TableModel(("a", "b"))
+    events = Recorder(model).events
+    first = model.insert("", "end", values=(1, 2))
+    top = model.insert("", 0, iid="top", text="t", values=(0,))
+    iids = model.insert_rows("", 1, [(3, 4), (5, 6, 7)])
+    assert list(model.children("")) == ["top"] + iids + [first]
+    assert model.values("top") == [0]
+    assert model.text("top") == "t"
+    # values past the last column are dropped
+    assert model.values(iids[1]) == [5, 6]
+    assert model.get("top", "b") == ""
+    assert len(model) == 4 and top in model
+    assert events == [("insert", "", [first], None),
+                      ("insert", "", ["top"], None),
+                      ("insert", "", iids, None)]
+
+def test_delete_frees_slots_and_children():
+    model = TableModel(("a",))
+    parent = model.insert("", "end", values=("p",))
+    children = model.insert_rows(parent, "end", [("c1",), ("c2",)])
+    other = model.insert("", "end", values=("o",))
+    events = Recorder(model).events
+    slots = model.slots([parent] + children)
+    model.delete(parent)
+    assert list(model.children("")) == [other]
+    assert parent not in model and children[0] not in model
+    assert [e[0] for e in events] == ["delete"] * 3
+    with pytest.raises(KeyError):
+        model.children(parent)
+    # freed slots are blank and reused first
+    iids = model.insert_rows("", "end", [("x",), ("y",), ("z",)])
+    assert sorted(model.slots(iids)) == sorted(slots)
+    assert model.values(iids[0]) == ["x"]
+    assert model.text(iids[0]) == ""
+
+def test_move():
+    model = TableModel(("a",))
+    a, b, c = model.insert_rows("", "end", [("a",), ("b",), ("c",)])
+    events = Recorder(model).events
+    model.move(c, "", 0)
+    assert list(model.children("")) == [c, a, b]
+    model.move(a, b, "end")
+    assert list(model.children("")) == [c, b]
+    assert list(model.children(b)) == [a]
+    assert model.parent(a) == b
+    assert model.index(a) == 0
+    assert events == [("delete", "", [c], None), ("insert", "", [c], None),
+                      ("delete", "", [a], None), ("insert", b, [a], None)]
+
+def test_reorder_sends_no_event():
+    model = TableModel(("a",))
+    iids = model.insert_rows("", "end", [(n,) for n in range(5)])
+    events = Recorder(model).events
+    model.reorder("", iids[::-1])
+    assert list(model.children("")) == iids[::-1]
+    assert model.index(iids[0]) == 4
+    assert model.sibling(iids[0]) == iids[4]
+    assert model.sibling(iids[0], wrap=False) is None
+    assert events == []
+
+def test_update():
+    model = TableModel(("a", "b", "c"))
+    iid = model.insert("", "end", values=(1,))
+    events = Recorder(model).events
+    model.set(iid, "c", 3)
+    assert model.values(iid) == [1, "", 3]
+    assert model.row_length(iid) == 3
+    model.set(iid, "#0", "text")
+    assert model.text(iid) == "text"
+    model.set_values(iid, ("x", "y"))
+    assert model.values(iid) == ["x", "y"]
+    model.set_text(iid, "t")
+    assert events == [("update", None, [iid], 2), ("update", None, [iid], -1),
+                      ("update", None, [iid], None),
+                      ("update", None, [iid], -1)]
+
+def test_columns():
+    model = TableModel(("a", "b"))
+    iids = model.insert_rows("", "end", [(1, 2), (3,)])
+    assert model.column("b", iids) == [2, ""]
+    model.set_column("b", iids, ["x", "y"])
+    assert list(model.rows(iids)) == [[1, "x"], [3, "y"]]
+    model.set_column(-1, iids, ["t1", "t2"])
+    assert model.column("#0", iids) == ["t1", "t2"]
@@ -0,0 +1,127 @@
+# Copyright (c) 2024 kbt | terminus, LLC
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+'''Tests for tk_table_sort, with and without NumPy.'''
+
+import pytest
+
+import tk_table_sort
+from tk_table_model import TableModel, np
+from tk_table_sort import SortEngine
+
+
+@pytest.fixture(params=["numpy", "plain"])
+def numpy_mode(request, monkeypatch):
+    if request.param == "numpy":
+        if np is None:
+            pytest.skip("NumPy is not installed")
+    else:
+        monkeypatch.setattr(tk_table_sort, "np", None)
+    return request.param
+
+def make_engine(rows, numeric=()):
+    model = TableModel(("year", "color"))
+    model.insert_rows("", "end", rows)
+    engine = SortEngine(model, default="string")
+    for col in numeric:
+        engine.set_column_type(col, "numeric")
+    return model, engine
+
+def sort(model, engine, col, reverse=False):
+    '''sort as TreeviewTable does, reordering the model'''
+    model.reorder("", engine.sorted_children("", col, reverse))
+    return [tuple(model.values(k)) for k in model.children("")]
+
+def test_ties_follow_the_current_order(numpy_mode):
+    model, engine = make_engine([(2000, "red"), (1990, "red"),
+                                 (2000, "blue"), (1990, "blue")], ["year"])
+    sort(model, engine, "year")
+    sort(model, engine, "color")
+    assert sort(model, engine, "year") == \
+            [(1990, "blue"), (1990, "red"), (2000, "blue"), (2000, "red")]
+
+def test_flipping_keeps_ties_in_order(numpy_mode):
+    model, engine = make_engine([(1, "a"), (2, "b"), (1, "c"), (2, "d")],
+                                ["year"])
+    assert sort(model, engine, "year") == \
+            [(1, "a"), (1, "c"), (2, "b"), (2, "d")]
+    assert sort(model, engine, "year", True) == \
+            [(2, "b"), (2, "d"), (1, "a"), (1, "c")]
+    assert sort(model, engine, "year") == \
+            [(1, "a"), (1, "c"), (2, "b"), (2, "d")]
+
+def test_numeric_blanks_and_text_last_both_ways(numpy_mode):
+    model, engine = make_engine([("", 1), ("10", 2), ("x", 3), ("1,5", 4),
+                                 ("nan", 5), ("-1", 6)], ["year"])
+    assert [r[0] for r in sort(model, engine, "year")] == \
+            ["-1", "10", "1,5", "", "nan", "x"]
+    assert [r[0] for r in sort(model, engine, "year", True)] == \
+            ["1,5", "10", "-1", "x", "nan", ""]
+
+def test_same_order_with_and_without_numpy(monkeypatch):
+    if np is None:
+        pytest.skip("NumPy is not installed")
+    rows = [(v, i) for i, v in enumerate(
+            ["5", "", "a", "5", "-2", "b", "", "3.5", "a"] * 5)]
+    orders = []
+    for module_np in (np, None):
+        monkeypatch.setattr(tk_table_sort, "np", module_np)
+        model, engine = make_engine(rows, ["year"])
+        orders.append([sort(model, engine, "year", r) for r in (False, True)])
+    assert orders[0] == orders[1]
+
+def test_bisect_agrees_with_a_reversed_sort(numpy_mode):
+    model, engine = make_engine([("3", ""), ("", ""), ("x", ""), ("1", "")],
+                                ["year"])
+    sort(model, engine, "year", True)
+    iid = model.insert("", "end", values=("2", ""))
+    model.move(iid, "", engine.bisect("", iid, [("year", True)]))
+    assert [model.get(k, "year") for k in model.children("")] == \
+            ["3", "2", "1", "x", ""]
+
+def place_one_by_one(model, engine, iids, sort_keys):
+    for iid in iids:
+        model.move(iid, "", engine.bisect("", iid, sort_keys))
+    return list(model.children(""))
+
+@pytest.mark.parametrize("sort_keys", [[("year", False)], [("year", True)],
+        [("color", False), ("year", True)]])
+def test_merge_matches_bisecting_each_row(numpy_mode, sort_keys):
+    import random
+    random.seed(5)
+    rows = [(str(random.choice([1, 2, 3, "", "x"])), random.choice("ab"))
+            for _ in range(60)]
+    results = []
+    for merge in (False, True):
+        model, engine = make_engine(rows[:40], ["year"])
+        model.reorder("", engine.sort_order("", sort_keys))
+        # an edited row has no cached key
+        edited = model.children("")[20]
+        model.set(edited, "year", model.get(edited, "year"))
+        iids = model.insert_rows("", "end", rows[40:])
+        if merge:
+            order, first = engine.merge("", iids, sort_keys)
+            assert order[:first] == list(model.children(""))[:first]
+            results.append(order)
+        else:
+            # in the batch's own sorted order, as merge does
+            results.append(place_one_by_one(model, engine,
+                    engine._sorted(iids, sort_keys), sort_keys))
+    assert results[0] == results[1]